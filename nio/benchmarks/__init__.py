@@ -0,0 +1,2 @@
+from nio.benchmarks.runner import benchmark, compare_results, \
+    run_benchmarks
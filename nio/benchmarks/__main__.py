@@ -0,0 +1,107 @@
+""" Command line entry point of the framework benchmarks
+
+Run every benchmark and save the results as a baseline:
+
+    python -m nio.benchmarks --save baseline.json
+
+Run the router benchmarks and compare them to the baseline, exiting with a
+non zero status if any of them regressed by more than 10%:
+
+    python -m nio.benchmarks -k router --compare baseline.json
+"""
+import argparse
+import re
+import sys
+
+from nio.benchmarks.runner import compare_results, run_benchmarks
+from nio.util.codec import load_json, save_json
+
+
+def _parse_args(args):
+    parser = argparse.ArgumentParser(
+        prog="python -m nio.benchmarks",
+        description="Benchmark the nio framework hot paths")
+    parser.add_argument(
+        "-k", "--filter", dest="pattern", default=None,
+        help="only run benchmarks whose name matches this regex")
+    parser.add_argument(
+        "--rounds", type=int, default=5,
+        help="number of timed rounds per benchmark (default: 5)")
+    parser.add_argument(
+        "--min-time", type=float, default=0.1,
+        help="minimum duration of a round in seconds (default: 0.1)")
+    parser.add_argument(
+        "--save", metavar="FILE",
+        help="save the results to a JSON file, i.e. as a baseline")
+    parser.add_argument(
+        "--compare", metavar="FILE",
+        help="compare the results to a baseline JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="relative change considered a regression or an improvement "
+             "when comparing (default: 0.1)")
+    return parser.parse_args(args)
+
+
+def _format_time(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return "{:.3g}{}".format(seconds * scale, unit)
+    return "{:.3g}ns".format(seconds * 1e9)
+
+
+def _print_result(name, result):
+    print("{:<45} {:>10} {:>14.0f} ops/s".format(
+        name, _format_time(result["median"]), result["ops_per_sec"] or 0))
+
+
+def _print_comparison(comparison):
+    print()
+    print("{:<45} {:>10} {:>10} {:>8}".format(
+        "benchmark", "baseline", "current", "change"))
+    for entry in comparison:
+        change = "-" if entry["change"] is None else \
+            "{:+.1%}".format(entry["change"])
+        print("{:<45} {:>10} {:>10} {:>8}  {}".format(
+            entry["name"], _format_time(entry["baseline"]),
+            _format_time(entry["current"]), change, entry["status"]))
+
+
+def main(args=None):
+    """ Run the benchmarks
+
+    Returns:
+        int: the exit status, 1 when comparing and a benchmark regressed
+    """
+    args = _parse_args(args)
+    baseline = None
+    if args.compare:
+        baseline = load_json(args.compare)
+        if not baseline:
+            print("Baseline {} not found or empty".format(args.compare),
+                  file=sys.stderr)
+            return 2
+
+    results = run_benchmarks(args.pattern, args.rounds, args.min_time,
+                             callback=_print_result)
+    if args.save:
+        save_json(args.save, results)
+
+    if baseline is not None:
+        if args.pattern is not None:
+            # benchmarks left out on purpose are not missing
+            baseline["benchmarks"] = {
+                name: result
+                for name, result in baseline["benchmarks"].items()
+                if re.search(args.pattern, name)}
+        comparison = compare_results(results, baseline, args.threshold)
+        _print_comparison(comparison)
+        if any(entry["status"] == "regression" for entry in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+""" Loading and saving files with the codec utilities """
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from nio.benchmarks import benchmark
+from nio.util.codec import load_json, load_pickle, save_json, save_pickle
+
+
+_DATA = {
+    "name": "service",
+    "execution": [{"id": "block{}".format(index),
+                   "receivers": ["block{}".format(index + 1)]}
+                  for index in range(20)],
+    "properties": {
+        "log_level": "INFO",
+        "auto_start": True,
+        "values": [1.5] * 20
+    }
+}
+
+
+def _codec_benchmark(codec_function, save_function):
+    """ Returns a benchmark operation on a file saved in a temporary
+    directory, along with the cleanup function removing the directory """
+    directory = mkdtemp()
+    file_path = path.join(directory, "data")
+    save_function(file_path, _DATA)
+    if codec_function is save_function:
+        operation = lambda: save_function(file_path, _DATA)  # noqa
+    else:
+        operation = lambda: codec_function(file_path)  # noqa
+    return operation, lambda: rmtree(directory, ignore_errors=True)
+
+
+@benchmark("codec.save_json")
+def benchmark_save_json():
+    return _codec_benchmark(save_json, save_json)
+
+
+@benchmark("codec.load_json")
+def benchmark_load_json():
+    return _codec_benchmark(load_json, save_json)
+
+
+@benchmark("codec.save_pickle")
+def benchmark_save_pickle():
+    return _codec_benchmark(save_pickle, save_pickle)
+
+
+@benchmark("codec.load_pickle")
+def benchmark_load_pickle():
+    return _codec_benchmark(load_pickle, save_pickle)
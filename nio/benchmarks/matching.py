@@ -0,0 +1,20 @@
+""" Communication topic matching """
+from nio.benchmarks import benchmark
+from nio.modules.communication.matching import matches
+
+
+@benchmark("matching.matches.exact")
+def matches_exact():
+    return lambda: matches("sensors.room1.temperature",
+                           "sensors.room1.temperature")
+
+
+@benchmark("matching.matches.wildcards")
+def matches_wildcards():
+    return lambda: matches("sensors.*.temperature.**",
+                           "sensors.room1.temperature.celsius.raw")
+
+
+@benchmark("matching.matches.mismatch")
+def matches_mismatch():
+    return lambda: matches("sensors.*.humidity", "sensors.room1.temperature")
@@ -0,0 +1,40 @@
+""" Expression evaluation and property access """
+from nio.benchmarks import benchmark
+from nio.properties import IntProperty, StringProperty
+from nio.properties.util.evaluator import Evaluator
+from nio.properties.util.property_value import PropertyValue
+from nio.signal.base import Signal
+
+
+@benchmark("evaluator.evaluate.attribute")
+def evaluate_attribute():
+    evaluator = Evaluator("{{ $value }}")
+    signal = Signal({"value": 1})
+    return lambda: evaluator.evaluate(signal)
+
+
+@benchmark("evaluator.evaluate.arithmetic")
+def evaluate_arithmetic():
+    evaluator = Evaluator("{{ $value * 2 + 1 }}")
+    signal = Signal({"value": 1})
+    return lambda: evaluator.evaluate(signal)
+
+
+@benchmark("evaluator.evaluate.interpolation")
+def evaluate_interpolation():
+    evaluator = Evaluator("{{ $name }} is at {{ $value }} degrees")
+    signal = Signal({"name": "sensor", "value": 21})
+    return lambda: evaluator.evaluate(signal)
+
+
+@benchmark("property_value.call.constant")
+def call_constant():
+    return PropertyValue(IntProperty(title="Constant"), value=5)
+
+
+@benchmark("property_value.call.expression")
+def call_expression():
+    property_value = PropertyValue(
+        StringProperty(title="Expression"), value="{{ $name }}")
+    signal = Signal({"name": "sensor"})
+    return lambda: property_value(signal)
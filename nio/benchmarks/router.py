@@ -0,0 +1,130 @@
+""" Signal delivery through the block router """
+from nio.benchmarks import benchmark
+from nio.block.base import Block
+from nio.block.context import BlockContext
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.router.base import BlockRouter
+from nio.router.context import RouterContext
+from nio.service.base import BlockExecution
+from nio.signal.base import Signal
+
+
+# Signals notified by each call
+BATCH_SIZE = 10
+# Signals notified by each call of the large batch benchmarks
+LARGE_BATCH_SIZE = 1000
+# Receivers of the fan-out topology, senders of the fan-in topology
+FAN_WIDTH = 4
+
+
+class _BenchmarkBlock(Block):
+
+    def __init__(self, block_id):
+        super().__init__()
+        self.id = block_id
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        pass
+
+
+class _TrustedBenchmarkBlock(_BenchmarkBlock):
+
+    trusted_producer = True
+
+
+class _Execution(BlockExecution):
+
+    def __init__(self, id, receivers):
+        self.id = id
+        self.receivers = receivers
+
+
+def _start_router(connections, settings=None, trusted=()):
+    """ Returns a started router and its blocks
+
+    Args:
+        connections (dict): receiver block ids keyed by sender block id
+        settings (dict): router settings, diagnostics are disabled by default
+            since they need a scheduler
+        trusted (iterable): ids of the blocks that are trusted producers
+    """
+    router_settings = {"diagnostics": False}
+    router_settings.update(settings or {})
+    router = BlockRouter()
+    block_context = BlockContext(router, {})
+    block_ids = set(connections)
+    for receivers in connections.values():
+        block_ids.update(receivers)
+    blocks = {}
+    for block_id in sorted(block_ids):
+        block_class = _TrustedBenchmarkBlock if block_id in trusted \
+            else _BenchmarkBlock
+        blocks[block_id] = block_class(block_id)
+        blocks[block_id].configure(block_context)
+    execution = [_Execution(sender, receivers)
+                 for sender, receivers in connections.items()]
+    router.do_configure(RouterContext(execution, blocks, router_settings))
+    router.do_start()
+    return router, blocks
+
+
+def _signals(count=BATCH_SIZE):
+    return [Signal({"id": index, "value": "value", "data": {"a": [1, 2]}})
+            for index in range(count)]
+
+
+def _notify_operation(router, sender, batch_size=BATCH_SIZE):
+    """ Returns the operation notifying a batch of signals from a sender,
+    along with the router cleanup """
+    signals = _signals(batch_size)
+    return (lambda: router.notify_signals(sender, signals, DEFAULT_TERMINAL),
+            router.do_stop)
+
+
+@benchmark("router.notify_signals.single", operations=BATCH_SIZE)
+def notify_single():
+    router, blocks = _start_router({"sender": ["receiver"]})
+    return _notify_operation(router, blocks["sender"])
+
+
+@benchmark("router.notify_signals.fan_out", operations=BATCH_SIZE)
+def notify_fan_out():
+    receivers = ["receiver{}".format(index) for index in range(FAN_WIDTH)]
+    router, blocks = _start_router({"sender": receivers})
+    return _notify_operation(router, blocks["sender"])
+
+
+@benchmark("router.notify_signals.fan_out_no_clone", operations=BATCH_SIZE)
+def notify_fan_out_no_clone():
+    receivers = ["receiver{}".format(index) for index in range(FAN_WIDTH)]
+    router, blocks = _start_router({"sender": receivers},
+                                   {"clone_signals": False})
+    return _notify_operation(router, blocks["sender"])
+
+
+@benchmark("router.notify_signals.fan_in", operations=BATCH_SIZE * FAN_WIDTH)
+def notify_fan_in():
+    senders = ["sender{}".format(index) for index in range(FAN_WIDTH)]
+    router, blocks = _start_router(
+        {sender: ["receiver"] for sender in senders})
+    sender_blocks = [blocks[sender] for sender in senders]
+    signals = _signals()
+
+    def notify():
+        for sender in sender_blocks:
+            router.notify_signals(sender, signals, DEFAULT_TERMINAL)
+    return notify, router.do_stop
+
+
+@benchmark("router.notify_signals.large_batch", operations=LARGE_BATCH_SIZE)
+def notify_large_batch():
+    router, blocks = _start_router({"sender": ["receiver"]})
+    return _notify_operation(router, blocks["sender"], LARGE_BATCH_SIZE)
+
+
+@benchmark("router.notify_signals.large_batch_trusted",
+           operations=LARGE_BATCH_SIZE)
+def notify_large_batch_trusted():
+    router, blocks = _start_router({"sender": ["receiver"]},
+                                   trusted=["sender"])
+    return _notify_operation(router, blocks["sender"], LARGE_BATCH_SIZE)
@@ -0,0 +1,211 @@
+""" Runs the framework benchmarks and compares their results
+
+A benchmark is registered with the 'benchmark' decorator on a setup
+function. The setup function prepares whatever the benchmark needs and
+returns the callable to time, so that only the operation itself is measured.
+Setup functions needing to release resources once the benchmark is over
+return a (callable, cleanup) tuple instead.
+
+    @benchmark("signal.to_dict")
+    def to_dict():
+        signal = Signal({"a": 1})
+        return signal.to_dict
+
+Every benchmark is timed over several rounds, each round calling the
+operation enough times to last a minimum amount of time. Results are plain
+dicts that can be saved as JSON and used as a baseline to compare later
+results against.
+"""
+import platform
+import re
+from collections import OrderedDict
+from statistics import median
+from time import perf_counter
+
+from nio import __version__
+
+
+# Registered benchmarks, by name
+_benchmarks = OrderedDict()
+
+
+class Benchmark(object):
+
+    def __init__(self, name, setup, operations=1):
+        """ Create a new benchmark
+
+        Args:
+            name (str): Unique benchmark name, dotted by area
+            setup (callable): Returns the callable to time, or a tuple of
+                the callable to time and a cleanup function
+            operations (int): Operations performed by each call to the timed
+                callable, i.e. signals delivered
+        """
+        self.name = name
+        self.setup = setup
+        self.operations = operations
+
+    def run(self, rounds=5, min_time=0.1):
+        """ Time the benchmark
+
+        Args:
+            rounds (int): Number of timed rounds
+            min_time (float): Minimum duration of a round, in seconds
+
+        Returns:
+            dict: the number of calls per round, the best and median time
+                per operation in seconds and the median operations per second
+        """
+        operation = self.setup()
+        cleanup = None
+        if isinstance(operation, tuple):
+            operation, cleanup = operation
+        try:
+            calls = self._calibrate(operation, min_time)
+            timings = []
+            for _ in range(rounds):
+                timings.append(self._time(operation, calls) /
+                               (calls * self.operations))
+        finally:
+            if cleanup is not None:
+                cleanup()
+        median_time = median(timings)
+        return {
+            "calls": calls,
+            "operations": self.operations,
+            "best": min(timings),
+            "median": median_time,
+            "ops_per_sec": 1 / median_time if median_time else None
+        }
+
+    @staticmethod
+    def _calibrate(operation, min_time):
+        """ Returns how many calls it takes to last at least min_time """
+        calls = 1
+        while True:
+            elapsed = Benchmark._time(operation, calls)
+            if elapsed >= min_time:
+                return calls
+            # aim a bit past min_time, without growing too fast on very
+            # short timings
+            calls = max(calls + 1, min(
+                calls * 10, int(calls * 1.2 * min_time / max(elapsed, 1e-9))))
+
+    @staticmethod
+    def _time(operation, calls):
+        iterations = range(calls)
+        start = perf_counter()
+        for _ in iterations:
+            operation()
+        return perf_counter() - start
+
+
+def benchmark(name, operations=1):
+    """ Decorator registering a benchmark setup function
+
+    Args:
+        name (str): Unique benchmark name
+        operations (int): Operations performed by each call to the timed
+            callable
+    """
+    def register(setup):
+        if name in _benchmarks:
+            raise ValueError("Benchmark {} is already registered".format(
+                name))
+        _benchmarks[name] = Benchmark(name, setup, operations)
+        return setup
+    return register
+
+
+def get_benchmarks(pattern=None):
+    """ Returns the registered benchmarks
+
+    Args:
+        pattern (str): Optional regular expression benchmark names have to
+            contain to be returned
+    """
+    # importing the benchmark modules registers their benchmarks
+    from nio.benchmarks import codec, matching, properties, router, \
+        scheduler, signal, status  # noqa
+    if pattern is None:
+        return list(_benchmarks.values())
+    return [bench for bench in _benchmarks.values()
+            if re.search(pattern, bench.name)]
+
+
+def run_benchmarks(pattern=None, rounds=5, min_time=0.1, callback=None):
+    """ Run the registered benchmarks
+
+    Args:
+        pattern (str): Only run benchmarks whose name contains this regular
+            expression
+        rounds (int): Number of timed rounds per benchmark
+        min_time (float): Minimum duration of a round, in seconds
+        callback (callable): Called with each benchmark name and its result
+            as they complete
+
+    Returns:
+        dict: the environment the benchmarks ran in along with the results,
+            keyed by benchmark name
+    """
+    results = OrderedDict()
+    for bench in get_benchmarks(pattern):
+        results[bench.name] = bench.run(rounds, min_time)
+        if callback:
+            callback(bench.name, results[bench.name])
+    return {
+        "nio": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "rounds": rounds,
+        "min_time": min_time,
+        "benchmarks": results
+    }
+
+
+def compare_results(results, baseline, threshold=0.1):
+    """ Compare benchmark results to a baseline
+
+    Benchmarks are compared on their median time per operation.
+
+    Args:
+        results (dict): Results as returned by run_benchmarks
+        baseline (dict): Earlier results, usually loaded from a JSON file
+        threshold (float): Relative change under which a benchmark is
+            considered unchanged, 0.1 meaning 10%
+
+    Returns:
+        list: a dict per benchmark with its "name", "baseline" and "current"
+            median times, the relative "change" and a "status", one of
+            regression, improvement, unchanged, new or missing
+    """
+    current = results["benchmarks"]
+    previous = baseline["benchmarks"]
+    comparison = []
+    for name in list(current) + [name for name in previous
+                                 if name not in current]:
+        current_time = current[name]["median"] if name in current else None
+        baseline_time = previous[name]["median"] if name in previous \
+            else None
+        change = None
+        if current_time is None:
+            status = "missing"
+        elif baseline_time is None:
+            status = "new"
+        else:
+            change = (current_time - baseline_time) / baseline_time
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+            else:
+                status = "unchanged"
+        comparison.append({
+            "name": name,
+            "baseline": baseline_time,
+            "current": current_time,
+            "change": change,
+            "status": status
+        })
+    return comparison
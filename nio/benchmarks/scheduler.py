@@ -0,0 +1,56 @@
+""" Scheduling, cancelling and firing scheduler jobs
+
+The benchmarks use their own scheduler instance and run its pending tasks
+directly, without the scheduler thread, so the scheduler module does not
+need to be initialized.
+"""
+from datetime import timedelta
+from threading import Event
+
+from nio.benchmarks import benchmark
+from nio.util.runner import RunnerStatus
+from nio.util.scheduler.scheduler import SchedulerRunner
+
+
+# Jobs scheduled by each call
+BATCH_SIZE = 100
+
+
+def _scheduler():
+    scheduler = SchedulerRunner()
+    scheduler.status = RunnerStatus.started
+    return scheduler
+
+
+def _noop():
+    pass
+
+
+@benchmark("scheduler.schedule_cancel", operations=BATCH_SIZE)
+def schedule_cancel():
+    scheduler = _scheduler()
+    delta = timedelta(seconds=60)
+
+    def schedule_cancel_jobs():
+        jobs = [scheduler.schedule_task(_noop, delta, False)
+                for _ in range(BATCH_SIZE)]
+        for job in jobs:
+            scheduler.unschedule(job)
+    return schedule_cancel_jobs
+
+
+@benchmark("scheduler.schedule_fire", operations=BATCH_SIZE)
+def schedule_fire():
+    scheduler = _scheduler()
+    delta = timedelta()
+    fired = Event()
+
+    def schedule_fire_jobs():
+        for _ in range(BATCH_SIZE - 1):
+            scheduler.schedule_task(_noop, delta, False)
+        scheduler.schedule_task(fired.set, delta, False)
+        scheduler._execute_pending_tasks()
+        # jobs run in their own threads, wait for the last one
+        fired.wait()
+        fired.clear()
+    return schedule_fire_jobs
@@ -0,0 +1,29 @@
+""" Signal serialization """
+from nio.benchmarks import benchmark
+from nio.signal.base import Signal
+
+
+_SIGNAL_DATA = {
+    "id": 1,
+    "name": "sensor",
+    "value": 21.5,
+    "tags": ["a", "b", "c"],
+    "location": {"lat": 40.0, "lng": -105.0},
+    "_hidden": True
+}
+
+
+@benchmark("signal.to_dict")
+def to_dict():
+    return Signal(_SIGNAL_DATA).to_dict
+
+
+@benchmark("signal.to_dict.include_hidden")
+def to_dict_include_hidden():
+    signal = Signal(_SIGNAL_DATA)
+    return lambda: signal.to_dict(include_hidden=True)
+
+
+@benchmark("signal.from_dict")
+def from_dict():
+    return lambda: Signal(_SIGNAL_DATA)
@@ -0,0 +1,48 @@
+""" Checking and changing runner statuses
+
+Blocks statuses are checked for every receiver of every notification, and
+changed with a callback every time a runner is configured, started or
+stopped.
+"""
+from nio.benchmarks import benchmark
+from nio.util.flags_enum import FlagsEnum
+from nio.util.runner import RunnerStatus
+
+
+def _noop(old_status, new_status):
+    pass
+
+
+@benchmark("status.is_set")
+def is_set():
+    status = FlagsEnum(RunnerStatus, RunnerStatus.started)
+    return lambda: status.is_set(RunnerStatus.error)
+
+
+@benchmark("status.name")
+def name():
+    status = FlagsEnum(RunnerStatus, RunnerStatus.started)
+    status.add(RunnerStatus.warning)
+    return lambda: status.name
+
+
+@benchmark("status.replace", operations=2)
+def replace():
+    status = FlagsEnum(RunnerStatus, RunnerStatus.started,
+                       status_change_callback=_noop)
+
+    def replace_back_and_forth():
+        status.replace(RunnerStatus.started, RunnerStatus.stopping)
+        status.replace(RunnerStatus.stopping, RunnerStatus.started)
+    return replace_back_and_forth
+
+
+@benchmark("status.add_remove", operations=2)
+def add_remove():
+    status = FlagsEnum(RunnerStatus, RunnerStatus.started,
+                       status_change_callback=_noop)
+
+    def add_remove_warning():
+        status.add(RunnerStatus.warning)
+        status.remove(RunnerStatus.warning)
+    return add_remove_warning
@@ -0,0 +1,90 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from os import path
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest.mock import MagicMock, patch
+
+from nio.benchmarks.__main__ import main
+from nio.benchmarks.runner import Benchmark, compare_results, \
+    get_benchmarks, run_benchmarks
+from nio.testing.test_case import NIOTestCaseNoModules
+from nio.util.codec import load_json
+
+
+def _results(**medians):
+    return {"benchmarks": {name: {"median": median}
+                           for name, median in medians.items()}}
+
+
+class TestBenchmarks(NIOTestCaseNoModules):
+
+    def test_all_benchmarks_run(self):
+        """ Every registered benchmark runs and reports its timings """
+        names = [bench.name for bench in get_benchmarks()]
+        for area in ["router", "evaluator", "property_value", "signal",
+                     "scheduler", "matching", "codec", "status"]:
+            self.assertTrue(any(name.startswith(area) for name in names))
+        results = run_benchmarks(rounds=1, min_time=0)
+        self.assertEqual(list(results["benchmarks"]), names)
+        for result in results["benchmarks"].values():
+            self.assertEqual(result["calls"], 1)
+            self.assertGreater(result["median"], 0)
+
+    def test_filter(self):
+        """ Benchmarks can be selected by name """
+        names = [bench.name for bench in get_benchmarks("^matching\\.")]
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(name.startswith("matching.") for name in names))
+
+    def test_run(self):
+        """ Benchmarks time the operation returned by their setup """
+        operation = MagicMock()
+        cleanup = MagicMock()
+        bench = Benchmark("test", lambda: (operation, cleanup), operations=2)
+        result = bench.run(rounds=3, min_time=0)
+        self.assertEqual(result["calls"], 1)
+        self.assertEqual(result["operations"], 2)
+        # calibration then three rounds
+        self.assertEqual(operation.call_count, 4)
+        cleanup.assert_called_once_with()
+        self.assertLessEqual(result["best"], result["median"])
+
+    def test_compare(self):
+        """ Results are compared to a baseline on their median times """
+        comparison = compare_results(
+            _results(same=1.0, slower=1.5, faster=0.5, new=1.0),
+            _results(same=1.05, slower=1.0, faster=1.0, removed=1.0))
+        self.assertEqual(
+            [(entry["name"], entry["status"]) for entry in comparison],
+            [("same", "unchanged"), ("slower", "regression"),
+             ("faster", "improvement"), ("new", "new"),
+             ("removed", "missing")])
+        self.assertAlmostEqual(comparison[1]["change"], 0.5)
+        self.assertIsNone(comparison[3]["change"])
+
+    def test_main_save_and_compare(self):
+        """ Results are saved as baselines and compared against them """
+        directory = mkdtemp()
+        self.addCleanup(rmtree, directory)
+        baseline_path = path.join(directory, "baseline.json")
+        args = ["-k", "^signal\\.from_dict$", "--rounds", "1",
+                "--min-time", "0"]
+        with redirect_stdout(StringIO()):
+            self.assertEqual(main(args + ["--save", baseline_path]), 0)
+        baseline = load_json(baseline_path)
+        self.assertEqual(list(baseline["benchmarks"]), ["signal.from_dict"])
+
+        # a much slower run is a regression
+        baseline["benchmarks"]["signal.from_dict"]["median"] = 1e-12
+        with patch("nio.benchmarks.__main__.load_json",
+                   return_value=baseline), \
+                redirect_stdout(StringIO()) as output:
+            self.assertEqual(main(args + ["--compare", baseline_path]), 1)
+        self.assertIn("regression", output.getvalue())
+
+    def test_main_missing_baseline(self):
+        """ Comparing to a baseline that doesn't exist fails """
+        with redirect_stdout(StringIO()), \
+                patch("sys.stderr", new_callable=StringIO):
+            self.assertEqual(main(["--compare", "/does/not/exist.json"]), 2)
@@ -4,6 +4,7 @@ A block contains modular functionality to be used inside of Services. To create
 a custom block, extend this Block class and override the appropriate methods.
 """
 from collections import defaultdict
+from copy import deepcopy
 from inspect import getargspec
 
 from nio.block.context import BlockContext
@@ -33,6 +34,11 @@ class Base(PropertyHolder, CommandHolder, Runner):
     log_level = SelectProperty(enum=LogLevel,
                                title="Log Level", default="NOTSET", advanced=True)
 
+    # Blocks that only ever notify Signal instances can set this to True so
+    # that the router skips checking the type of every signal they notify,
+    # see the router's "trusted_signal_check" setting
+    trusted_producer = False
+
     def __init__(self, status_change_callback=None):
         """ Create a new block instance.
 
@@ -58,10 +64,15 @@ class Base(PropertyHolder, CommandHolder, Runner):
         self._service_id = None
         self._service_name = None
         self._mgmt_signal_handler = None
-        self._default_input = Terminal.get_default_terminal_on_class(
+        # terminal metadata is built once per block class and shared
+        inputs = Terminal.get_terminal_metadata(
             self.__class__, TerminalType.input)
-        self._default_output = Terminal.get_default_terminal_on_class(
+        outputs = Terminal.get_terminal_metadata(
             self.__class__, TerminalType.output)
+        self._default_input = inputs.default
+        self._default_output = outputs.default
+        self._input_ids = inputs.ids
+        self._output_ids = outputs.ids
         self._process_signal_includes_input_id = \
             len(getargspec(self.process_signal).args) == 3
         self._messages = defaultdict(str)
@@ -235,6 +246,48 @@ class Base(PropertyHolder, CommandHolder, Runner):
 
         self._block_router.notify_signals(self, signals, output_id)
 
+    def downstream_capacity(self, output_id=None):
+        """Returns how many more signals the blocks downstream can take.
+
+        Source blocks, i.e. polling an external system, can use it to slow
+        down when downstream blocks are not keeping up instead of having
+        signals pile up in queues:
+
+            capacity = self.downstream_capacity()
+            if capacity is not None and capacity < len(signals):
+                # back off and poll less often
+                ...
+
+        Args:
+            output_id: The output signals would be notified on, all outputs
+                of the block when None
+
+        Returns:
+            int: credits left to the most loaded block downstream, None when
+                the router does not do flow control (see the router
+                "max_in_flight" setting)
+        """
+        return self._block_router.downstream_capacity(self, output_id)
+
+    def wait_for_capacity(self, credits=1, output_id=None, timeout=None):
+        """Waits until the blocks downstream can take 'credits' more signals.
+
+        Coroutine blocks should wait in an executor, i.e. through
+        'loop.run_in_executor', not to hold up their event loop.
+
+        Args:
+            credits (int): Number of signals about to be notified
+            output_id: The output signals are to be notified on, all outputs
+                of the block when None
+            timeout (float): Seconds to wait at most, None to wait as long
+                as needed
+
+        Returns:
+            bool: False if the timeout expired before credits were available
+        """
+        return self._block_router.wait_for_capacity(
+            self, credits, output_id, timeout)
+
     def notify_management_signal(self, signal):
         """Notify a management signal to router.
 
@@ -318,16 +371,22 @@ class Base(PropertyHolder, CommandHolder, Runner):
     def get_description(cls):
         """ Get a dictionary description of this block.
 
+        The description is computed the first time it is requested and
+        cached on the block class, callers get a copy of it.
+
         Returns:
             dict: A dictionary containing the blocks properties and commands
         """
-        properties = super().get_description()
-        commands = cls.get_command_description()
+        description_attr = "{0}_description".format(cls.__name__)
+        if description_attr not in cls.__dict__:
+            properties = super().get_description()
+            commands = cls.get_command_description()
 
-        return {
-            'properties': properties,
-            'commands': commands
-        }
+            setattr(cls, description_attr, {
+                'properties': properties,
+                'commands': commands
+            })
+        return deepcopy(getattr(cls, description_attr))
 
     def properties(self):
         """ Returns block runtime properties """
@@ -352,7 +411,7 @@ class Base(PropertyHolder, CommandHolder, Runner):
         Returns:
             bool: True if the input ID exists on this block
         """
-        return input_id in [i.id for i in self.__class__.inputs()]
+        return input_id in self._input_ids
 
     def is_output_valid(self, output_id):
         """ Find out if output is valid
@@ -363,7 +422,7 @@ class Base(PropertyHolder, CommandHolder, Runner):
         Returns:
             bool: True if the output ID exists on this block
         """
-        return output_id in [o.id for o in self.__class__.outputs()]
+        return output_id in self._output_ids
 
     def label(self, include_id=False):
         """ Provides a label to a block based on name and id properties
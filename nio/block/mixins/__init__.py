@@ -1,6 +1,10 @@
 from nio.block.mixins.collector.collector import Collector
 from nio.block.mixins.enrich.enrich_signals import EnrichSignals
 from nio.block.mixins.group_by.group_by import GroupBy
+from nio.block.mixins.limit_concurrency.limit_concurrency import \
+    LimitConcurrency
 from nio.block.mixins.limit_lock.limit_lock import LimitLock
 from nio.block.mixins.persistence.persistence import Persistence
+from nio.block.mixins.process_pool.process_pool import ProcessPool
+from nio.block.mixins.rate_limit.rate_limit import RateLimit
 from nio.block.mixins.retry.retry import Retry
@@ -1,7 +1,10 @@
 from collections import defaultdict
-from threading import Lock
+from sys import getsizeof
+from threading import Lock, RLock
+from nio.properties import IntProperty
 from nio.properties.timedelta import TimeDeltaProperty
 from nio.modules.scheduler import Job
+from nio.signal.overlay import OverlaySignal
 
 
 class Collector(object):
@@ -17,17 +20,34 @@ class Collector(object):
 
     By setting the collect property to 0, notifying signals will happen
     immediately, as if this mixin wasn't even included.
+
+    The signals collected for an output can also be bounded through the
+    `collect_max_count` and `collect_max_bytes` properties, the output is
+    flushed as soon as one of them is reached, without waiting for the
+    collection window to finish.
     """
 
     collect = TimeDeltaProperty(
         title='Collect Timeout', default={"seconds": 1}, advanced=True, order=100
     )
+    collect_max_count = IntProperty(
+        title='Max Collected Signals', default=0, advanced=True, order=101)
+    collect_max_bytes = IntProperty(
+        title='Max Collected Bytes', default=0, advanced=True, order=102)
 
     def __init__(self):
         super().__init__()
         self._collect_job = None
+        # Guards the buffers, only held while adding or swapping signals
         self._collect_lock = Lock()
+        # Held while notifying flushed signals so that flushes are notified
+        # in the same order they were taken out of the buffers. Reentrant
+        # since blocks downstream may notify signals back to this block
+        # while a flush is notified, and flush them in turn
+        self._flush_lock = RLock()
         self._sigs_out = defaultdict(list)
+        self._bytes_out = defaultdict(int)
+        self._flush_stats = defaultdict(lambda: defaultdict(int))
 
     def start(self):
         # Start the collection job, if we want to be collecting
@@ -43,24 +63,80 @@ class Collector(object):
     def notify_signals(self, signals, output_id=None):
         """Override the notify signals call to keep collecting"""
         if self._are_we_collecting():
+            max_count = self.collect_max_count()
+            max_bytes = self.collect_max_bytes()
+            flush_reason = None
             with self._collect_lock:
-                self._sigs_out[output_id].extend(signals)
+                output_sigs = self._sigs_out[output_id]
+                output_sigs.extend(signals)
+                if max_bytes > 0:
+                    self._bytes_out[output_id] += sum(
+                        self._signal_size(signal) for signal in signals)
+                    if self._bytes_out[output_id] >= max_bytes:
+                        flush_reason = "bytes"
+                if 0 < max_count <= len(output_sigs):
+                    flush_reason = "count"
+            if flush_reason:
+                self._flush_output(output_id, flush_reason)
         else:
             super().notify_signals(signals, output_id)
 
+    def collector_stats(self):
+        """Return flush metrics for every output signals were collected on.
+
+        Returns:
+            dict: keyed by output id, each value holding the number of
+                'signals' notified and the number of 'flushes' performed,
+                along with how many of those were triggered by the collection
+                window ('timed'), by the signal count ('count') or by the
+                signals size ('bytes')
+        """
+        with self._collect_lock:
+            return {output_id: dict(stats)
+                    for output_id, stats in self._flush_stats.items()}
+
     def _are_we_collecting(self):
         """Return True if we should be collecting signals"""
         return self.collect().total_seconds() > 0
 
+    @staticmethod
+    def _signal_size(signal):
+        """Approximate size in bytes of a signal and its attribute values"""
+        if isinstance(signal, OverlaySignal):
+            # attributes are shared with the signal the overlay is based on
+            values = signal.to_dict(include_hidden=True).values()
+        else:
+            values = signal.__dict__.values()
+        return getsizeof(signal) + sum(getsizeof(value) for value in values)
+
     def _dump_signals(self):
         """Notify any signals we have collected this window.
 
         This gets called by the scheduled Job.
         """
-        with self._collect_lock:
-            for output_id, output_sigs in self._sigs_out.items():
-                if len(output_sigs):
-                    # Notify the signals for this output ID then
-                    # remove the signals from the list
-                    super().notify_signals(output_sigs, output_id)
-                    del output_sigs[:]
+        with self._flush_lock:
+            with self._collect_lock:
+                sigs_out = self._sigs_out
+                self._sigs_out = defaultdict(list)
+                self._bytes_out = defaultdict(int)
+            self._notify_flushed(sigs_out, "timed")
+
+    def _flush_output(self, output_id, reason):
+        """Notify the signals collected for an output right away."""
+        with self._flush_lock:
+            with self._collect_lock:
+                output_sigs = self._sigs_out.pop(output_id, None)
+                self._bytes_out.pop(output_id, None)
+            if output_sigs:
+                self._notify_flushed({output_id: output_sigs}, reason)
+
+    def _notify_flushed(self, sigs_out, reason):
+        """Notify flushed signals, must be called holding the flush lock."""
+        for output_id, output_sigs in sigs_out.items():
+            if len(output_sigs):
+                with self._collect_lock:
+                    stats = self._flush_stats[output_id]
+                    stats["flushes"] += 1
+                    stats[reason] += 1
+                    stats["signals"] += len(output_sigs)
+                super().notify_signals(output_sigs, output_id)
@@ -3,6 +3,7 @@ from datetime import timedelta
 from nio.block.mixins.collector.collector import Collector
 from nio.block.base import Block
 from nio.signal.base import Signal
+from nio.signal.overlay import OverlaySignal
 from nio.testing.block_test_case import NIOBlockTestCase
 
 
@@ -83,3 +84,103 @@ class TestCollector(NIOBlockTestCase):
         self.assert_num_signals_notified(4, block, 'output1')
         # No more should have been notified on the second output
         self.assert_num_signals_notified(1, block, 'output2')
+
+    def test_max_count_flush(self):
+        """Collected signals are flushed as soon as max count is reached"""
+        block = CollectingBlock()
+        self.configure_block(block, {
+            "collect": {'seconds': 2},
+            "collect_max_count": 3
+        })
+        with patch('nio.block.mixins.collector.collector.Job'):
+            block.start()
+        block.notify_signals([Signal(), Signal()], 'output1')
+        block.notify_signals([Signal()], 'output2')
+        self.assert_num_signals_notified(0)
+        # Third signal on output1 reaches the limit
+        block.notify_signals([Signal()], 'output1')
+        self.assert_num_signals_notified(3, block, 'output1')
+        self.assert_num_signals_notified(0, block, 'output2')
+        # The timed dump notifies whatever is left
+        block._dump_signals()
+        self.assert_num_signals_notified(3, block, 'output1')
+        self.assert_num_signals_notified(1, block, 'output2')
+        self.assertDictEqual(block.collector_stats(), {
+            'output1': {'flushes': 1, 'count': 1, 'signals': 3},
+            'output2': {'flushes': 1, 'timed': 1, 'signals': 1}
+        })
+        block.stop()
+
+    def test_max_bytes_flush(self):
+        """Collected signals are flushed as soon as max bytes is reached"""
+        block = CollectingBlock()
+        signal_size = CollectingBlock._signal_size(Signal({"a": "value"}))
+        self.configure_block(block, {
+            "collect": {'seconds': 2},
+            "collect_max_bytes": signal_size * 2
+        })
+        with patch('nio.block.mixins.collector.collector.Job'):
+            block.start()
+        block.notify_signals([Signal({"a": "value"})])
+        self.assert_num_signals_notified(0)
+        block.notify_signals([Signal({"a": "value"})])
+        self.assert_num_signals_notified(2)
+        self.assertEqual(block.collector_stats()[None]['bytes'], 1)
+        # Byte count starts over after flushing
+        block.notify_signals([Signal({"a": "value"})])
+        self.assert_num_signals_notified(2)
+        block.stop()
+
+    def test_flush_does_not_block_producers(self):
+        """Signals can be collected while a flush is being notified"""
+        block = CollectingBlock()
+        self.configure_block(block, {
+            "collect": {'seconds': 2}
+        })
+        with patch('nio.block.mixins.collector.collector.Job'):
+            block.start()
+
+        def notify_while_flushing(signals, output_id=None):
+            # The collect lock is free while notifying
+            self.assertTrue(block._collect_lock.acquire(blocking=False))
+            block._collect_lock.release()
+            block.notify_signals([Signal()])
+
+        block.notify_signals([Signal()])
+        with patch.object(Block, 'notify_signals',
+                          side_effect=notify_while_flushing) as notify:
+            block._dump_signals()
+            self.assertEqual(notify.call_count, 1)
+        # The signal collected while flushing waits for the next window
+        self.assertEqual(len(block._sigs_out[None]), 1)
+        block.stop()
+
+    def test_overlay_signal_size(self):
+        """Overlay signals count the attributes of their base signal"""
+        base = Signal({"a": "value" * 100})
+        overlay = OverlaySignal(base, {"b": "other"})
+        self.assertGreater(CollectingBlock._signal_size(overlay),
+                           CollectingBlock._signal_size(base))
+
+    def test_flush_reentrant(self):
+        """Signals notified back to the block while flushing are flushed"""
+        block = CollectingBlock()
+        self.configure_block(block, {
+            "collect": {'seconds': 2},
+            "collect_max_count": 2
+        })
+        with patch('nio.block.mixins.collector.collector.Job'):
+            block.start()
+        flushed = []
+
+        def notify_back(signals, output_id=None):
+            # a downstream block notifying to this block again
+            flushed.append(len(signals))
+            if len(flushed) == 1:
+                block.notify_signals([Signal(), Signal()])
+
+        with patch.object(Block, 'notify_signals',
+                          side_effect=notify_back):
+            block.notify_signals([Signal(), Signal()])
+        self.assertEqual(flushed, [2, 2])
+        block.stop()
@@ -1,5 +1,7 @@
 from copy import deepcopy
 from nio.signal.base import Signal
+from nio.signal.overlay import OverlaySignal
+from nio.signal.trace import propagate_trace
 from nio.properties import StringProperty, BoolProperty, \
     ObjectProperty, PropertyHolder
 
@@ -15,7 +17,8 @@ class EnrichSignals(object):
                             default=EnrichProperties(), order=100,
                             advanced=True)
 
-    def get_output_signal(self, signal_data, incoming_signal, copy=False):
+    def get_output_signal(self, signal_data, incoming_signal, copy=False,
+                          overlay=False):
         """ Get an output signal based on the block configuration.
 
         This method will return a single Signal that consists of the fields
@@ -30,15 +33,23 @@ class EnrichSignals(object):
                 particular operation
             copy (bool): Whether or not to perform a deep copy on the
                 incoming signal before operating on it
+            overlay (bool): Whether to layer the signal data over the
+                incoming signal instead, sharing its attributes rather than
+                copying them. Takes precedence over copy
 
         Returns:
             sig (Signal): A single Signal formatted according to the block
         """
         if self.enrich(incoming_signal).exclude_existing(incoming_signal):
             # This is the easy case, we don't want any of the previous data
-            return Signal(signal_data)
+            new_sig = Signal(signal_data)
+            propagate_trace(incoming_signal, new_sig)
+            return new_sig
 
-        if copy:
+        if overlay:
+            new_sig = OverlaySignal(incoming_signal)
+            propagate_trace(incoming_signal, new_sig)
+        elif copy:
             new_sig = deepcopy(incoming_signal)
         else:
             new_sig = incoming_signal
@@ -55,7 +66,7 @@ class EnrichSignals(object):
         return new_sig
 
     def notify_output_signals(self, signals_data, incoming_signal,
-                              copy=True, output_id=None):
+                              copy=True, output_id=None, overlay=False):
         """ A helper method to notify signals after properly enriching them.
 
         This method will call self.notify_signals on the block's behalf. It
@@ -76,10 +87,15 @@ class EnrichSignals(object):
             copy (bool): Whether or not to perform a deep copy on the
                 incoming signal before operating on it.
             output_id (str): The output ID to notify signals to
+            overlay (bool): Whether to layer the signal data over the
+                incoming signal instead of copying it. Output signals then
+                share the incoming signal's attributes, which must not be
+                modified in place downstream.
         """
         if not isinstance(signals_data, list):
             signals_data = [signals_data]
 
         self.notify_signals([
-            self.get_output_signal(signal_data, incoming_signal, copy=copy)
+            self.get_output_signal(signal_data, incoming_signal, copy=copy,
+                                   overlay=overlay)
             for signal_data in signals_data], output_id)
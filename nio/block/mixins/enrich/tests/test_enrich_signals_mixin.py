@@ -1,6 +1,7 @@
 from nio.block.mixins.enrich.enrich_signals import EnrichSignals
 from nio.block.base import Block, DEFAULT_TERMINAL
 from nio.signal.base import Signal
+from nio.signal.trace import TraceContext, get_trace, set_trace
 from nio.testing.block_test_case import NIOBlockTestCase
 
 
@@ -92,6 +93,45 @@ class TestEnrichSignals(NIOBlockTestCase):
         # the incoming signal was copied
         self.assertNotEqual(incoming_signal, out_sig)
 
+    def test_overlay(self):
+        """ Make sure output signals can share the incoming signal """
+        blk = EnrichingBlock()
+        self.set_up_block(blk, False, '')
+        incoming_signal = Signal({
+            'key1': 'val1',
+            'key2': 'val2'
+        })
+
+        blk.notify_output_signals([{'key2': 'new val2'}, {'num': 2}],
+                                  incoming_signal, overlay=True)
+        out_sigs = self.last_notified[DEFAULT_TERMINAL]
+        self.assertDictEqual(out_sigs[0].to_dict(), {
+            'key1': 'val1',
+            'key2': 'new val2'
+        })
+        self.assertDictEqual(out_sigs[1].to_dict(), {
+            'key1': 'val1',
+            'key2': 'val2',
+            'num': 2
+        })
+        # The incoming signal was not modified
+        self.assertDictEqual(incoming_signal.to_dict(), {
+            'key1': 'val1',
+            'key2': 'val2'
+        })
+
+    def test_trace_propagated(self):
+        """ Make sure output signals keep the incoming signal's trace """
+        incoming_signal = Signal({'key1': 'val1'})
+        trace = TraceContext("trace", (("block", 0),))
+        set_trace(incoming_signal, trace)
+        for exclude, overlay in [(True, False), (False, False),
+                                 (False, True)]:
+            blk = EnrichingBlock()
+            self.set_up_block(blk, exclude, '')
+            out_sig = blk.get_output_signal({'a': 1}, incoming_signal,
+                                            copy=True, overlay=overlay)
+            self.assertIs(get_trace(out_sig), trace)
 
     def test_notified(self):
         """ Make sure we notify the signals properly """
@@ -1,12 +1,21 @@
 from copy import copy
-from collections import defaultdict, Hashable
-from nio.properties import Property
+from collections import defaultdict, Hashable, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from nio.modules.scheduler import Job
+from nio.properties import Property, IntProperty, TimeDeltaProperty
 from nio.util.ensure_types import ensure_list
 from nio.command import command
 from nio.command.holder import CommandHolder
 
 
+# Number of group locks created for every group worker
+_LOCKS_PER_WORKER = 4
+
+
 @command("groups", method='_groups_command')
+@command("group_stats")
 class GroupBy(CommandHolder):
 
     """ Use this base class to extend block functionality to groups of signals
@@ -25,16 +34,77 @@ class GroupBy(CommandHolder):
     grouping all incoming signals and processing them independently by not
     overriding process_signals but instead overriding process_group_signals.
 
+    The groups the block keeps track of can be bounded, least recently seen
+    groups are evicted when there are more than 'max_groups' of them, and
+    groups that haven't been seen for 'group_expiration' are evicted too.
+    Override on_group_evicted to free any state kept for a group.
+
+    Groups are processed one after the other on the calling thread unless
+    'group_workers' is greater than 1, in which case each group is handed to
+    a pool of that many threads. A group is never processed by two threads
+    at the same time, and results keep the order in which groups appear in
+    the signals. Targets must not call for_each_group themselves in this
+    mode, as they would be waiting on the same pool they are running on.
+
     Properties:
         group_by: The expression by which signals will be grouped.
+        max_groups: Maximum number of groups to keep track of, 0 means
+            no limit.
+        group_expiration: How long a group is kept after its last signal,
+            0 means groups never expire.
+        group_workers: Number of threads processing groups in parallel,
+            0 or 1 process groups on the calling thread.
 
     """
 
     group_by = Property(title="Group By", default=None, order=100, allow_none=True)
+    max_groups = IntProperty(
+        title="Max Groups", default=0, advanced=True, order=101)
+    group_expiration = TimeDeltaProperty(
+        title="Group Expiration", default={"seconds": 0}, advanced=True,
+        order=102)
+    group_workers = IntProperty(
+        title="Group Workers", default=0, advanced=True, order=103)
 
     def __init__(self):
         super().__init__()
         self._groups = set()
+        # Last time each group was seen, least recently seen groups first.
+        # Only maintained when groups are bounded
+        self._groups_last_seen = OrderedDict()
+        self._groups_lock = Lock()
+        self._groups_evicted = 0
+        self._expire_groups_job = None
+        self._group_executor = None
+        self._group_locks = None
+
+    def configure(self, context):
+        super().configure(context)
+        group_workers = self.group_workers()
+        if group_workers > 1:
+            self._group_executor = ThreadPoolExecutor(
+                max_workers=group_workers,
+                thread_name_prefix="{}-groups".format(self.label()))
+            # Groups share a fixed number of locks instead of one lock per
+            # group so that locks don't need to be evicted along with groups
+            self._group_locks = [
+                Lock() for _ in range(group_workers * _LOCKS_PER_WORKER)]
+
+    def start(self):
+        super().start()
+        # Expire groups periodically so that idle blocks release them too
+        if self._group_expiration_seconds() > 0:
+            self._expire_groups_job = Job(
+                self._expire_groups, self.group_expiration(), True)
+
+    def stop(self):
+        if self._expire_groups_job:
+            self._expire_groups_job.cancel()
+            self._expire_groups_job = None
+        if self._group_executor is not None:
+            self._group_executor.shutdown(wait=True)
+            self._group_executor = None
+        super().stop()
 
     def for_each_group(self, target, signals=None, *args, **kwargs):
         """ Execute a function once for every group
@@ -42,7 +112,7 @@ class GroupBy(CommandHolder):
         If signals are provided, the target function will only be called
         for groups that appear in the provided signals. If signals are omitted,
         the function will be called for every group that has ever been
-        processed in this block.
+        processed in this block and has not been evicted.
 
         Note that the required template for 'target' depends on
         whether or not signals are provided for grouping.
@@ -60,15 +130,23 @@ class GroupBy(CommandHolder):
                 output list will be a concatenation of results.
                 So [Signal, Signal, Signal] not [[Signal, Signal],[Signal]]]
         """
+        # the block may stop, and let go of the pool, at any time
+        executor = self._group_executor
+        if executor is not None:
+            return self._for_each_group_parallel(
+                executor, target, signals, *args, **kwargs)
+
         output = []
         # if there are no signals, assume that the target function has
         # only one parameter, the group key
         if signals is None:
+            if self._group_expiration_seconds() > 0:
+                self._expire_groups()
             # We are going to map each group key over the target function
             # and produce the output along the way.
             # We need to send a copy of self._groups so that in case the target
             # function alters the groups list it doesn't affect iteration
-            for group in copy(self._groups):
+            for group in self.groups():
                 result = target(group, *args, **kwargs)
                 if result:
                     output.extend(ensure_list(result))
@@ -83,6 +161,58 @@ class GroupBy(CommandHolder):
 
         return output
 
+    def _for_each_group_parallel(self, executor, target, signals, *args,
+                                 **kwargs):
+        """ Run for_each_group dispatching every group to the worker pool
+
+        Calls for the same group never run at the same time, even across
+        concurrent for_each_group calls, and results are concatenated in
+        the order groups were found, regardless of which call finishes first.
+        Groups left when the pool is shut down, i.e. the block stopped, are
+        processed on the calling thread.
+        """
+        if signals is None:
+            if self._group_expiration_seconds() > 0:
+                self._expire_groups()
+            calls = [(group, (group,)) for group in self.groups()]
+        else:
+            calls = [(group, (group_sigs, group)) for group, group_sigs in
+                     self._group_signals(signals).items()]
+
+        if len(calls) == 1:
+            # Not worth handing a single group over to the pool
+            group, target_args = calls[0]
+            results = [self._call_group_target(
+                group, target, target_args + args, kwargs)]
+        else:
+            futures = []
+            try:
+                for group, target_args in calls:
+                    futures.append(executor.submit(
+                        self._call_group_target,
+                        group, target, target_args + args, kwargs))
+            except RuntimeError:
+                # the pool was shut down
+                pass
+            # Raises the exception of the first failing group, if any
+            results = [future.result() for future in futures]
+            results.extend(
+                self._call_group_target(
+                    group, target, target_args + args, kwargs)
+                for group, target_args in calls[len(futures):])
+
+        output = []
+        for result in results:
+            if result:
+                output.extend(ensure_list(result))
+        return output
+
+    def _call_group_target(self, group, target, args, kwargs):
+        """ Call target for a group while holding the group's lock """
+        lock = self._group_locks[hash(group) % len(self._group_locks)]
+        with lock:
+            return target(*args, **kwargs)
+
     def process_signals(self, signals, input_id=None):
         """A convenient implementation of process signals for grouping blocks.
 
@@ -114,6 +244,34 @@ class GroupBy(CommandHolder):
         """
         raise NotImplementedError
 
+    def on_group_evicted(self, group):
+        """Override this method to release any state kept for a group.
+
+        Called whenever a group is evicted, either because 'max_groups' was
+        exceeded or because it expired. It is not called while holding the
+        groups lock, so it is safe to call other GroupBy methods from here.
+
+        Args:
+            group: The key of the group that was evicted
+        """
+        pass
+
+    def evict_group(self, group):
+        """ Stop keeping track of a group
+
+        Args:
+            group: The key of the group to evict
+
+        Returns:
+            bool: True if the group was being tracked
+        """
+        with self._groups_lock:
+            evicted = group in self._groups
+            self._remove_group(group)
+        if evicted:
+            self.on_group_evicted(group)
+        return evicted
+
     def _group_signals(self, signals):
         """ Groups the provided signals according to the configuration
 
@@ -125,25 +283,127 @@ class GroupBy(CommandHolder):
                 of the signals in that group
         """
         signal_groups = defaultdict(list)
-        for s in signals:
-            key = self.group_by(s)
+        try:
+            for s in signals:
+                key = self.group_by(s)
 
-            # Need to make sure that the key is a hashable object
-            if not isinstance(key, Hashable):
-                self.logger.warning(
-                    "{} is not hashable cannot be grouped by. Using str "
-                    "representation instead".format(key))
-                key = str(key)
+                # Need to make sure that the key is a hashable object
+                if not isinstance(key, Hashable):
+                    self.logger.warning(
+                        "{} is not hashable cannot be grouped by. Using str "
+                        "representation instead".format(key))
+                    key = str(key)
 
-            # Add the key to our set of groups and the signal to the list
-            # corresponding to the group
-            self._groups.add(key)
-            signal_groups[key].append(s)
+                signal_groups[key].append(s)
+        finally:
+            # Add the groups that were seen to our set of groups, even if
+            # grouping failed half way through
+            if self._are_groups_bounded():
+                self._touch_groups(signal_groups)
+            else:
+                with self._groups_lock:
+                    self._groups.update(signal_groups)
 
         return signal_groups
 
+    def _are_groups_bounded(self):
+        """ Returns True if groups are evicted by count or age """
+        return self.max_groups() > 0 or self._group_expiration_seconds() > 0
+
+    def _group_expiration_seconds(self):
+        return self.group_expiration().total_seconds()
+
+    def _touch_groups(self, groups):
+        """ Mark groups as just seen and evict any groups over the bounds """
+        now = monotonic()
+        with self._groups_lock:
+            for group in groups:
+                self._groups.add(group)
+                self._groups_last_seen[group] = now
+                self._groups_last_seen.move_to_end(group)
+            evicted = self._pop_evictable_groups(now)
+        for group in evicted:
+            self.on_group_evicted(group)
+
+    def _expire_groups(self):
+        """ Evict groups that haven't been seen within their expiration """
+        with self._groups_lock:
+            evicted = self._pop_evictable_groups(monotonic())
+        for group in evicted:
+            self.on_group_evicted(group)
+
+    def _pop_evictable_groups(self, now):
+        """ Remove groups over the bounds, must hold the groups lock
+
+        Returns:
+            list: The groups that were removed
+        """
+        evicted = []
+        max_groups = self.max_groups()
+        if max_groups > 0:
+            while len(self._groups_last_seen) > max_groups:
+                group, _ = self._groups_last_seen.popitem(last=False)
+                self._groups.discard(group)
+                evicted.append(group)
+        expiration = self._group_expiration_seconds()
+        if expiration > 0:
+            # Least recently seen groups come first, stop at the first one
+            # that hasn't expired
+            while self._groups_last_seen:
+                group, last_seen = \
+                    next(iter(self._groups_last_seen.items()))
+                if now - last_seen < expiration:
+                    break
+                self._remove_group(group)
+                evicted.append(group)
+        self._groups_evicted += len(evicted)
+        return evicted
+
+    def _remove_group(self, group):
+        self._groups.discard(group)
+        self._groups_last_seen.pop(group, None)
+
     def groups(self):
-        return self._groups
+        """ Returns a copy of the groups this block keeps track of """
+        with self._groups_lock:
+            return copy(self._groups)
+
+    def groups_serialize(self):
+        """ Returns the groups in a form suitable to be persisted
+
+        Blocks that also include the Persistence mixin can save this from
+        their persistence_serialize method and restore it through
+        groups_deserialize.
+
+        Returns:
+            list: group keys, least recently seen groups first
+        """
+        with self._groups_lock:
+            if self._groups_last_seen:
+                return list(self._groups_last_seen)
+            return list(self._groups)
+
+    def groups_deserialize(self, groups):
+        """ Restore groups saved through groups_serialize
+
+        Restored groups are considered seen at the time they are restored.
+
+        Args:
+            groups (list): group keys, least recently seen groups first
+        """
+        if self._are_groups_bounded():
+            self._touch_groups(groups)
+        else:
+            with self._groups_lock:
+                self._groups.update(groups)
+
+    def group_stats(self):
+        """ Returns metrics about the groups this block keeps track of """
+        return {
+            "count": len(self._groups),
+            "max_groups": self.max_groups(),
+            "evicted": self._groups_evicted
+        }
 
     def _groups_command(self):
-        return {"groups": list(self._groups)}
+        return {"groups": list(self.groups())}
@@ -1,4 +1,8 @@
-from unittest.mock import MagicMock
+from collections import defaultdict
+from datetime import timedelta
+from threading import current_thread, Event, Lock, Thread
+from time import sleep
+from unittest.mock import MagicMock, patch
 from nio.block.mixins.group_by.group_by import GroupBy
 from nio.block.base import Block, DEFAULT_TERMINAL
 from nio.signal.base import Signal
@@ -250,3 +254,216 @@ class TestGroupBy(NIOBlockTestCase):
             Signal({"group": 1, "value": 2})
         ])
         self.assertFalse(block.notify_signals.called)
+
+    def test_max_groups(self):
+        """ Least recently seen groups are evicted over max_groups """
+        block = GroupingBlock()
+        block.on_group_evicted = MagicMock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "max_groups": 2
+        })
+        block.process_signals([Signal({"group": 1}), Signal({"group": 2})])
+        block.process_signals([Signal({"group": 1})])
+        self.assertFalse(block.on_group_evicted.called)
+        # group 2 is the least recently seen one
+        block.process_signals([Signal({"group": 3})])
+        block.on_group_evicted.assert_called_once_with(2)
+        self.assertEqual(block.groups(), {1, 3})
+        self.assertEqual(block.groups_serialize(), [1, 3])
+        self.assertDictEqual(block.group_stats(), {
+            "count": 2,
+            "max_groups": 2,
+            "evicted": 1
+        })
+
+    def test_group_expiration(self):
+        """ Groups not seen within group_expiration are evicted """
+        block = GroupingBlock()
+        block.on_group_evicted = MagicMock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "group_expiration": {"seconds": 10}
+        })
+        with patch("nio.block.mixins.group_by.group_by.Job") as job_mock:
+            block.start()
+            job_mock.assert_called_once_with(
+                block._expire_groups, timedelta(seconds=10), True)
+        with patch("nio.block.mixins.group_by.group_by.monotonic",
+                   return_value=100):
+            block.process_signals([Signal({"group": 1})])
+        with patch("nio.block.mixins.group_by.group_by.monotonic",
+                   return_value=105):
+            block.process_signals([Signal({"group": 2})])
+            block._expire_groups()
+            self.assertFalse(block.on_group_evicted.called)
+        with patch("nio.block.mixins.group_by.group_by.monotonic",
+                   return_value=112):
+            # only expired groups are iterated over
+            self.assertEqual(block.for_each_group(lambda group: group), [2])
+            block.on_group_evicted.assert_called_once_with(1)
+        block.stop()
+        job_mock.return_value.cancel.assert_called_once_with()
+
+    def test_unbounded_groups_are_not_tracked(self):
+        """ Groups are not timestamped unless they are bounded """
+        block = GroupingBlock()
+        self.configure_block(block, {"group_by": "{{ $group }}"})
+        block.process_signals([Signal({"group": 1}), Signal({"group": 2})])
+        self.assertEqual(block.groups(), {1, 2})
+        self.assertEqual(len(block._groups_last_seen), 0)
+
+    def test_evict_group(self):
+        """ Groups can be evicted explicitly """
+        block = GroupingBlock()
+        block.on_group_evicted = MagicMock()
+        self.configure_block(block, {"group_by": "{{ $group }}"})
+        block.process_signals([Signal({"group": 1})])
+        self.assertTrue(block.evict_group(1))
+        self.assertFalse(block.evict_group(1))
+        block.on_group_evicted.assert_called_once_with(1)
+        self.assertEqual(block.groups(), set())
+
+    def test_groups_are_copies(self):
+        """ Groups can be iterated over while they change """
+        block = GroupingBlock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "max_groups": 10
+        })
+        block.process_signals([Signal({"group": 1})])
+        groups = block.groups()
+        groups.add(2)
+        self.assertEqual(block.groups(), {1})
+
+        def expire():
+            for _ in range(200):
+                for group in block._groups_command()["groups"]:
+                    block.evict_group(group)
+
+        thread = Thread(target=expire)
+        thread.start()
+        for group in range(200):
+            block.process_signals([Signal({"group": group})])
+            list(block.groups())
+        thread.join()
+        self.assertLessEqual(len(block.groups()), 10)
+
+    def test_groups_persistence(self):
+        """ Groups can be serialized and restored """
+        block = GroupingBlock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "max_groups": 2
+        })
+        block.groups_deserialize(["a", "b", "c"])
+        # restoring groups also respects max_groups
+        self.assertEqual(block.groups_serialize(), ["b", "c"])
+
+        unbounded_block = GroupingBlock()
+        self.configure_block(unbounded_block, {"group_by": "{{ $group }}"})
+        unbounded_block.groups_deserialize(["a", "b"])
+        self.assertEqual(sorted(unbounded_block.groups_serialize()),
+                         ["a", "b"])
+
+    def test_group_workers(self):
+        """ Groups are processed by a pool of workers, keeping their order """
+        block = GroupingBlock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "group_workers": 4
+        })
+        self.assertIsNotNone(block._group_executor)
+        processing_threads = set()
+        fast_done = Event()
+
+        def target(signals, group):
+            processing_threads.add(current_thread())
+            if group == "slow":
+                # the first group finishes after the others
+                fast_done.wait(1)
+            elif group == "fast":
+                fast_done.set()
+            return [s.value for s in signals]
+
+        out = block.for_each_group(target, [
+            Signal({"group": "slow", "value": 1}),
+            Signal({"group": "fast", "value": 2}),
+            Signal({"group": "slow", "value": 3}),
+            Signal({"group": "other", "value": 4})
+        ])
+        self.assertEqual(out, [1, 3, 2, 4])
+        self.assertNotIn(current_thread(), processing_threads)
+
+        # groups without signals are also dispatched
+        out = block.for_each_group(lambda group: group)
+        self.assertEqual(sorted(out), ["fast", "other", "slow"])
+
+        block.stop()
+        self.assertIsNone(block._group_executor)
+
+    def test_group_workers_exclusive_groups(self):
+        """ A group is never processed by two workers at the same time """
+        block = GroupingBlock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "group_workers": 4
+        })
+        in_progress = defaultdict(int)
+        overlaps = []
+        in_progress_lock = Lock()
+
+        def target(signals, group):
+            with in_progress_lock:
+                in_progress[group] += 1
+                if in_progress[group] > 1:
+                    overlaps.append(group)
+            sleep(0.001)
+            with in_progress_lock:
+                in_progress[group] -= 1
+
+        signals = [Signal({"group": i % 3}) for i in range(30)]
+        threads = [Thread(target=block.for_each_group,
+                          args=(target, signals)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(overlaps, [])
+        block.stop()
+
+    def test_group_workers_stopped(self):
+        """ Groups are processed inline once the pool is shut down """
+        block = GroupingBlock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "group_workers": 2
+        })
+        signals = [Signal({"group": 1}), Signal({"group": 2})]
+
+        def target(signals, group):
+            return [group]
+
+        # the pool shuts down after for_each_group got hold of it
+        block._group_executor.shutdown()
+        self.assertEqual(block.for_each_group(target, signals), [1, 2])
+        block.stop()
+        self.assertEqual(block.for_each_group(target, signals), [1, 2])
+
+    def test_group_workers_exception(self):
+        """ Exceptions in workers are raised to the caller """
+        block = GroupingBlock()
+        self.configure_block(block, {
+            "group_by": "{{ $group }}",
+            "group_workers": 2
+        })
+
+        def target(signals, group):
+            if group == 2:
+                raise ValueError
+            return signals
+
+        with self.assertRaises(ValueError):
+            block.for_each_group(target, [
+                Signal({"group": 1}), Signal({"group": 2})])
+        block.stop()
@@ -0,0 +1,207 @@
+from collections import deque
+from threading import Lock
+from time import monotonic
+from nio.properties import IntProperty, TimeDeltaProperty
+
+
+# Upper bounds, in seconds, of the wait time histogram buckets
+WAIT_TIME_BUCKETS = (0.001, 0.01, 0.1, 1, 10, float("inf"))
+
+
+class ExecutionQueueFull(Exception):
+    pass
+
+
+class ExecutionTimeout(Exception):
+    pass
+
+
+class ConcurrencyLimiter(object):
+
+    """ A fair semaphore with a bounded wait queue.
+
+    Up to 'permits' callers hold the limiter at the same time, the rest wait
+    in a FIFO queue of at most 'max_queued' callers. Permits are handed
+    directly to the caller that has been waiting the longest.
+
+    """
+
+    def __init__(self, permits, max_queued=None):
+        """ Create a new limiter
+
+        Args:
+            permits (int): How many callers can hold the limiter at once
+            max_queued (int): How many callers can wait for a permit, None
+                means no limit
+        """
+        if permits < 1:
+            raise ValueError("A limiter needs at least one permit")
+        self._lock = Lock()
+        self._permits = permits
+        self._available = permits
+        self._max_queued = max_queued
+        self._waiters = deque()
+        self._in_flight = 0
+        self._executed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_times = [0] * len(WAIT_TIME_BUCKETS)
+
+    def acquire(self, timeout=None):
+        """ Acquire a permit, waiting for one if none is available
+
+        Args:
+            timeout (float): Maximum seconds to wait for a permit, None waits
+                for as long as needed
+
+        Raises:
+            ExecutionQueueFull: If there are already max_queued callers
+                waiting for a permit
+            ExecutionTimeout: If no permit was handed over within timeout
+        """
+        with self._lock:
+            if self._available > 0 and not self._waiters:
+                self._available -= 1
+                self._in_flight += 1
+                self._record_wait(0)
+                return
+            if self._max_queued is not None and \
+                    len(self._waiters) >= self._max_queued:
+                self._rejected += 1
+                raise ExecutionQueueFull(
+                    "{} callers already waiting".format(len(self._waiters)))
+            # The waiter is released by whoever hands over its permit
+            waiter = Lock()
+            waiter.acquire()
+            self._waiters.append(waiter)
+
+        start = monotonic()
+        acquired = waiter.acquire(timeout=-1 if timeout is None else timeout)
+        with self._lock:
+            if not acquired:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    # The permit was handed over right after timing out
+                    acquired = True
+            if not acquired:
+                self._timed_out += 1
+                raise ExecutionTimeout(
+                    "No permit acquired within {} seconds".format(timeout))
+            self._record_wait(monotonic() - start)
+
+    def release(self):
+        """ Release a permit, handing it to the oldest waiter if any """
+        with self._lock:
+            self._executed += 1
+            if self._waiters:
+                # in flight count is unchanged, the permit changes hands
+                self._waiters.popleft().release()
+            else:
+                self._in_flight -= 1
+                self._available += 1
+
+    def stats(self):
+        """ Returns the limiter metrics
+
+        Returns:
+            dict: permits, in flight, queued, executed, rejected and timed
+                out callers, along with a histogram of the time callers
+                waited for a permit, keyed by bucket upper bound in seconds
+        """
+        with self._lock:
+            return {
+                "permits": self._permits,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "executed": self._executed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_time": {str(bound): count for bound, count in
+                              zip(WAIT_TIME_BUCKETS, self._wait_times)}
+            }
+
+    def _record_wait(self, wait_time):
+        """ Add a wait time to the histogram, must hold the lock """
+        for index, bound in enumerate(WAIT_TIME_BUCKETS):
+            if wait_time <= bound:
+                self._wait_times[index] += 1
+                return
+
+
+class LimitConcurrency(object):
+
+    """ A block mixin that limits how many executions run at the same time.
+
+    Unlike LimitLock, which lets a single execution run at a time, this
+    mixin lets up to `max_concurrency` executions run in parallel. Callers
+    over that limit wait for their turn in FIFO order. A bounded number of
+    callers can wait, optionally for a limited time, before being rejected.
+
+    How to use this mixin:
+        1. Call execute_with_limit with the method that you want to execute
+        and any arguments. The call blocks until the method can run.
+
+        2. Handle ExecutionQueueFull and ExecutionTimeout, raised when the
+        call was rejected.
+
+    Block parameters:
+        max_concurrency (int): Executions allowed to run at the same time
+        max_queued (int): Callers allowed to wait for their turn, a
+            negative number means there is no limit
+        queue_timeout (timedelta): How long a caller waits for its turn,
+            leave empty to wait for as long as needed
+
+    """
+
+    max_concurrency = IntProperty(
+        title="Max Concurrent Executions", default=1, advanced=True,
+        order=100)
+    max_queued = IntProperty(
+        title="Max Queued Executions", default=-1, advanced=True, order=101)
+    queue_timeout = TimeDeltaProperty(
+        title="Queue Timeout", default=None, allow_none=True, advanced=True,
+        order=102)
+
+    def __init__(self):
+        super().__init__()
+        self._limiter = None
+        self._queue_timeout = None
+
+    def configure(self, context):
+        super().configure(context)
+        max_queued = self.max_queued()
+        self._limiter = ConcurrencyLimiter(
+            self.max_concurrency(), max_queued if max_queued >= 0 else None)
+        queue_timeout = self.queue_timeout()
+        if queue_timeout is not None:
+            self._queue_timeout = queue_timeout.total_seconds()
+
+    def execute_with_limit(self, execute_method, *args, **kwargs):
+        """ Execute a given method once the concurrency limit allows it
+
+        Args:
+            execute_method (function): The function to execute
+            *args, **kwargs: Additional arguments to pass to the execute_method
+
+        Returns:
+            The result of the execute_method, once it actually executes
+
+        Raises:
+            ExecutionQueueFull: If too many callers are already waiting
+            ExecutionTimeout: If the call waited longer than queue_timeout
+        """
+        try:
+            self._limiter.acquire(self._queue_timeout)
+        except (ExecutionQueueFull, ExecutionTimeout) as e:
+            self.logger.warning(
+                "Aborting call to method in this thread: {}".format(e))
+            raise
+        try:
+            return execute_method(*args, **kwargs)
+        finally:
+            self._limiter.release()
+
+    def concurrency_stats(self):
+        """ Returns the concurrency limiter metrics """
+        return self._limiter.stats()
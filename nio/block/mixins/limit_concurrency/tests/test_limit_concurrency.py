@@ -0,0 +1,124 @@
+from threading import Event, Lock
+
+from nio.block.base import Block
+from nio.block.mixins.limit_concurrency.limit_concurrency import \
+    LimitConcurrency, ConcurrencyLimiter, ExecutionQueueFull, \
+    ExecutionTimeout
+from nio.testing.block_test_case import NIOBlockTestCase
+from nio.testing.condition import ensure_condition
+from nio.util.threading import spawn
+
+
+class ConcurrencyBlock(LimitConcurrency, Block):
+
+    def __init__(self):
+        super().__init__()
+        self.running = 0
+        self.max_running = 0
+        self.running_lock = Lock()
+        self.release = Event()
+
+    def _execute(self, value=None):
+        with self.running_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.release.wait(1)
+        with self.running_lock:
+            self.running -= 1
+        return value
+
+
+class TestLimitConcurrency(NIOBlockTestCase):
+
+    def test_permits(self):
+        """No more than max_concurrency executions run at a time"""
+        block = ConcurrencyBlock()
+        self.configure_block(block, {"max_concurrency": 3})
+        threads = [spawn(block.execute_with_limit, block._execute, value)
+                   for value in range(6)]
+        self._wait_for(lambda: block.concurrency_stats()["queued"] == 3)
+        stats = block.concurrency_stats()
+        self.assertEqual(stats["in_flight"], 3)
+        block.release.set()
+        self.assertEqual(sorted(thread.join(1) for thread in threads),
+                         list(range(6)))
+        self.assertEqual(block.max_running, 3)
+        stats = block.concurrency_stats()
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["executed"], 6)
+        self.assertEqual(sum(stats["wait_time"].values()), 6)
+
+    def test_queue_full(self):
+        """Callers are rejected once max_queued callers are waiting"""
+        block = ConcurrencyBlock()
+        self.configure_block(block, {"max_concurrency": 1, "max_queued": 1})
+        running = spawn(block.execute_with_limit, block._execute)
+        self._wait_for(lambda: block.concurrency_stats()["in_flight"] == 1)
+        waiting = spawn(block.execute_with_limit, block._execute)
+        self._wait_for(lambda: block.concurrency_stats()["queued"] == 1)
+        with self.assertRaises(ExecutionQueueFull):
+            block.execute_with_limit(block._execute)
+        block.release.set()
+        running.join(1)
+        waiting.join(1)
+        self.assertEqual(block.concurrency_stats()["rejected"], 1)
+
+    def test_queue_timeout(self):
+        """Callers give up waiting after queue_timeout"""
+        block = ConcurrencyBlock()
+        self.configure_block(block, {
+            "max_concurrency": 1,
+            "queue_timeout": {"seconds": 0.05}
+        })
+        running = spawn(block.execute_with_limit, block._execute)
+        self._wait_for(lambda: block.concurrency_stats()["in_flight"] == 1)
+        with self.assertRaises(ExecutionTimeout):
+            block.execute_with_limit(block._execute)
+        block.release.set()
+        running.join(1)
+        stats = block.concurrency_stats()
+        self.assertEqual(stats["timed_out"], 1)
+        self.assertEqual(stats["queued"], 0)
+        # The permit is available again
+        self.assertEqual(block.execute_with_limit(block._execute, 1), 1)
+
+    def test_exception_releases_permit(self):
+        """Permits are released when the executed method raises"""
+        block = ConcurrencyBlock()
+        self.configure_block(block, {"max_concurrency": 1, "max_queued": 0})
+
+        def execute_method():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            block.execute_with_limit(execute_method)
+        self.assertEqual(block.execute_with_limit(lambda: 1), 1)
+
+    def test_fifo(self):
+        """Permits are handed over in the order callers started waiting"""
+        limiter = ConcurrencyLimiter(1)
+        limiter.acquire()
+        order = []
+
+        def wait_for_permit(index):
+            limiter.acquire()
+            order.append(index)
+            limiter.release()
+
+        threads = []
+        for index in range(5):
+            threads.append(spawn(wait_for_permit, index))
+            self._wait_for(lambda: limiter.stats()["queued"] == index + 1)
+        limiter.release()
+        for thread in threads:
+            thread.join(1)
+        self.assertEqual(order, list(range(5)))
+
+    def test_invalid_permits(self):
+        """A limiter needs at least one permit"""
+        with self.assertRaises(ValueError):
+            ConcurrencyLimiter(0)
+
+    def _wait_for(self, condition):
+        self.assertTrue(ensure_condition(condition, max_wait_time=1))
@@ -21,12 +21,17 @@ class LimitLock(object):
 
     Note: This method can only be used in one place in your block code.
 
+    To let more than one execution run at a time, see the LimitConcurrency
+    mixin.
+
     """
 
     def __init__(self):
         super().__init__()
         self._exceute_lock = Lock()
         self._number_of_locks = 0
+        # Guards the count of threads using the lock
+        self._number_of_locks_lock = Lock()
 
     def execute_with_lock(self, execute_method, max_locks, *args, **kwargs):
         """ Execute a given method inside of a limited lock
@@ -49,15 +54,19 @@ class LimitLock(object):
             LockQueueFull: If the call exceeds the maximum number of threads
                 that can wait for the lock.
         """
-        if self._number_of_locks >= max_locks:
+        with self._number_of_locks_lock:
+            number_of_locks = self._number_of_locks
+            if number_of_locks < max_locks:
+                self._number_of_locks += 1
+        if number_of_locks >= max_locks:
             self.logger.warning(
                 "Currently {} locks waiting to be acquired. This is more than "
                 "the max. Aborting call to method in this thread.".format(
-                    self._number_of_locks))
+                    number_of_locks))
             raise LockQueueFull
-        self._number_of_locks += 1
-        with self._exceute_lock:
-            try:
+        try:
+            with self._exceute_lock:
                 return execute_method(*args, **kwargs)
-            finally:
+        finally:
+            with self._number_of_locks_lock:
                 self._number_of_locks -= 1
@@ -0,0 +1,242 @@
+import inspect
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import wraps
+from itertools import count
+from threading import Lock
+
+from nio.block.context import BlockContext
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.properties import IntProperty, Property
+from nio.router.base import BlockReceiverData, BlockRouter
+
+
+# Blocks instantiated in a worker process, keyed by block id
+_worker_blocks = {}
+
+
+class _CollectingRouter(BlockRouter):
+
+    """ Router of the blocks living in a worker process, collects the
+    signals they notify so they can be sent back to the service """
+
+    def __init__(self):
+        super().__init__()
+        self.notified = []
+
+    def notify_signals(self, block, signals, output_id=None):
+        if output_id is None:
+            output_id = block._default_output.id
+        self.notified.append((output_id, list(signals)))
+
+
+def _process_in_worker(block_class, properties, signals, input_id):
+    """ Process signals with the worker process copy of a block
+
+    The block is created and configured the first time the worker process
+    receives signals for it.
+
+    Returns:
+        list: (output_id, signals) tuples notified by the block
+    """
+    worker_block = _worker_blocks.get(properties["id"])
+    if worker_block is None:
+        router = _CollectingRouter()
+        block = block_class()
+        block.configure(BlockContext(router, properties))
+        block.start()
+        include_input_id = \
+            BlockReceiverData(block, input_id, None).include_input_id
+        worker_block = _worker_blocks[properties["id"]] = \
+            (block, router, include_input_id)
+    block, router, include_input_id = worker_block
+    try:
+        if include_input_id:
+            block.process_signals(signals, input_id)
+        else:
+            block.process_signals(signals)
+        return router.notified
+    finally:
+        router.notified = []
+
+
+def _dispatching_to_pool(process_signals):
+    """ Wrap the process_signals of a block class so that signals go to
+    the worker processes when the block has any
+
+    The wrapper keeps the signature of the method, routers look at it to
+    find out whether the block takes an input id.
+    """
+    if len(inspect.getfullargspec(process_signals).args) == 2:
+        @wraps(process_signals)
+        def dispatch(self, signals):
+            if self._dispatch_to_pool:
+                return self._process_signals_in_pool(
+                    signals, DEFAULT_TERMINAL)
+            return process_signals(self, signals)
+    else:
+        @wraps(process_signals)
+        def dispatch(self, signals, input_id=DEFAULT_TERMINAL):
+            if self._dispatch_to_pool:
+                return self._process_signals_in_pool(signals, input_id)
+            return process_signals(self, signals, input_id)
+    dispatch.dispatches_to_pool = True
+    return dispatch
+
+
+def _all_done(futures):
+    """ Returns a future done once every one of futures is done """
+    if len(futures) == 1:
+        return futures[0]
+    all_done = Future()
+    if not futures:
+        all_done.set_result(None)
+        return all_done
+    remaining = [len(futures)]
+    lock = Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            all_done.set_result(None)
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    return all_done
+
+
+class ProcessPool(object):
+
+    """ A block mixin running process_signals in worker processes
+
+    Pure Python CPU bound blocks are held back by the GIL however signals
+    are delivered to them. When 'process_workers' is greater than 0, each
+    worker process gets its own copy of the block, configured with the same
+    properties, and signals delivered to the block are processed by one of
+    them. Signals the copies notify are sent back and notified on the same
+    outputs of the block.
+
+    Signals are processed in parallel and their results notified as soon as
+    they are available, so without a 'process_group_key' signals can come
+    out of the block in a different order. Signals with the same group key
+    are always processed by the same worker process, in order, so their
+    results keep their order and per group state kept by the block stays
+    in a single process.
+
+    Copies of the block only see the signals they process, they are
+    started but not stopped, and nio modules (persistence, scheduler...)
+    are not available in worker processes. Signals and the block class need
+    to be picklable.
+
+    The process_signals method of classes including the mixin is wrapped so
+    that signals are handed over to the worker processes instead. It then
+    returns a future done once the workers are done with the signals, for
+    routers to keep track of the signals still being processed.
+
+    Block parameters:
+        process_workers (int): Number of worker processes, 0 processes
+            signals in the service process
+        process_group_key: Expression evaluated against each signal,
+            signals with the same key are processed in order
+
+    """
+
+    process_workers = IntProperty(
+        title="Worker Processes", default=0, advanced=True, order=100)
+    process_group_key = Property(
+        title="Process Group Key", default=None, allow_none=True,
+        advanced=True, order=101)
+
+    def __init__(self):
+        super().__init__()
+        self._process_pools = []
+        self._next_pool = count()
+        self._worker_properties = None
+        self._dispatch_to_pool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        process_signals = cls.__dict__.get("process_signals")
+        if process_signals is not None and \
+                not getattr(process_signals, "dispatches_to_pool", False) and \
+                len(inspect.getfullargspec(process_signals).args) in (2, 3):
+            cls.process_signals = _dispatching_to_pool(process_signals)
+
+    def configure(self, context):
+        super().configure(context)
+        self._dispatch_to_pool = self.process_workers() > 0
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        """ Process signals in the worker processes, for blocks relying on
+        the process_signals of a mixin following this one """
+        if self._dispatch_to_pool:
+            return self._process_signals_in_pool(signals, input_id)
+        return super().process_signals(signals, input_id)
+
+    def start(self):
+        super().start()
+        # Copies of the block in the worker processes must not start their
+        # own pools
+        properties = self.to_dict()
+        properties["process_workers"] = 0
+        self._worker_properties = properties
+        self._process_pools = [ProcessPoolExecutor(max_workers=1)
+                               for _ in range(self.process_workers())]
+
+    def stop(self):
+        pools, self._process_pools = self._process_pools, []
+        # signals already handed to the workers are processed before their
+        # processes exit
+        for pool in pools:
+            pool.shutdown(wait=True)
+        super().stop()
+
+    def _process_signals_in_pool(self, signals, input_id):
+        """ Hand signals over to the worker processes
+
+        Returns:
+            Future: done once the signals are processed and their results
+                notified, None if the signals were discarded
+        """
+        if not self._process_pools:
+            self.logger.warning(
+                "Block is not started, discarding {} signals".format(
+                    len(signals)))
+            return None
+        futures = []
+        for pool, pool_signals in self._split_signals(signals):
+            future = pool.submit(
+                _process_in_worker, self.__class__, self._worker_properties,
+                pool_signals, input_id)
+            future.add_done_callback(self._on_processed_in_pool)
+            futures.append(future)
+        return _all_done(futures)
+
+    def _split_signals(self, signals):
+        """ Returns the pools to send signals to, along with their signals """
+        pools = self._process_pools
+        if self.process_group_key.value is None:
+            # spread batches over the pools
+            return [(pools[next(self._next_pool) % len(pools)],
+                     list(signals))]
+        pool_signals = {}
+        for signal in signals:
+            index = hash(self.process_group_key(signal)) % len(pools)
+            pool_signals.setdefault(index, []).append(signal)
+        return [(pools[index], signals_in_pool)
+                for index, signals_in_pool in pool_signals.items()]
+
+    def _on_processed_in_pool(self, future):
+        # Pools have a single worker process, their results come back in
+        # the order signals were submitted
+        if future.cancelled():
+            return
+        try:
+            notified = future.result()
+        except Exception:
+            self.logger.exception(
+                "Failed to process signals in worker process")
+            return
+        for output_id, signals in notified:
+            self.notify_signals(signals, output_id)
@@ -0,0 +1,166 @@
+import os
+from time import sleep
+
+from nio.block.base import Block
+from nio.block.context import BlockContext
+from nio.block.mixins.process_pool.process_pool import ProcessPool
+from nio.block.terminals import DEFAULT_TERMINAL, output
+from nio.properties import IntProperty
+from nio.router.base import BlockRouter
+from nio.router.context import RouterContext
+from nio.service.base import BlockExecution
+from nio.signal.base import Signal
+from nio.testing.block_test_case import NIOBlockTestCase
+from nio.testing.condition import ensure_condition
+from nio.testing.test_case import NIOTestCase
+
+
+@output("odd")
+@output("even", default=True)
+class MultiplyingBlock(ProcessPool, Block):
+
+    multiplier = IntProperty(title="Multiplier", default=1)
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        even = []
+        odd = []
+        for signal in signals:
+            if signal.value == "fail":
+                raise ValueError()
+            result = Signal({"key": signal.key,
+                             "value": signal.value * self.multiplier(),
+                             "pid": os.getpid()})
+            (even if signal.value % 2 == 0 else odd).append(result)
+        self.notify_signals(even, "even")
+        self.notify_signals(odd, "odd")
+
+
+class PidBlock(ProcessPool, Block):
+
+    def process_signal(self, signal):
+        return Signal({"pid": os.getpid()})
+
+
+class SlowBlock(ProcessPool, Block):
+
+    def process_signals(self, signals):
+        sleep(0.5)
+
+
+class BlockExecutionTest(BlockExecution):
+
+    def __init__(self, id, receivers):
+        self.id = id
+        self.receivers = receivers
+
+
+class TestProcessPool(NIOBlockTestCase):
+
+    def _notified(self, output_id):
+        return [signal for signals in self.notified_signals[output_id]
+                for signal in signals]
+
+    def _wait_for(self, count):
+        ensure_condition(
+            lambda: len(self._notified("even")) +
+            len(self._notified("odd")) >= count, max_wait_time=30)
+
+    def test_in_service_process(self):
+        """ Signals are processed as usual without worker processes """
+        block = MultiplyingBlock()
+        self.configure_block(block, {"multiplier": 3})
+        block.start()
+        block.process_signals([Signal({"key": 1, "value": 2})])
+        block.stop()
+        self.assertEqual(self._notified("even")[0].value, 6)
+        self.assertEqual(self._notified("even")[0].pid, os.getpid())
+
+    def test_worker_processes(self):
+        """ Signals are processed in worker processes and notified back on
+        the block outputs, in order for each group key """
+        block = MultiplyingBlock()
+        self.configure_block(block, {
+            "multiplier": 3,
+            "process_workers": 2,
+            "process_group_key": "{{ $key }}"
+        })
+        block.start()
+        for value in range(20):
+            block.process_signals([Signal({"key": value % 3,
+                                           "value": value})])
+        self._wait_for(20)
+        block.stop()
+
+        results = self._notified("even") + self._notified("odd")
+        self.assertEqual(sorted(signal.value for signal in results),
+                         [value * 3 for value in range(20)])
+        self.assertNotIn(os.getpid(), [signal.pid for signal in results])
+        for output_id in ["even", "odd"]:
+            for key in range(3):
+                values = [signal.value for signal in
+                          self._notified(output_id) if signal.key == key]
+                self.assertEqual(values, sorted(values))
+                # a group is processed by a single worker process
+                self.assertEqual(len(set(
+                    signal.pid for signal in self._notified(output_id)
+                    if signal.key == key)), 1)
+
+    def test_worker_failure(self):
+        """ Failures in worker processes are logged """
+        block = MultiplyingBlock()
+        self.configure_block(block, {"process_workers": 1})
+        block.start()
+        block.process_signals([Signal({"key": 1, "value": "fail"})])
+        block.process_signals([Signal({"key": 1, "value": 2})])
+        self._wait_for(1)
+        block.stop()
+        self.assertEqual(self._notified("even")[0].value, 2)
+
+    def test_process_signals_method(self):
+        """ process_signals stays a method of the block class """
+        block = MultiplyingBlock()
+        self.configure_block(block, {"process_workers": 1})
+        self.assertNotIn("process_signals", vars(block))
+        self.assertEqual(MultiplyingBlock.process_signals.__name__,
+                         "process_signals")
+        self.assertEqual(
+            MultiplyingBlock.process_signals.__wrapped__.__qualname__,
+            "MultiplyingBlock.process_signals")
+
+    def test_mixin_process_signals(self):
+        """ Blocks without a process_signals of their own are processed
+        in worker processes too """
+        block = PidBlock()
+        self.configure_block(block, {"process_workers": 1})
+        block.start()
+        block.process_signals([Signal()])
+        ensure_condition(lambda: self.notified_signals[DEFAULT_TERMINAL],
+                         max_wait_time=30)
+        block.stop()
+        self.assertNotEqual(
+            self.notified_signals[DEFAULT_TERMINAL][0][0].pid, os.getpid())
+
+
+class TestProcessPoolFlowControl(NIOTestCase):
+
+    def test_in_flight_until_processed(self):
+        """ Signals are in flight until worker processes are done """
+        block_router = BlockRouter()
+        blocks = {"source": Block(), "slow": SlowBlock()}
+        blocks["source"].configure(
+            BlockContext(block_router, {"id": "source"}))
+        blocks["slow"].configure(BlockContext(
+            block_router, {"id": "slow", "process_workers": 1}))
+        block_router.do_configure(RouterContext(
+            [BlockExecutionTest(id="source", receivers=["slow"])], blocks,
+            {"max_in_flight": 10}))
+        block_router.do_start()
+        self.addCleanup(block_router.do_stop)
+        blocks["slow"].start()
+        self.addCleanup(blocks["slow"].stop)
+
+        blocks["source"].notify_signals([Signal(), Signal()])
+        self.assertEqual(block_router._flow_control.in_flight("slow"), 2)
+        self.assertEqual(blocks["source"].downstream_capacity(), 8)
+        self.assertTrue(blocks["source"].wait_for_capacity(10, timeout=30))
+        self.assertEqual(block_router._flow_control.in_flight("slow"), 0)
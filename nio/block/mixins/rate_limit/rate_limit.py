@@ -0,0 +1,160 @@
+from collections import defaultdict, deque
+from datetime import timedelta
+from enum import Enum
+from itertools import groupby
+from operator import itemgetter
+from threading import Lock
+from nio.modules.scheduler import Job
+from nio.properties import FloatProperty, IntProperty, SelectProperty
+from nio.signal.base import Signal
+from nio.util.token_bucket import TokenBucket
+
+
+class RateLimitOverflow(Enum):
+    delay = "delay"
+    drop = "drop"
+    buffer = "buffer"
+
+
+class RateLimit(object):
+
+    """ A block mixin that caps the rate at which a block notifies signals.
+
+    By including this mixin, every signal notified by the block takes a
+    token from a token bucket refilled at `rate_limit` signals per second
+    and holding up to `rate_burst` tokens. Signals notified when the bucket
+    is empty are handled according to `rate_overflow`:
+        delay: Signals are held and notified, in order, as soon as tokens
+            become available.
+        drop: Signals are discarded.
+        buffer: Like delay, but at most `rate_buffer_size` signals are held,
+            signals that don't fit are discarded.
+
+    Held signals are notified from a scheduled job, so throttling never
+    blocks the thread calling notify_signals.
+
+    By setting the rate_limit property to 0, signals are notified right
+    away, as if this mixin wasn't even included.
+
+    Block parameters:
+        rate_limit (float): Signals notified per second, 0 means no limit
+        rate_burst (int): Signals that can be notified at once after a
+            quiet period
+        rate_overflow (select): What to do with signals over the limit
+        rate_buffer_size (int): Maximum signals held in buffer mode
+
+    """
+
+    rate_limit = FloatProperty(
+        title="Rate Limit (signals per second)", default=0, advanced=True,
+        order=100)
+    rate_burst = IntProperty(
+        title="Rate Burst", default=1, advanced=True, order=101)
+    rate_overflow = SelectProperty(
+        RateLimitOverflow, title="Rate Overflow",
+        default=RateLimitOverflow.delay, advanced=True, order=102)
+    rate_buffer_size = IntProperty(
+        title="Rate Buffer Size", default=1000, advanced=True, order=103)
+
+    def __init__(self):
+        super().__init__()
+        self._bucket = None
+        # Guards the bucket, the held signals and the stats
+        self._rate_lock = Lock()
+        # (output_id, signal) tuples waiting for a token, oldest first
+        self._rate_pending = deque()
+        self._rate_release_job = None
+        self._rate_stats = defaultdict(int)
+
+    def configure(self, context):
+        super().configure(context)
+        rate_limit = self.rate_limit()
+        if rate_limit > 0:
+            self._bucket = TokenBucket(rate_limit, self.rate_burst())
+
+    def stop(self):
+        with self._rate_lock:
+            if self._rate_release_job:
+                self._rate_release_job.cancel()
+                self._rate_release_job = None
+        super().stop()
+
+    def notify_signals(self, signals, output_id=None):
+        """Override the notify signals call to apply the rate limit"""
+        if self._bucket is None or isinstance(signals, dict):
+            super().notify_signals(signals, output_id)
+            return
+        if isinstance(signals, Signal):
+            signals = [signals]
+        else:
+            signals = list(signals)
+
+        with self._rate_lock:
+            # Signals already held go out first to keep them in order
+            allowed = 0 if self._rate_pending else \
+                self._bucket.take(len(signals))
+            self._rate_stats["passed"] += allowed
+            if allowed < len(signals):
+                self._hold_signals(signals[allowed:], output_id)
+        if allowed:
+            super().notify_signals(signals[:allowed], output_id)
+
+    def rate_limit_stats(self):
+        """Return throttling metrics.
+
+        Returns:
+            dict: the number of signals notified right away ('passed'),
+                held until tokens were available ('delayed') and discarded
+                ('dropped'), along with the number of signals currently
+                held ('pending')
+        """
+        with self._rate_lock:
+            return {
+                "passed": self._rate_stats["passed"],
+                "delayed": self._rate_stats["delayed"],
+                "dropped": self._rate_stats["dropped"],
+                "pending": len(self._rate_pending)
+            }
+
+    def _hold_signals(self, signals, output_id):
+        """Handle signals over the limit, must hold the rate lock"""
+        overflow = self.rate_overflow()
+        if overflow is RateLimitOverflow.drop:
+            self._rate_stats["dropped"] += len(signals)
+            return
+        if overflow is RateLimitOverflow.buffer:
+            room = max(self.rate_buffer_size() - len(self._rate_pending), 0)
+            if room < len(signals):
+                self.logger.debug(
+                    "Rate limit buffer full, dropping {} signals".format(
+                        len(signals) - room))
+                self._rate_stats["dropped"] += len(signals) - room
+                signals = signals[:room]
+        self._rate_stats["delayed"] += len(signals)
+        self._rate_pending.extend((output_id, signal) for signal in signals)
+        self._schedule_release()
+
+    def _schedule_release(self):
+        """Schedule the release of held signals, must hold the rate lock"""
+        if self._rate_pending and self._rate_release_job is None:
+            self._rate_release_job = Job(
+                self._release_signals,
+                timedelta(seconds=self._bucket.time_until_available()),
+                False)
+
+    def _release_signals(self):
+        """Notify as many held signals as there are tokens for.
+
+        This gets called by the scheduled Job. The scheduler may run it well
+        after the next token was due, every token added since signals were
+        held is used so that held signals still go out at the rate limit.
+        """
+        with self._rate_lock:
+            self._rate_release_job = None
+            count = self._bucket.take_accrued(len(self._rate_pending))
+            released = [self._rate_pending.popleft() for _ in range(count)]
+            self._schedule_release()
+        # Notify consecutive signals for the same output together
+        for output_id, output_sigs in groupby(released, key=itemgetter(0)):
+            super().notify_signals(
+                [signal for _, signal in output_sigs], output_id)
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from nio.block.base import Block
+from nio.block.mixins.rate_limit.rate_limit import RateLimit
+from nio.block.terminals import output, DEFAULT_TERMINAL
+from nio.signal.base import Signal
+from nio.testing.condition import ensure_condition
+from nio.testing.block_test_case import NIOBlockTestCase
+
+
+class RateLimitedBlock(RateLimit, Block):
+    pass
+
+
+@output("first", default=True)
+@output("second")
+class MultipleOutputsBlock(RateLimit, Block):
+    pass
+
+
+class TestRateLimit(NIOBlockTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 100.0
+        patcher = patch(
+            "nio.util.token_bucket.monotonic",
+            side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_limit_on_zero(self):
+        """Signals are notified right away when there is no rate limit"""
+        block = RateLimitedBlock()
+        self.configure_block(block, {})
+        block.notify_signals([Signal() for _ in range(5)])
+        self.assert_num_signals_notified(5)
+
+    def test_delay(self):
+        """Signals over the limit are notified once tokens are available"""
+        block = RateLimitedBlock()
+        self.configure_block(block, {"rate_limit": 2, "rate_burst": 2})
+        with patch("nio.block.mixins.rate_limit.rate_limit.Job") as job_mock:
+            block.notify_signals([Signal({"n": n}) for n in range(5)])
+            # The burst goes out right away, the rest waits for a token
+            self.assert_num_signals_notified(2)
+            job_mock.assert_called_once_with(
+                block._release_signals, timedelta(seconds=0.5), False)
+            # Signals notified while others are held wait for their turn
+            block.notify_signals(Signal({"n": 5}))
+            self.assertEqual(job_mock.call_count, 1)
+
+            self.now += 1
+            block._release_signals()
+            self.assert_num_signals_notified(4)
+            self.assertEqual(job_mock.call_count, 2)
+
+            self.now += 1
+            block._release_signals()
+            self.assert_num_signals_notified(6)
+            self.assertEqual(job_mock.call_count, 2)
+
+        self.assertEqual(
+            [signal.n for signal in self.last_notified[DEFAULT_TERMINAL]],
+            list(range(6)))
+        self.assertDictEqual(block.rate_limit_stats(), {
+            "passed": 2, "delayed": 4, "dropped": 0, "pending": 0})
+
+    def test_delay_keeps_outputs(self):
+        """Held signals are notified on the output they were notified on"""
+        block = MultipleOutputsBlock()
+        self.configure_block(block, {"rate_limit": 1, "rate_burst": 2})
+        with patch("nio.block.mixins.rate_limit.rate_limit.Job"):
+            block.notify_signals([Signal(), Signal(), Signal()], "first")
+            block.notify_signals([Signal()], "second")
+            self.now += 2
+            block._release_signals()
+        self.assert_num_signals_notified(3, block, output_id="first")
+        self.assert_num_signals_notified(1, block, output_id="second")
+
+    def test_drop(self):
+        """Signals over the limit are discarded in drop mode"""
+        block = RateLimitedBlock()
+        self.configure_block(block, {
+            "rate_limit": 1, "rate_burst": 3, "rate_overflow": "drop"})
+        with patch("nio.block.mixins.rate_limit.rate_limit.Job") as job_mock:
+            block.notify_signals([Signal() for _ in range(5)])
+            self.now += 1
+            block.notify_signals([Signal() for _ in range(5)])
+            self.assertEqual(job_mock.call_count, 0)
+        self.assert_num_signals_notified(4)
+        self.assertDictEqual(block.rate_limit_stats(), {
+            "passed": 4, "delayed": 0, "dropped": 6, "pending": 0})
+
+    def test_buffer(self):
+        """Only rate_buffer_size signals are held in buffer mode"""
+        block = RateLimitedBlock()
+        self.configure_block(block, {
+            "rate_limit": 10, "rate_overflow": "buffer",
+            "rate_buffer_size": 3})
+        with patch("nio.block.mixins.rate_limit.rate_limit.Job"):
+            block.notify_signals([Signal() for _ in range(3)])
+            block.notify_signals([Signal() for _ in range(3)])
+            self.assertDictEqual(block.rate_limit_stats(), {
+                "passed": 1, "delayed": 3, "dropped": 2, "pending": 3})
+            # Tokens added while signals were held are not capped by the
+            # burst
+            self.now += 0.2
+            block._release_signals()
+        self.assert_num_signals_notified(3)
+        self.assertEqual(block.rate_limit_stats()["pending"], 1)
+
+    def test_stop_cancels_release(self):
+        """Stopping the block cancels the pending release job"""
+        block = RateLimitedBlock()
+        self.configure_block(block, {"rate_limit": 1})
+        with patch("nio.block.mixins.rate_limit.rate_limit.Job") as job_mock:
+            block.notify_signals([Signal(), Signal()])
+            block.stop()
+            job_mock.return_value.cancel.assert_called_once_with()
+
+
+class TestRateLimitThroughput(NIOBlockTestCase):
+
+    def test_high_rate(self):
+        """Held signals go out at the rate limit, not the scheduler's"""
+        block = RateLimitedBlock()
+        self.configure_block(block, {"rate_limit": 1000, "rate_burst": 1})
+        block.start()
+        block.notify_signals([Signal() for _ in range(300)])
+        # 0.3 seconds at the rate limit, the scheduler only wakes up 10
+        # times a second
+        ensure_condition(
+            lambda: block.rate_limit_stats()["pending"] == 0,
+            max_wait_time=1)
+        self.assertEqual(block.rate_limit_stats()["pending"], 0)
+        self.assert_num_signals_notified(300)
+        block.stop()
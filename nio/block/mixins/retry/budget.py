@@ -0,0 +1,76 @@
+from threading import Lock
+from nio.util.token_bucket import TokenBucket
+
+
+class RetryBudget(object):
+
+    """ A thread safe token bucket of retries.
+
+    Every retry takes a token, tokens are refilled at 'rate' per second up to
+    'burst'. Sharing a budget between strategies caps how fast they retry as
+    a whole, no matter how many of them are failing.
+
+    """
+
+    def __init__(self, rate, burst):
+        """ Create a new, full, budget
+
+        Args:
+            rate (float): Retries allowed per second
+            burst (int): Retries allowed at once after a quiet period
+        """
+        self._lock = Lock()
+        self._bucket = TokenBucket(rate, burst)
+        self._allowed = 0
+        self._rejected = 0
+
+    def try_acquire(self):
+        """ Take a retry out of the budget
+
+        Returns:
+            bool: True if the budget allows one more retry
+        """
+        with self._lock:
+            if self._bucket.take(1):
+                self._allowed += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def stats(self):
+        """ Returns how many retries the budget allowed and rejected """
+        with self._lock:
+            return {"allowed": self._allowed, "rejected": self._rejected}
+
+
+_budgets = {}
+_budgets_lock = Lock()
+
+
+def get_retry_budget(key, rate, burst):
+    """ Get the process wide retry budget of a dependency
+
+    The budget is created the first time a key is requested, later calls
+    return that same budget regardless of the rate and burst they ask for.
+
+    Args:
+        key (str): Identifies the dependency retries are made against, i.e.
+            a broker or database host
+        rate (float): Retries allowed per second, when creating the budget
+        burst (int): Retries allowed at once, when creating the budget
+
+    Returns:
+        RetryBudget: The budget shared by every caller using this key
+    """
+    with _budgets_lock:
+        budget = _budgets.get(key)
+        if budget is None:
+            budget = _budgets[key] = RetryBudget(rate, burst)
+        return budget
+
+
+def retry_budgets_stats():
+    """ Returns the stats of every retry budget, keyed by dependency key """
+    with _budgets_lock:
+        budgets = dict(_budgets)
+    return {key: budget.stats() for key, budget in budgets.items()}
@@ -0,0 +1,113 @@
+from enum import Enum
+from threading import Lock
+from time import monotonic
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitState(Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker(object):
+
+    """ Fail fast once a dependency keeps failing.
+
+    The circuit starts closed, letting every request through. After
+    'failure_threshold' consecutive failures it opens and rejects requests
+    for 'reset_timeout' seconds. It then becomes half open and lets a single
+    trial request through: the circuit closes if it succeeds and opens again
+    if it fails.
+
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        """ Create a new, closed, circuit breaker
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the
+                circuit
+            reset_timeout (float): Seconds the circuit stays open before
+                letting a trial request through
+        """
+        if failure_threshold < 1:
+            raise ValueError("A circuit breaker needs a positive threshold")
+        self._lock = Lock()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self):
+        """ CircuitState: the current state of the circuit """
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self):
+        """ Returns True if a request can be attempted now
+
+        When half open, only the first caller is allowed through until the
+        outcome of its request is recorded.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state is CircuitState.closed:
+                return True
+            if state is CircuitState.half_open and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        """ Record a successful request, closing the circuit """
+        with self._lock:
+            self._state = CircuitState.closed
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """ Record a failed request, opening the circuit if needed """
+        with self._lock:
+            self._trial_in_flight = False
+            state = self._current_state()
+            if state is CircuitState.half_open:
+                self._open()
+            elif state is CircuitState.closed:
+                self._failures += 1
+                if self._failures >= self._failure_threshold:
+                    self._open()
+
+    def stats(self):
+        """ Returns the circuit state along with how many times it opened and
+        how many requests it rejected """
+        with self._lock:
+            return {
+                "state": self._current_state().value,
+                "failures": self._failures,
+                "opened": self._times_opened,
+                "rejected": self._rejected
+            }
+
+    def _current_state(self):
+        """ Move an open circuit to half open once its timeout is over, must
+        hold the lock """
+        if self._state is CircuitState.open and \
+                monotonic() - self._opened_at >= self._reset_timeout:
+            self._state = CircuitState.half_open
+        return self._state
+
+    def _open(self):
+        self._state = CircuitState.open
+        self._opened_at = monotonic()
+        self._failures = 0
+        self._times_opened += 1
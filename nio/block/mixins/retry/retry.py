@@ -1,14 +1,23 @@
+from concurrent.futures import Future
+from datetime import timedelta
 from enum import Enum
-from threading import Event
+from threading import Event, Lock
+from nio.modules.scheduler import Job
 from nio.properties import PropertyHolder, ObjectProperty, BoolProperty, \
-    IntProperty, SelectProperty, FloatProperty
+    IntProperty, SelectProperty, FloatProperty, StringProperty
+from nio.block.mixins.retry.budget import get_retry_budget
+from nio.block.mixins.retry.circuit_breaker import CircuitBreaker, \
+    CircuitOpen
 from nio.block.mixins.retry.strategy import BackoffStrategy
-from nio.block.mixins.retry.strategies import LinearBackoff, ExponentialBackoff
+from nio.block.mixins.retry.strategies import LinearBackoff, \
+    ExponentialBackoff, FullJitterBackoff, DecorrelatedJitterBackoff
 
 
 class RetryStrategies(Enum):
     linear = LinearBackoff
     exponential = ExponentialBackoff
+    full_jitter = FullJitterBackoff
+    decorrelated_jitter = DecorrelatedJitterBackoff
 
 
 class RetryOptions(PropertyHolder):
@@ -25,6 +34,16 @@ class RetryOptions(PropertyHolder):
                                allow_expr=False)
     indefinite = BoolProperty(title="Continue Indefinitely?", default=False,
                               allow_expr=False)
+    circuit_failures = IntProperty(title="Failures to Open Circuit",
+                                   default=0, allow_expr=False)
+    circuit_reset_timeout = FloatProperty(
+        title="Seconds Before Circuit Trial", default=30, allow_expr=False)
+    retry_budget_key = StringProperty(title="Retry Budget Key", default="",
+                                      allow_expr=False)
+    retry_budget_rate = FloatProperty(title="Retry Budget (retries/sec)",
+                                      default=10, allow_expr=False)
+    retry_budget_burst = IntProperty(title="Retry Budget Burst", default=100,
+                                     allow_expr=False)
 
     def get_options_dict(self):
         return {
@@ -33,6 +52,14 @@ class RetryOptions(PropertyHolder):
             "indefinite": self.indefinite()
         }
 
+    def get_retry_budget(self):
+        """ Returns the process wide budget for the configured key, if any """
+        if not self.retry_budget_key():
+            return None
+        return get_retry_budget(self.retry_budget_key(),
+                                self.retry_budget_rate(),
+                                self.retry_budget_burst())
+
 
 class Retry(object):
     """ A block mixin that provides retry functionality.
@@ -64,6 +91,15 @@ class Retry(object):
         3. Optionally, override before_retry to write custom code that will be
         performed before attempting a retry.
 
+    Alternatively, call execute_with_retry_async to get a Future right away
+    instead of blocking the calling thread. Retries are then scheduled after
+    the delay returned by the backoff strategy's next_retry_delay.
+
+    Both methods share a circuit breaker when circuit_failures is set. After
+    that many consecutive failed attempts, across all calls, attempts fail
+    right away with CircuitOpen for circuit_reset_timeout seconds, then a
+    single trial attempt decides whether the circuit closes again.
+
     Block parameters:
         strategy (select): A choice of pre-configured backoff strategies
         max_retry (int): The maximum number of retries to attempt. Note that
@@ -84,15 +120,61 @@ class Retry(object):
             until the retry is successful or the block is stopped. If this
             flag is set to False, the retry mixin will stop retrying once the
             max_retry retry attempt is reached.
+        circuit_failures (int): Consecutive failed attempts that open the
+            circuit. Setting it to 0 disables the circuit breaker.
+        circuit_reset_timeout (float): Seconds the circuit stays open before
+            a trial attempt is let through.
+        retry_budget_key (str): Identifies the dependency retries are made
+            against. Every strategy configured with the same key, in any
+            block of the process, draws its retries from the same budget.
+            Leave empty to not use a budget.
+        retry_budget_rate (float): Retries per second allowed by the budget,
+            taken from the first block that uses the key.
+        retry_budget_burst (int): Retries allowed at once by the budget,
+            taken from the first block that uses the key.
     """
 
     retry_options = ObjectProperty(RetryOptions, title="Retry Options",
                                    advanced=True, order=100, default=RetryOptions())
 
+    def __init__(self):
+        super().__init__()
+        self._circuit_breaker = None
+        # Set on every backoff strategy when a retry budget key is configured
+        self._retry_budget = None
+        # Scheduled retries of execute_with_retry_async calls, keyed by the
+        # Future returned to the caller
+        self._retry_jobs = {}
+        self._retry_jobs_lock = Lock()
+        # Set once the block stops, attempts in progress don't schedule
+        # retries anymore
+        self._stopped = False
+
     def configure(self, context):
         """ This implementation will use the configured backoff strategy """
         super().configure(context)
+        self._retry_budget = self.retry_options().get_retry_budget()
         self.setup_backoff_strategy()
+        circuit_failures = self.retry_options().circuit_failures()
+        if circuit_failures > 0:
+            self._circuit_breaker = CircuitBreaker(
+                circuit_failures,
+                self.retry_options().circuit_reset_timeout())
+
+    def start(self):
+        with self._retry_jobs_lock:
+            self._stopped = False
+        super().start()
+
+    def stop(self):
+        """ Cancel any scheduled retries along with their futures """
+        with self._retry_jobs_lock:
+            self._stopped = True
+            for future, job in self._retry_jobs.items():
+                job.cancel()
+                future.cancel()
+            self._retry_jobs.clear()
+        super().stop()
 
     def setup_backoff_strategy(self):
         """ Define which backoff strategy the block should use.
@@ -123,6 +205,7 @@ class Retry(object):
         Raises:
             Exception: The exception that execute_method raised when the
                 backoff strategy decided to stop retrying.
+            CircuitOpen: If the circuit breaker rejected an attempt
         """
         # verify incoming event type if set
         if stop_retry_event and not isinstance(stop_retry_event, Event):
@@ -133,16 +216,19 @@ class Retry(object):
             execute_method, '__name__', str(execute_method))
         backoff_strategy = self.__new_backoff_strategy()
         while not stop_retry_event or not stop_retry_event.is_set():
+            self._check_circuit(execute_method_name)
             try:
                 result = execute_method(*args, **kwargs)
                 # If we got here, the request succeeded, let the backoff
                 # strategy know then return the result
                 backoff_strategy.request_succeeded()
+                self._record_attempt(True)
                 return result
             except Exception as exc:
                 self.logger.warning(
                     "Retryable execution on method {} failed".format(
                         execute_method_name), exc_info=True)
+                self._record_attempt(False)
                 backoff_strategy.request_failed(exc)
                 should_retry = backoff_strategy.should_retry()
                 if not should_retry:
@@ -159,6 +245,120 @@ class Retry(object):
                     backoff_strategy.wait_for_retry()
                     self.before_retry(*args, **kwargs)
 
+    def execute_with_retry_async(self, execute_method, *args, **kwargs):
+        """ Execute a method, scheduling retries instead of waiting for them
+
+        The first attempt runs on the calling thread, retries run on the
+        scheduler after the backoff strategy's next_retry_delay. Cancelling
+        the returned Future, or stopping the block, stops retrying.
+
+        Args:
+            execute_method (callable): A function to attempt to execute. The
+                function may be called multiple times if retries occur.
+            args/kwargs: Optional arguments to pass to the execute method
+
+        Returns:
+            Future: Resolves to the result of execute_method upon success, or
+                to the exception that execute_method raised when the backoff
+                strategy decided to stop retrying, or to CircuitOpen if the
+                circuit breaker rejected an attempt.
+        """
+        future = Future()
+        self._attempt_async(future, self.__new_backoff_strategy(),
+                            execute_method, args, kwargs)
+        return future
+
+    def circuit_breaker_stats(self):
+        """ Returns the circuit breaker metrics, None if it is disabled """
+        if self._circuit_breaker is None:
+            return None
+        return self._circuit_breaker.stats()
+
+    def _attempt_async(self, future, backoff_strategy, execute_method, args,
+                       kwargs):
+        """ Make one attempt of an execute_with_retry_async call """
+        if future.cancelled():
+            return
+        execute_method_name = getattr(
+            execute_method, '__name__', str(execute_method))
+        try:
+            self._check_circuit(execute_method_name)
+            result = execute_method(*args, **kwargs)
+        except CircuitOpen as exc:
+            self._set_future(future, exception=exc)
+            return
+        except Exception as exc:
+            self.logger.warning(
+                "Retryable execution on method {} failed".format(
+                    execute_method_name), exc_info=True)
+            self._record_attempt(False)
+            backoff_strategy.request_failed(exc)
+            if not backoff_strategy.should_retry():
+                self.logger.error(
+                    "Out of retries for method {}.".format(
+                        execute_method_name))
+                self._set_future(future, exception=exc)
+                return
+            # Hold the lock so that the job can't run before it is recorded
+            with self._retry_jobs_lock:
+                if not self._stopped:
+                    self._retry_jobs[future] = Job(
+                        self._retry_async,
+                        timedelta(
+                            seconds=backoff_strategy.next_retry_delay()),
+                        False,
+                        future, backoff_strategy, execute_method, args,
+                        kwargs)
+                    return
+            # The block stopped while this attempt was running
+            future.cancel()
+            return
+        backoff_strategy.request_succeeded()
+        self._record_attempt(True)
+        self._set_future(future, result=result)
+
+    def _retry_async(self, future, backoff_strategy, execute_method, args,
+                     kwargs):
+        """ Retry an execute_with_retry_async call, run by the scheduler """
+        with self._retry_jobs_lock:
+            if self._retry_jobs.pop(future, None) is None:
+                # Cancelled while this job was about to run
+                return
+        try:
+            self.before_retry(*args, **kwargs)
+        except Exception as exc:
+            self._set_future(future, exception=exc)
+            return
+        self._attempt_async(future, backoff_strategy, execute_method, args,
+                            kwargs)
+
+    @staticmethod
+    def _set_future(future, result=None, exception=None):
+        """ Resolve a future unless it was cancelled in the meantime """
+        if future.cancelled():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def _check_circuit(self, execute_method_name):
+        """ Raise CircuitOpen if the circuit breaker rejects an attempt """
+        if self._circuit_breaker is not None and \
+                not self._circuit_breaker.allow_request():
+            self.logger.warning(
+                "Circuit is open, not executing method {}".format(
+                    execute_method_name))
+            raise CircuitOpen(
+                "Circuit is open for method {}".format(execute_method_name))
+
+    def _record_attempt(self, succeeded):
+        if self._circuit_breaker is not None:
+            if succeeded:
+                self._circuit_breaker.record_success()
+            else:
+                self._circuit_breaker.record_failure()
+
     def use_backoff_strategy(self, strategy, *args, **kwargs):
         """ Tell this mixin which backoff strategy to use.
 
@@ -181,6 +381,10 @@ class Retry(object):
             *self.__backoff_strategy_args,
             **self.__backoff_strategy_kwargs)
         strategy.use_logger(self.logger)
+        if self._retry_budget is not None:
+            # set rather than passed to the constructor, which custom
+            # strategies may not let through
+            strategy.retry_budget = self._retry_budget
         return strategy
 
     def before_retry(self, *args, **kwargs):
@@ -1,2 +1,5 @@
 from nio.block.mixins.retry.strategies.linear import LinearBackoff
 from nio.block.mixins.retry.strategies.exponential import ExponentialBackoff
+from nio.block.mixins.retry.strategies.full_jitter import FullJitterBackoff
+from nio.block.mixins.retry.strategies.decorrelated_jitter import \
+    DecorrelatedJitterBackoff
@@ -0,0 +1,42 @@
+from random import uniform
+from time import sleep
+from nio.block.mixins.retry.strategy import BackoffStrategy
+
+
+class DecorrelatedJitterBackoff(BackoffStrategy):
+
+    def __init__(self, *args, max_delay=300, **kwargs):
+        """ Create a decorrelated jitter backoff
+
+        Args:
+            max_delay (float): Seconds to wait at most before a retry, with
+                or without a max_retry
+        """
+        super().__init__(*args, **kwargs)
+        self.max_delay = max_delay
+        self._last_delay = self.multiplier
+
+    def request_succeeded(self):
+        super().request_succeeded()
+        self._last_delay = self.multiplier
+
+    def wait_for_retry(self):
+        """Sleep a random number of seconds before we do the retry."""
+        sleep(self.next_retry_delay())
+
+    def next_retry_delay(self):
+        """Return a random number of seconds to wait before the retry.
+
+        Each delay is picked uniformly between the multiplier and three times
+        the previous delay, so delays grow about as fast as an exponential
+        backoff while clients that started failing together drift apart.
+
+        Delays are capped to max_delay, and to the one the exponential
+        backoff would wait on the max_retry retry if there is a maximum.
+        """
+        delay = min(uniform(self.multiplier, self._last_delay * 3),
+                    self.max_delay)
+        if self.max_retry > 0:
+            delay = min(delay, self.multiplier * 2**(self.max_retry-1))
+        self._last_delay = delay
+        return delay
@@ -0,0 +1,14 @@
+from random import uniform
+from nio.block.mixins.retry.strategies.exponential import ExponentialBackoff
+
+
+class FullJitterBackoff(ExponentialBackoff):
+
+    def next_retry_delay(self):
+        """Return a random number of seconds to wait before the retry.
+
+        The delay is picked uniformly between 0 and the delay the
+        exponential backoff would wait, so that clients failing at the same
+        time don't all retry at the same time too.
+        """
+        return uniform(0, super().next_retry_delay())
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+from nio.util.logging import get_nio_logger
+from nio.block.mixins.retry.strategies.decorrelated_jitter import \
+    DecorrelatedJitterBackoff
+from nio.testing import NIOTestCase
+
+
+class TestDecorrelatedJitterBackoff(NIOTestCase):
+
+    def test_delays(self):
+        """Delays grow from the previous delay and reset on success"""
+        strat = DecorrelatedJitterBackoff(
+            logger=get_nio_logger('DecorrelatedJitterTest'),
+            max_retry=5,
+            multiplier=2,
+            indefinite=False,
+        )
+        uniform_path = \
+            'nio.block.mixins.retry.strategies.decorrelated_jitter.uniform'
+        with patch(uniform_path, side_effect=lambda low, high: high) as \
+                uniform:
+            strat.request_failed(Exception())
+            self.assertEqual(strat.next_retry_delay(), 6)
+            uniform.assert_called_with(2, 6)
+            strat.request_failed(Exception())
+            self.assertEqual(strat.next_retry_delay(), 18)
+            uniform.assert_called_with(2, 18)
+            # Capped to the max_retry exponential delay
+            strat.request_failed(Exception())
+            self.assertEqual(strat.next_retry_delay(), 32)
+            strat.request_failed(Exception())
+            self.assertEqual(strat.next_retry_delay(), 32)
+            uniform.assert_called_with(2, 96)
+            strat.request_succeeded()
+            strat.request_failed(Exception())
+            self.assertEqual(strat.next_retry_delay(), 6)
+
+    def test_max_delay(self):
+        """Delays are capped even without a max_retry"""
+        strat = DecorrelatedJitterBackoff(
+            logger=get_nio_logger('DecorrelatedJitterTest'),
+            max_retry=-1,
+            multiplier=1,
+            indefinite=False,
+            max_delay=60,
+        )
+        uniform_path = \
+            'nio.block.mixins.retry.strategies.decorrelated_jitter.uniform'
+        with patch(uniform_path, side_effect=lambda low, high: high) as \
+                uniform:
+            for _ in range(100):
+                strat.request_failed(Exception())
+                delay = strat.next_retry_delay()
+            self.assertEqual(delay, 60)
+            # delays don't keep compounding past the cap
+            uniform.assert_called_with(1, 180)
+        self.assertEqual(DecorrelatedJitterBackoff().max_delay, 300)
+
+    def test_sleeps(self):
+        """The strategy sleeps for the jittered delay"""
+        strat = DecorrelatedJitterBackoff(
+            logger=get_nio_logger('DecorrelatedJitterTest'),
+            max_retry=5,
+            multiplier=1,
+            indefinite=False,
+        )
+        strat.request_failed(Exception())
+        sleep_path = \
+            'nio.block.mixins.retry.strategies.decorrelated_jitter.sleep'
+        with patch(sleep_path) as sleep:
+            strat.wait_for_retry()
+        self.assertTrue(1 <= sleep.call_args[0][0] <= 3)
@@ -95,3 +95,16 @@ class TestExponentialBackoff(NIOTestCase):
             strat.request_failed(Exception())
             self.assertFalse(strat.should_retry())
             sleep.assert_not_called()
+
+    def test_next_retry_delay(self):
+        """Test that the delay is available without sleeping"""
+        strat = ExponentialBackoff(
+            logger=get_nio_logger('ExponentialTest'),
+            max_retry=5,
+            multiplier=2,
+            indefinite=False,
+        )
+        strat.request_failed(Exception())
+        strat.request_failed(Exception())
+        strat.request_failed(Exception())
+        self.assertEqual(strat.next_retry_delay(), 8)
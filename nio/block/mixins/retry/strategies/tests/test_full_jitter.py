@@ -0,0 +1,36 @@
+from unittest.mock import patch
+from nio.util.logging import get_nio_logger
+from nio.block.mixins.retry.strategies.full_jitter import FullJitterBackoff
+from nio.testing import NIOTestCase
+
+
+class TestFullJitterBackoff(NIOTestCase):
+
+    def test_delay_bounds(self):
+        """The delay is picked between 0 and the exponential delay"""
+        strat = FullJitterBackoff(
+            logger=get_nio_logger('FullJitterTest'),
+            max_retry=5,
+            multiplier=1,
+            indefinite=False,
+        )
+        uniform_path = 'nio.block.mixins.retry.strategies.full_jitter.uniform'
+        with patch(uniform_path, return_value=0.5) as uniform:
+            for upper_bound in [1, 2, 4]:
+                strat.request_failed(Exception())
+                self.assertEqual(strat.next_retry_delay(), 0.5)
+                uniform.assert_called_with(0, upper_bound)
+
+    def test_sleeps(self):
+        """The strategy sleeps for the jittered delay"""
+        strat = FullJitterBackoff(
+            logger=get_nio_logger('FullJitterTest'),
+            max_retry=5,
+            multiplier=1,
+            indefinite=False,
+        )
+        strat.request_failed(Exception())
+        sleep_path = 'nio.block.mixins.retry.strategies.exponential.sleep'
+        with patch(sleep_path) as sleep:
+            strat.wait_for_retry()
+        self.assertTrue(0 <= sleep.call_args[0][0] <= 1)
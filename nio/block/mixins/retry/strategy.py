@@ -1,7 +1,7 @@
 class BackoffStrategy(object):
 
     def __init__(self, logger=None, max_retry=0, multiplier=1,
-                 indefinite=False, **kwargs):
+                 indefinite=False, retry_budget=None, **kwargs):
         """ Create an instance of a backoff strategy
 
         Args:
@@ -17,12 +17,15 @@ class BackoffStrategy(object):
                 to sleep for 7.5 seconds instead.
             indefinite (bool): Whether to continue on retrying indefinitely
                 once the max duration is reached
+            retry_budget (RetryBudget): An optional budget, usually shared
+                with other strategies, every retry has to fit in
         """
         super().__init__()
         self.logger = logger
         self.max_retry = max_retry
         self.multiplier = multiplier
         self.indefinite = indefinite
+        self.retry_budget = retry_budget
         self.retry_num = 0
 
     def request_failed(self, exc):
@@ -42,9 +45,9 @@ class BackoffStrategy(object):
 
         This method has a default implementation that will check if the max
         number of retries has taken place or if the indefinite retry
-        setting has been checked. In your strategy, if you wish to utilize
-        this behavior, you should only need to override the wait_for_retry
-        function.
+        setting has been checked, and whether the retry budget allows one
+        more retry. In your strategy, if you wish to utilize this behavior,
+        you should only need to override the wait_for_retry function.
 
         Returns:
             bool: True if the retry should execute. False if we are "done"
@@ -60,6 +63,11 @@ class BackoffStrategy(object):
                     "Done retrying - we have exceeded the maximum number "
                     "of retries ({})".format(self.max_retry))
                 return False
+        if self.retry_budget is not None and \
+                not self.retry_budget.try_acquire():
+            self.logger.warning(
+                "Done retrying - the retry budget has been exhausted")
+            return False
         # If we got here either we are retrying indefinitely or we haven't hit
         # our max yet, let's retry
         return True
@@ -72,6 +80,19 @@ class BackoffStrategy(object):
         """
         pass
 
+    def next_retry_delay(self):
+        """ Return how many seconds to wait before the next retry.
+
+        Used instead of wait_for_retry when retries are scheduled rather
+        than waited for (see Retry.execute_with_retry_async). Strategies
+        that wait a known amount of time should override this method and
+        sleep for its result in wait_for_retry.
+
+        Returns:
+            float: The number of seconds to wait before retrying
+        """
+        return 0
+
     def use_logger(self, logger):
         """Use a logger instance in this backoff strategy.
 
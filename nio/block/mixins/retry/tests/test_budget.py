@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+from nio.block.base import Block
+from nio.testing.block_test_case import NIOBlockTestCase
+from nio.block.mixins.retry.budget import RetryBudget, get_retry_budget, \
+    retry_budgets_stats
+from nio.block.mixins.retry.retry import Retry
+from nio.block.mixins.retry.strategy import BackoffStrategy
+from nio.util.logging import get_nio_logger
+
+
+class RetryingBlock(Retry, Block):
+    pass
+
+
+class StrictBackoff(BackoffStrategy):
+    """ A custom strategy whose constructor takes no extra keywords """
+
+    def __init__(self, max_retry, multiplier, indefinite):
+        super().__init__(max_retry=max_retry, multiplier=multiplier,
+                         indefinite=indefinite)
+
+
+class StrictRetryingBlock(Retry, Block):
+
+    def setup_backoff_strategy(self):
+        self.use_backoff_strategy(
+            StrictBackoff, **self.retry_options().get_options_dict())
+
+
+class TestRetryBudget(NIOBlockTestCase):
+
+    def test_budget(self):
+        """Retries are allowed up to the burst then at the budget rate"""
+        with patch('nio.util.token_bucket.monotonic',
+                   return_value=100):
+            budget = RetryBudget(1, 2)
+            self.assertTrue(budget.try_acquire())
+            self.assertTrue(budget.try_acquire())
+            self.assertFalse(budget.try_acquire())
+        self.assertDictEqual(budget.stats(), {"allowed": 2, "rejected": 1})
+
+    def test_shared_by_key(self):
+        """Budgets are shared process wide by key"""
+        key = uuid4().hex
+        budget = get_retry_budget(key, 1, 2)
+        self.assertIs(get_retry_budget(key, 5, 5), budget)
+        self.assertIsNot(get_retry_budget(uuid4().hex, 1, 2), budget)
+        self.assertIn(key, retry_budgets_stats())
+
+    def test_strategy_stops_retrying(self):
+        """Strategies stop retrying once the budget is exhausted"""
+        budget = MagicMock(spec=RetryBudget)
+        budget.try_acquire.side_effect = [True, False]
+        strat = BackoffStrategy(logger=get_nio_logger('BudgetTest'),
+                                max_retry=-1, retry_budget=budget)
+        strat.request_failed(Exception())
+        self.assertTrue(strat.should_retry())
+        strat.request_failed(Exception())
+        self.assertFalse(strat.should_retry())
+
+    def test_blocks_share_budget(self):
+        """Blocks configured with the same key draw from the same budget"""
+        key = uuid4().hex
+        blocks = [RetryingBlock(), RetryingBlock()]
+        for block in blocks:
+            self.configure_block(block, {
+                "retry_options": {
+                    "max_retry": -1,
+                    "retry_budget_key": key,
+                    "retry_budget_rate": 0.001,
+                    "retry_budget_burst": 3
+                }
+            })
+        target_func = MagicMock(side_effect=Exception)
+        with patch('nio.block.mixins.retry.strategies.linear.sleep'):
+            with self.assertRaises(Exception):
+                blocks[0].execute_with_retry(target_func)
+            self.assertEqual(target_func.call_count, 4)
+            with self.assertRaises(Exception):
+                blocks[1].execute_with_retry(target_func)
+            self.assertEqual(target_func.call_count, 5)
+        self.assertEqual(retry_budgets_stats()[key]["rejected"], 2)
+
+    def test_custom_strategy(self):
+        """Budgets apply to strategies not taking them in their constructor"""
+        key = uuid4().hex
+        block = StrictRetryingBlock()
+        self.configure_block(block, {
+            "retry_options": {
+                "max_retry": -1,
+                "retry_budget_key": key,
+                "retry_budget_rate": 0.001,
+                "retry_budget_burst": 1
+            }
+        })
+        target_func = MagicMock(side_effect=Exception)
+        with patch.object(StrictBackoff, "wait_for_retry"):
+            with self.assertRaises(Exception):
+                block.execute_with_retry(target_func)
+        self.assertEqual(target_func.call_count, 2)
+        self.assertEqual(retry_budgets_stats()[key]["rejected"], 1)
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+from nio.testing import NIOTestCase
+from nio.block.mixins.retry.circuit_breaker import CircuitBreaker, \
+    CircuitState
+
+
+class TestCircuitBreaker(NIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 100.0
+        patcher = patch(
+            "nio.block.mixins.retry.circuit_breaker.monotonic",
+            side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_opens_after_threshold(self):
+        """The circuit opens after consecutive failures only"""
+        breaker = CircuitBreaker(3, 10)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.closed)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.open)
+        self.assertFalse(breaker.allow_request())
+
+    def test_half_open_trial(self):
+        """A single trial request decides whether the circuit closes"""
+        breaker = CircuitBreaker(1, 10)
+        breaker.record_failure()
+        self.now += 10
+        self.assertEqual(breaker.state, CircuitState.half_open)
+        self.assertTrue(breaker.allow_request())
+        # Only one trial at a time
+        self.assertFalse(breaker.allow_request())
+        # A failed trial opens the circuit again
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.open)
+        self.now += 10
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.closed)
+        self.assertTrue(breaker.allow_request())
+        self.assertDictEqual(breaker.stats(), {
+            "state": "closed", "failures": 0, "opened": 2, "rejected": 1})
+
+    def test_invalid_threshold(self):
+        """A circuit breaker needs a positive threshold"""
+        with self.assertRaises(ValueError):
+            CircuitBreaker(0, 10)
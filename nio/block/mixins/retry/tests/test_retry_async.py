@@ -0,0 +1,128 @@
+from datetime import timedelta
+from unittest.mock import ANY, MagicMock, patch
+from nio.block.base import Block
+from nio.testing.block_test_case import NIOBlockTestCase
+from nio.block.mixins.retry.circuit_breaker import CircuitOpen
+from nio.block.mixins.retry.retry import Retry
+from nio.block.mixins.retry.strategy import BackoffStrategy
+
+
+class DelayBackoffStrategy(BackoffStrategy):
+    """ A backoff strategy that retries after a fixed delay """
+
+    def next_retry_delay(self):
+        return 2
+
+
+class RetryingBlock(Retry, Block):
+
+    def setup_backoff_strategy(self):
+        self.use_backoff_strategy(DelayBackoffStrategy, max_retry=2)
+
+
+class TestRetryAsync(NIOBlockTestCase):
+
+    def test_schedules_retries(self):
+        """Retries are scheduled instead of blocking the caller"""
+        block = RetryingBlock()
+        self.configure_block(block, {})
+        block.before_retry = MagicMock()
+        target_func = MagicMock(side_effect=[Exception, Exception, 5])
+        with patch("nio.block.mixins.retry.retry.Job") as job_mock:
+            future = block.execute_with_retry_async(target_func, 1, a=2)
+            self.assertFalse(future.done())
+            self.assertEqual(target_func.call_count, 1)
+            job_mock.assert_called_once_with(
+                block._retry_async, timedelta(seconds=2), False,
+                future, job_mock.call_args[0][4], target_func, (1,),
+                {"a": 2})
+            # Simulate the scheduler running the job
+            job_mock.call_args[0][0](*job_mock.call_args[0][3:])
+            self.assertEqual(job_mock.call_count, 2)
+            job_mock.call_args[0][0](*job_mock.call_args[0][3:])
+        self.assertEqual(future.result(0), 5)
+        self.assertEqual(target_func.call_count, 3)
+        self.assertEqual(block.before_retry.call_count, 2)
+        block.before_retry.assert_called_with(1, a=2)
+
+    def test_gives_up(self):
+        """The future holds the last exception once retries are over"""
+        block = RetryingBlock()
+        self.configure_block(block, {})
+        target_func = MagicMock(side_effect=ValueError)
+        with patch("nio.block.mixins.retry.retry.Job") as job_mock:
+            future = block.execute_with_retry_async(target_func)
+            for _ in range(2):
+                job_mock.call_args[0][0](*job_mock.call_args[0][3:])
+        self.assertEqual(target_func.call_count, 3)
+        self.assertIsInstance(future.exception(0), ValueError)
+
+    def test_stop_cancels_retries(self):
+        """Stopping the block cancels scheduled retries"""
+        block = RetryingBlock()
+        self.configure_block(block, {})
+        target_func = MagicMock(side_effect=Exception)
+        with patch("nio.block.mixins.retry.retry.Job") as job_mock:
+            future = block.execute_with_retry_async(target_func)
+            block.stop()
+            job_mock.return_value.cancel.assert_called_once_with()
+            # A job that was already running doesn't retry again
+            job_mock.call_args[0][0](*job_mock.call_args[0][3:])
+        self.assertTrue(future.cancelled())
+        self.assertEqual(target_func.call_count, 1)
+
+    def test_stop_during_attempt(self):
+        """An attempt running when the block stops doesn't retry"""
+        block = RetryingBlock()
+        self.configure_block(block, {})
+
+        def target_func():
+            block.stop()
+            raise Exception
+
+        with patch("nio.block.mixins.retry.retry.Job") as job_mock:
+            future = block.execute_with_retry_async(target_func)
+            job_mock.assert_not_called()
+        self.assertTrue(future.cancelled())
+        self.assertDictEqual(block._retry_jobs, {})
+
+        # retries are scheduled again once restarted
+        block.start()
+        with patch("nio.block.mixins.retry.retry.Job") as job_mock:
+            future = block.execute_with_retry_async(
+                MagicMock(side_effect=Exception))
+            job_mock.assert_called_once_with(
+                block._retry_async, timedelta(seconds=2), False,
+                future, job_mock.call_args[0][4], ANY, (), {})
+        block.stop()
+
+    def test_circuit_breaker(self):
+        """Consecutive failures open the circuit shared by all calls"""
+        block = RetryingBlock()
+        self.configure_block(block, {
+            "retry_options": {
+                "circuit_failures": 2,
+                "circuit_reset_timeout": 60
+            }
+        })
+        target_func = MagicMock(side_effect=Exception)
+        with patch("nio.block.mixins.retry.retry.Job") as job_mock:
+            first = block.execute_with_retry_async(target_func)
+            second = block.execute_with_retry_async(target_func)
+            # The circuit is now open, retries and new calls fail fast
+            job_mock.call_args[0][0](*job_mock.call_args[0][3:])
+            third = block.execute_with_retry_async(target_func)
+        self.assertEqual(target_func.call_count, 2)
+        self.assertFalse(first.done())
+        self.assertIsInstance(second.exception(0), CircuitOpen)
+        self.assertIsInstance(third.exception(0), CircuitOpen)
+        with self.assertRaises(CircuitOpen):
+            block.execute_with_retry(target_func)
+        self.assertDictEqual(block.circuit_breaker_stats(), {
+            "state": "open", "failures": 0, "opened": 1, "rejected": 3})
+
+    def test_no_circuit_breaker(self):
+        """The circuit breaker is disabled by default"""
+        block = RetryingBlock()
+        self.configure_block(block, {})
+        self.assertIsNone(block.circuit_breaker_stats())
@@ -13,6 +13,7 @@ it wants.
 """
 
 from enum import Enum
+from types import MappingProxyType
 
 # The ID that will be used to define the original default terminal
 DEFAULT_TERMINAL = "__default_terminal_value"
@@ -26,6 +27,32 @@ class TerminalType(Enum):
     output = "output"
 
 
+class TerminalMetadata(object):
+
+    """Frozen terminal information of a given type on a class
+
+    It is built the first time the terminals of a class are requested so
+    that later lookups (i.e. validating an input or output id) don't need to
+    walk the class hierarchy.
+    """
+
+    __slots__ = ("terminals", "ordered_terminals", "ids", "by_id", "default")
+
+    def __init__(self, terminals):
+        """ Create the metadata out of a class' unique terminals
+
+        Args:
+            terminals (list): The unique terminals on the class, sorted from
+                first to last as the classes appear in the MRO
+        """
+        self.terminals = tuple(terminals)
+        self.ordered_terminals = tuple(
+            sorted(terminals, key=lambda t: t.order))
+        self.ids = frozenset(t.id for t in terminals)
+        self.by_id = MappingProxyType({t.id: t for t in terminals})
+        self.default = next((t for t in terminals if t.default), None)
+
+
 class Terminal(object):
 
     """Decorator for declaring an input or output terminal on a block"""
@@ -79,6 +106,10 @@ class Terminal(object):
             setattr(cls, class_entry, list())
         attributes = getattr(cls, class_entry)
         attributes.append(self)
+        # discard any metadata built before this terminal was declared
+        metadata_entry = self._get_metadata_entry(cls, self._type)
+        if metadata_entry in cls.__dict__:
+            delattr(cls, metadata_entry)
         return cls
 
     def get_description(self):
@@ -116,35 +147,80 @@ class Terminal(object):
             list: A list of unique terminals on this block, sorted in order
                 according to the terminal's order attribute
 
+        Raises:
+            TypeError: If terminal_type is not a valid TerminalType enum
+        """
+        metadata = cls.get_terminal_metadata(class_to_inspect, terminal_type)
+        if order:
+            # Return the terminals sorted by their order
+            return list(metadata.ordered_terminals)
+        else:
+            return list(metadata.terminals)
+
+    @classmethod
+    def get_terminal_metadata(cls, class_to_inspect, terminal_type):
+        """ Get the terminal metadata of a certain type on a class
+
+        The metadata is computed the first time it is requested and cached on
+        the class, it assumes no new terminals are declared on the class or
+        its parents afterwards.
+
+        Args:
+            class_to_inspect (Block): A class that is a sub-class of Block that
+                you want to get the terminal metadata of
+            terminal_type (TerminalType): What type of terminals to look for
+
+        Returns:
+            TerminalMetadata: The terminal information of the class
+
         Raises:
             TypeError: If terminal_type is not a valid TerminalType enum
         """
         if not isinstance(terminal_type, TerminalType):
             raise TypeError("Terminal type must be a TerminalType")
 
+        metadata_entry = cls._get_metadata_entry(class_to_inspect,
+                                                 terminal_type)
+        metadata = class_to_inspect.__dict__.get(metadata_entry)
+        if metadata is None:
+            metadata = TerminalMetadata(
+                cls._find_terminals_on_class(class_to_inspect, terminal_type))
+            try:
+                setattr(class_to_inspect, metadata_entry, metadata)
+            except TypeError:
+                # builtin classes (i.e. object) can't be assigned attributes
+                pass
+        return metadata
+
+    @classmethod
+    def _find_terminals_on_class(cls, class_to_inspect, terminal_type):
+        """ Walk up the base classes looking for unique terminals
+
+        Returns:
+            list: The unique terminals on the class, sorted from first to last
+                as the classes appear in the MRO
+        """
         # Start off our terminals set with our class's terminals
         class_entry = cls._get_terminals_entry(class_to_inspect, terminal_type)
-        terminals = getattr(class_to_inspect, class_entry, list())
+        terminals = list(getattr(class_to_inspect, class_entry, list()))
+        terminal_ids = {term.id for term in terminals}
 
         # We also want to include the terminals of all super classes if they
         # don't already exist in ours
         for _class in class_to_inspect.__bases__:
-            parent_terms = cls.get_terminals_on_class(_class, terminal_type)
+            parent_terms = cls.get_terminal_metadata(
+                _class, terminal_type).ordered_terminals
             for parent_term in parent_terms:
                 # If we don't already have a record of the parent terminal's
                 # ID, then add the parent terminal to our output list
-                if parent_term.id not in [term.id for term in terminals]:
+                if parent_term.id not in terminal_ids:
                     terminals.append(parent_term)
+                    terminal_ids.add(parent_term.id)
 
         # Remove the DEFAULT_TERMINAL if it has other terminals defined
         if len(terminals) > 1:
             terminals = [t for t in terminals if t.id != DEFAULT_TERMINAL]
-
-        if order:
-            # Return the terminals sorted by their order
-            return sorted(terminals, key=lambda t: t.order)
-        else:
-            return terminals
+        return terminals
 
     @classmethod
     def get_default_terminal_on_class(cls, class_to_inspect, terminal_type):
@@ -167,17 +243,8 @@ class Terminal(object):
         Raises:
             TypeError: If terminal_type is not a valid TerminalType enum
         """
-        if not isinstance(terminal_type, TerminalType):
-            raise TypeError("Terminal type must be a TerminalType")
-
-        # Iterate through the terminals ignoring their order attribute. We need
-        # to do this so that we properly recurse up the MRO
-        my_terms = cls.get_terminals_on_class(
-            class_to_inspect, terminal_type, order=False)
-        for terminal in my_terms:
-            if terminal.default:
-                return terminal
-        return None
+        return cls.get_terminal_metadata(
+            class_to_inspect, terminal_type).default
 
     @classmethod
     def _get_terminals_entry(cls, _class, terminal_type):
@@ -200,6 +267,11 @@ class Terminal(object):
         """
         return "_{}_{}_attributes".format(_class.__name__, terminal_type.value)
 
+    @classmethod
+    def _get_metadata_entry(cls, _class, terminal_type):
+        """ Get the attribute name where a class' terminal metadata resides """
+        return "_{}_{}_metadata".format(_class.__name__, terminal_type.value)
+
 
 class input(Terminal):
 
@@ -358,6 +358,13 @@ class TestBaseBlock(NIOTestCaseNoModules):
         self.assertIn('log_level', desc['properties'])
         self.assertIn('name', desc['properties'])
         self.assertIn('properties', desc['commands'])
+        # callers get their own copy of the cached description
+        desc['properties'].clear()
+        desc['commands']['properties']['title'] = "changed"
+        desc = Block.get_description()
+        self.assertIn('log_level', desc['properties'])
+        self.assertNotEqual(
+            desc['commands']['properties'].get('title'), "changed")
 
     def test_default_block_terminals(self):
         """Make sure the block has its default terminals"""
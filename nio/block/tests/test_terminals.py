@@ -165,6 +165,28 @@ class TestInputOutput(NIOTestCaseNoModules):
         sub_out2 = next(t for t in outputs if t.id == 'o2')
         self.assertEqual(sub_out2.label, 'sub')
 
+    def test_terminal_metadata(self):
+        """Asserts that terminal metadata is built once per class"""
+        metadata = Terminal.get_terminal_metadata(
+            Duplicates, TerminalType.output)
+        self.assertIs(metadata, Terminal.get_terminal_metadata(
+            Duplicates, TerminalType.output))
+        self.assertEqual(metadata.ids, frozenset(["o1", "o2"]))
+        self.assertEqual(metadata.by_id["o2"].label, "sub")
+        self.assertEqual(
+            [t.id for t in metadata.ordered_terminals], ["o2", "o1"])
+        self.assertIsNone(metadata.default)
+
+        input_metadata = Terminal.get_terminal_metadata(
+            ParentSubClass, TerminalType.input)
+        self.assertEqual(input_metadata.default.id, "ParentSubClass_input")
+        # returned terminal lists can be modified safely
+        inputs = Terminal.get_terminals_on_class(
+            ParentSubClass, TerminalType.input)
+        inputs.clear()
+        self.assertEqual(len(Terminal.get_terminals_on_class(
+            ParentSubClass, TerminalType.input)), 3)
+
     def test_terminal_types(self):
         """Asserts that terminals can only be created with TerminalType"""
         # Try to create a bad terminal
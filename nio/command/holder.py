@@ -2,6 +2,8 @@
     NIO Command Holder class
 
 """
+from copy import deepcopy
+
 from nio.command.base import Command, InvalidCommandArg
 
 
@@ -70,16 +72,23 @@ class CommandHolder(object):
 
         This is useful in serialization/deserialization.
 
+        Once this method is called, the description is cached on the class,
+        it assumes no new command definitions are added to the class.
+        Callers get a copy of it they are free to change.
+
         Returns:
             description (dict): a dictionary containing both property and
                 command data.
 
         """
-        class_commands = cls.get_commands()
-        commands = {}
-        for c in class_commands:
-            commands[c] = class_commands[c].get_description()
-        return commands
+        description_attr = "{0}_commands_description".format(cls.__name__)
+        if description_attr not in cls.__dict__:
+            class_commands = cls.get_commands()
+            commands = {}
+            for c in class_commands:
+                commands[c] = class_commands[c].get_description()
+            setattr(cls, description_attr, commands)
+        return deepcopy(getattr(cls, description_attr))
 
     def invoke(self, id, args):
         """ Call the instance method 'id' with the specified arguments.
@@ -1,5 +1,4 @@
 import re
-from weakref import WeakKeyDictionary
 
 from nio.properties.exceptions import AllowNoneViolation
 from nio.properties.util.property_value import PropertyValue
@@ -16,8 +15,12 @@ class BaseProperty(object):
     Attributes:
         type (Type): The type of data held in this property.
         description (dict): Property settings.
+        cache_value (bool): Whether constant values can be deserialized
+            once and served from a cache by their PropertyValue.
     """
 
+    cache_value = True
+
     def __init__(self, _type, title=None, advanced=False, visible=True, 
                     order=None, allow_none=False, default=None, **kwargs):
         self.type = _type
@@ -41,22 +44,42 @@ class BaseProperty(object):
         # Default value info
         self._default = default
         self._cached_default = None
-        self._default_property_value = PropertyValue(self, self._default)
-
-        # Set up a values dictionary to keep track of values per instance
-        # We want a WeakKeyDict so that instances aren't kept in memory
-        # based on this property
-        self._values = WeakKeyDictionary()
-
-        # Description needs to be serializble so save type as __name__
-        self.description = dict(type=_type.__name__,
-                                title=title,
-                                advanced=advanced,
-                                order=order,
-                                visible=visible,
-                                allow_none=allow_none,
-                                default=default,
-                                **kwargs)
+        # created the first time a holder without a value is asked for it
+        self._default_property_value = None
+
+        # Values are kept in the instance's __dict__ under this key so that
+        # they live and die with the instance. The key is not a valid
+        # identifier so it never clashes with regular instance attributes,
+        # __set_name__ makes it readable when defined in a class body
+        self._storage_name = "property:{}".format(id(self))
+
+        # Description is built the first time it is requested
+        self._description = None
+
+    def __set_name__(self, owner, name):
+        self._storage_name = "property:{}".format(name)
+
+    @property
+    def description(self):
+        """ Serializable property settings, computed on first access """
+        if self._description is None:
+            # Description needs to be serializble so save type as __name__
+            description = dict(type=self.type.__name__,
+                               title=self.title,
+                               advanced=self.advanced,
+                               order=self.order,
+                               visible=self.visible,
+                               allow_none=self.allow_none,
+                               default=self._default,
+                               **self.kwargs)
+            description.update(
+                self._get_description(default=self._default, **self.kwargs))
+            self._description = description
+        return self._description
+
+    def _get_description(self, **kwargs):
+        """ Override to add property specific settings to the description """
+        return {}
 
     @property
     def default(self):
@@ -84,7 +107,15 @@ class BaseProperty(object):
             and allow_none is False.
 
         """
-        return self._values.get(instance, self._default_property_value)
+        if instance is not None:
+            value = instance.__dict__.get(self._storage_name)
+            if value is not None:
+                return value
+        default_value = self._default_property_value
+        if default_value is None:
+            default_value = self._default_property_value = \
+                PropertyValue(self, self._default)
+        return default_value
 
     def __set__(self, instance, value):
         """ Save the value as a PropertyValue
@@ -93,7 +124,11 @@ class BaseProperty(object):
         as callable PropertyValues instead of the raw value.
 
         """
-        self._values[instance] = PropertyValue(self, value)
+        if instance.__dict__.get("_frozen"):
+            raise AttributeError(
+                "Property values of {} are frozen".format(
+                    instance.__class__.__name__))
+        instance.__dict__[self._storage_name] = PropertyValue(self, value)
 
     def __str__(self):
         return "type is: {}, args are {}".format(self.type, self.kwargs)
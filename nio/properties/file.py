@@ -4,5 +4,8 @@ from nio.types import FileType
 
 class FileProperty(BaseProperty):
 
+    # FileHolder keeps the stream it opens, each call needs its own holder
+    cache_value = False
+
     def __init__(self, **kwargs):
         super().__init__(FileType, **kwargs)
@@ -1,3 +1,5 @@
+from copy import deepcopy
+
 from nio.properties.base import BaseProperty
 from nio.properties.exceptions import NoClassVersion, NoInstanceVersion, \
     OlderThanMinVersion
@@ -57,6 +59,15 @@ class PropertyHolder(object):
             # Deserialize to check for AllowNoneViolation and TypeError
             prop.deserialize(value)
 
+    def freeze(self):
+        """ Prevent property values from being changed
+
+        Property holders served as cached property values are shared by
+        every caller, setting one of their properties raises AttributeError
+        once frozen.
+        """
+        self._frozen = True
+
     @classmethod
     def validate_dict(cls, properties):
         """ Call and deserialize each input property to determine validity.
@@ -119,17 +130,26 @@ class PropertyHolder(object):
         Args:
             None
 
+        Once this method is called, the description is cached on the class,
+        it assumes no new properties are added to the class. Callers get a
+        copy of it they are free to change.
+
         Returns:
             Instance description as a dictionary of properties
 
         """
-        class_properties = cls.get_class_properties()
-        descriptions = {property_name: prop.description
-                        for (property_name, prop) in class_properties.items()}
-        if hasattr(cls, "__version__") and "version" not in descriptions:
-            descriptions["version"] = cls.__version__
-
-        return descriptions
+        class_attribute = "{0}_properties_description".format(cls.__name__)
+        if class_attribute not in cls.__dict__:
+            class_properties = cls.get_class_properties()
+            descriptions = {property_name: prop.description
+                            for (property_name, prop) in
+                            class_properties.items()}
+            if hasattr(cls, "__version__") and "version" not in descriptions:
+                descriptions["version"] = cls.__version__
+
+            # cache description
+            setattr(cls, class_attribute, descriptions)
+        return deepcopy(getattr(cls, class_attribute))
 
     @classmethod
     def get_defaults(cls):
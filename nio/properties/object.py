@@ -1,4 +1,6 @@
 import inspect
+from threading import Lock
+
 from nio.properties import BaseProperty
 from nio.properties import PropertyHolder
 from nio.properties.util.object_type import ObjectType
@@ -27,12 +29,24 @@ class ObjectProperty(BaseProperty):
         kwargs['obj_type'] = obj_type
 
         # if no default was specified in the definition, make the default to be
-        # an [obj_type] instance
-        if 'default' not in kwargs:
-            kwargs['default'] = obj_type()
+        # an [obj_type] instance, created the first time it is needed
+        self._default_obj_type = None if 'default' in kwargs else obj_type
+        self._default_lock = Lock()
 
         super().__init__(ObjectType, **kwargs)
-        self.description.update(self._get_description(**kwargs))
+
+    @property
+    def _default(self):
+        if self._default_obj_type is not None:
+            with self._default_lock:
+                if self._default_obj_type is not None:
+                    self._default_value = self._default_obj_type()
+                    self._default_obj_type = None
+        return self._default_value
+
+    @_default.setter
+    def _default(self, default):
+        self._default_value = default
 
     def _get_description(self, **kwargs):
         """ Description needs to be json serializable """
@@ -43,7 +57,7 @@ class ObjectProperty(BaseProperty):
 
     def _prepare_template(self, **kwargs):
         # add object description
-        return {"template": self.kwargs["obj_type"]().get_description()}
+        return {"template": self.kwargs["obj_type"].get_description()}
 
     def _prepare_default(self, **kwargs):
         """ default in description should be serializable """
@@ -9,7 +9,6 @@ class SelectProperty(BaseProperty):
     def __init__(self, enum, **kwargs):
         kwargs['enum'] = enum
         super().__init__(SelectType, **kwargs)
-        self.description.update(self._get_description(**kwargs))
 
     def _get_description(self, **kwargs):
         """ Description needs to be json serializable """
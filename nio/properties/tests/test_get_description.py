@@ -1,4 +1,6 @@
-from nio.properties import PropertyHolder
+from unittest.mock import patch
+
+from nio.properties import PropertyHolder, ObjectProperty, ListProperty
 from nio.properties import StringProperty
 from nio.testing.test_case import NIOTestCaseNoModules
 
@@ -34,3 +36,68 @@ class TestDefaults(NIOTestCaseNoModules):
         self.assertIn("version", with_version_as_property)
         self.assertNotEqual(with_version_as_property["version"],
                             "version_in_class")
+
+    def test_description_is_cached(self):
+        """The description is computed once per class."""
+
+        class Holder(PropertyHolder):
+            string_property = StringProperty(title="string_property")
+
+        with patch.object(StringProperty, "_get_description",
+                          return_value={}) as get_description:
+            description = Holder.get_description()
+            self.assertEqual(Holder.get_description(), description)
+            self.assertEqual(get_description.call_count, 1)
+        self.assertEqual(description["string_property"]["title"],
+                         "string_property")
+        # callers get their own copy
+        description["string_property"]["title"] = "changed"
+        description.clear()
+        self.assertEqual(
+            Holder.get_description()["string_property"]["title"],
+            "string_property")
+
+    def test_description_is_lazy(self):
+        """Defining a property holder does no description work."""
+
+        class Contained(PropertyHolder):
+            string_property = StringProperty(title="string_property")
+
+        with patch.object(Contained, "get_description",
+                          return_value={}) as get_description:
+
+            class Holder(PropertyHolder):
+                object_property = ObjectProperty(Contained,
+                                                 title="object_property")
+                list_property = ListProperty(Contained,
+                                             title="list_property")
+
+            get_description.assert_not_called()
+            description = Holder.get_description()
+            self.assertEqual(get_description.call_count, 2)
+            self.assertEqual(description["object_property"]["template"], {})
+            self.assertEqual(description["list_property"]["template"], {})
+
+    def test_object_default_is_lazy(self):
+        """Object properties create their default object when needed."""
+
+        class Contained(PropertyHolder):
+            string_property = StringProperty(title="string_property",
+                                             default="default")
+
+        with patch.object(Contained, "__init__",
+                          return_value=None) as init:
+
+            class Holder(PropertyHolder):
+                object_property = ObjectProperty(Contained,
+                                                 title="object_property")
+
+            init.assert_not_called()
+            holder = Holder()
+            self.assertIsInstance(holder.object_property(), Contained)
+            self.assertIs(Holder().object_property(),
+                          holder.object_property())
+            self.assertEqual(init.call_count, 1)
+        self.assertEqual(
+            Holder.get_description()["object_property"]["default"],
+            {"string_property": "default"})
@@ -1,7 +1,70 @@
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+
 from nio.properties.exceptions import AllowNoneViolation
 from nio.properties.util.evaluator import Evaluator
 
 
+# Marker for a constant value that has not been deserialized yet
+_NOT_CACHED = object()
+
+# Deserialized values that can be shared between callers
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, type(None), date,
+                    datetime, time, timedelta, Enum)
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Cached property values are read-only, copy them to "
+                    "make changes")
+
+
+class FrozenList(list):
+
+    """ A list that can't be changed, copies of it are regular lists """
+
+    append = extend = insert = remove = pop = clear = sort = reverse = \
+        __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+class FrozenDict(dict):
+
+    """ A dict that can't be changed, copies of it are regular dicts """
+
+    pop = popitem = clear = update = setdefault = \
+        __setitem__ = __delitem__ = _read_only
+
+    def __reduce_ex__(self, protocol):
+        return dict, (dict(self),)
+
+
+def _freeze(value):
+    """ Returns a form of a deserialized value callers can share
+
+    Lists and dicts can't be changed anymore and property holders refuse
+    new property values, nested values included.
+
+    Raises:
+        TypeError: the value can't be frozen
+    """
+    from nio.properties import PropertyHolder
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    if isinstance(value, list):
+        return FrozenList(_freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return FrozenDict(
+            (key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, PropertyHolder):
+        value.freeze()
+        return value
+    raise TypeError("Can't freeze {}".format(type(value).__name__))
+
+
 class PropertyValue:
     """ Returned when accessing properties on property holders
 
@@ -9,17 +72,62 @@ class PropertyValue:
     property. If the value is a string that is a valied n.io expression, it
     is first evaluated, optionally against a Signal.
 
+    Constant values (not expressions nor environment variables) are
+    deserialized once, the first time the PropertyValue is called, and the
+    result is served from then on. Since every caller gets the same value,
+    lists and dicts are served as read-only FrozenList and FrozenDict, and
+    property holders are frozen. Other values are deserialized on every
+    call.
+
     """
 
+    __slots__ = ("_property", "_value", "_evaluator", "_is_expression",
+                 "_is_constant", "_cached_value")
+
     def __init__(self, property, value=None):
         self._property = property
         self.value = value
-        self.evaluator = Evaluator(str(value))
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._evaluator = None
+        self._is_expression = self._property.is_expression(value)
+        self._is_constant = \
+            self._property.cache_value and \
+            not self._is_expression and \
+            not self._property.is_env_var(value)
+        self._cached_value = _NOT_CACHED
+
+    @property
+    def evaluator(self):
+        """ Evaluator for the value, created the first time it is needed """
+        if self._evaluator is None:
+            self._evaluator = Evaluator(str(self._value))
+        return self._evaluator
 
     def __call__(self, signal=None):
         """ Return value, evaluated if it is an expression """
+        if self._is_constant:
+            value = self._cached_value
+            if value is _NOT_CACHED:
+                # Deserialize errors are not cached, they will be raised
+                # again on the next call
+                value = self._resolve()
+                try:
+                    value = self._cached_value = _freeze(value)
+                except TypeError:
+                    self._is_constant = False
+            return value
+        return self._resolve(signal)
+
+    def _resolve(self, signal=None):
         from nio.properties import PropertyHolder
-        if self._property.is_expression(self.value):
+        if self._is_expression:
             # Expression properties need to be evaluated
             value = self.evaluator.evaluate(signal)
             if value is None:
@@ -1,7 +1,10 @@
-from unittest.mock import MagicMock
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
 from nio.properties.exceptions import AllowNoneViolation
 from nio.properties.base import BaseProperty
 from nio.properties.holder import PropertyHolder
+from nio.properties.int import IntProperty
+from nio.properties.object import ObjectProperty
 from nio.properties.util.property_value import PropertyValue
 from nio.signal.base import Signal
 from nio.types.base import Type
@@ -12,6 +15,10 @@ class SampleHolder(PropertyHolder):
     pass
 
 
+class SampleObject(PropertyHolder):
+    number = IntProperty(title="Number", default=0)
+
+
 class TestPropertyValue(NIOTestCaseNoModules):
 
     def test_expression(self):
@@ -63,3 +70,105 @@ class TestPropertyValue(NIOTestCaseNoModules):
         property_value = PropertyValue(property, value=property_holder)
         value = property_value()
         self.assertEqual(value, property_holder)
+
+    def test_constant_is_deserialized_once(self):
+        """Constant values are deserialized on first call only."""
+        property = BaseProperty(Type, title="property")
+        property_value = PropertyValue(property, value="constant")
+        with patch.object(property, "deserialize",
+                          return_value="constant") as deserialize:
+            self.assertEqual(property_value(), "constant")
+            self.assertEqual(property_value(), "constant")
+            self.assertEqual(deserialize.call_count, 1)
+
+    def test_expression_is_not_cached(self):
+        """Expressions are evaluated and deserialized on every call."""
+        property = BaseProperty(Type, title="property")
+        property_value = PropertyValue(property, value="{{ $attr }}")
+        self.assertEqual(property_value(Signal({"attr": 1})), 1)
+        self.assertEqual(property_value(Signal({"attr": 2})), 2)
+
+    def test_env_var_is_not_cached(self):
+        """Environment variables are deserialized on every call."""
+        property = BaseProperty(Type, title="property")
+        property_value = PropertyValue(property, value="[[ENV_VAR]]")
+        with patch.object(property, "deserialize",
+                          return_value="[[ENV_VAR]]") as deserialize:
+            property_value()
+            property_value()
+            self.assertEqual(deserialize.call_count, 2)
+
+    def test_cache_value_disabled(self):
+        """Properties can opt out of caching their constant values."""
+        property = BaseProperty(Type, title="property")
+        property.cache_value = False
+        property_value = PropertyValue(property, value="constant")
+        with patch.object(property, "deserialize",
+                          return_value="constant") as deserialize:
+            property_value()
+            property_value()
+            self.assertEqual(deserialize.call_count, 2)
+
+    def test_failed_deserialize_is_not_cached(self):
+        """Deserialize errors are raised on every call."""
+        property = BaseProperty(Type, title="property")
+        property_value = PropertyValue(property, value=None)
+        for _ in range(2):
+            with self.assertRaises(AllowNoneViolation):
+                property_value()
+
+    def test_mutable_values_are_frozen(self):
+        """Lists, dicts and property holders are cached read-only."""
+        property = BaseProperty(Type, title="property")
+        for value in ([1, [2, 3]], {"key": ["value"]}, [{"key": "value"}]):
+            property_value = PropertyValue(property, value=value)
+            with patch.object(property, "deserialize",
+                              side_effect=deepcopy) as deserialize:
+                first = property_value()
+                self.assertIs(property_value(), first)
+                self.assertEqual(deserialize.call_count, 1)
+            self.assertEqual(first, value)
+            # nested values included
+            nested = next(iter(first.values())) \
+                if isinstance(first, dict) else first[-1]
+            for frozen in (first, nested):
+                with self.assertRaises(TypeError):
+                    frozen.clear()
+            with self.assertRaises(TypeError):
+                first[0] = "changed"
+            # copies are regular values callers can change
+            copied = deepcopy(first)
+            copied.clear()
+            self.assertEqual(property_value(), value)
+
+    def test_property_holder_is_frozen(self):
+        """Property holders served from the cache refuse new values."""
+        property = ObjectProperty(SampleObject, title="property")
+        property_value = PropertyValue(property, value={"number": 1})
+        holder = property_value()
+        self.assertIs(property_value(), holder)
+        self.assertEqual(holder.number(), 1)
+        with self.assertRaises(AttributeError):
+            holder.number = 2
+        self.assertEqual(property_value().number(), 1)
+
+    def test_setting_value_resets_cache(self):
+        """Assigning a new raw value discards the cached one."""
+        property = BaseProperty(Type, title="property")
+        property_value = PropertyValue(property, value="first")
+        self.assertEqual(property_value(), "first")
+        property_value.value = "second"
+        self.assertEqual(property_value(), "second")
+        property_value.value = "{{ 'third' }}"
+        self.assertEqual(property_value(), "third")
+
+    def test_evaluator_is_lazy(self):
+        """Evaluators are only created for values that need them."""
+        property = BaseProperty(Type, title="property")
+        property_value = PropertyValue(property, value="constant")
+        property_value()
+        self.assertIsNone(property_value._evaluator)
+        property_value = PropertyValue(property, value="{{ 'value' }}")
+        self.assertIsNone(property_value._evaluator)
+        property_value()
+        self.assertIsNotNone(property_value._evaluator)
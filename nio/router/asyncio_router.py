@@ -0,0 +1,186 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+
+from nio.router.base import BlockRouter
+from nio.util.runner import RunnerStatus
+from nio.util.threading import spawn
+
+
+# Event loop shared by the routers configured with the "shared" event loop
+_shared_loop = None
+_shared_loop_lock = Lock()
+
+
+def _run_event_loop(loop):
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+def _start_event_loop():
+    """ Returns a new event loop running in its own thread, and the thread """
+    loop = asyncio.new_event_loop()
+    return loop, spawn(_run_event_loop, loop)
+
+
+def get_shared_event_loop():
+    """ Returns the event loop shared by routers, started on first use """
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None or _shared_loop.is_closed():
+            _shared_loop, _ = _start_event_loop()
+        return _shared_loop
+
+
+class AsyncioBlockRouter(BlockRouter):
+
+    """ A router that awaits coroutine blocks on an asyncio event loop
+
+    Blocks defining process_signals as a coroutine function ('async def')
+    have signals delivered on an event loop, running at most
+    'max_concurrency' deliveries per block at a time, further deliveries
+    wait for their turn on the loop. Blocks doing I/O can then have
+    thousands of requests in flight without a thread each.
+
+    Other blocks have signals delivered in a thread pool of 'max_workers'
+    threads so that they never hold up the event loop.
+
+    The "event_loop" setting selects the loop coroutine blocks run on,
+    "service" (the default) runs a loop dedicated to this router, "shared"
+    uses a single loop for every router in the process.
+    """
+
+    runs_coroutines = True
+
+    def __init__(self):
+        """ Create a new asyncio router """
+        super().__init__()
+        self._loop = None
+        self._loop_thread = None
+        self._shared_loop = False
+        self._executor = None
+        self._max_concurrency = 100
+        # block -> True if its process_signals is a coroutine function
+        self._coroutine_blocks = {}
+        # block -> asyncio.Semaphore, only used from the event loop
+        self._semaphores = {}
+        # tasks of the deliveries waiting or in progress on the event loop,
+        # only used from the event loop
+        self._tasks = set()
+
+    def configure(self, context):
+        """ Configures router
+
+        Finds out which blocks are coroutine blocks and instantiates the
+        executor delivering signals to the other blocks
+        """
+        super().configure(context)
+        event_loop = context.settings.get("event_loop", "service")
+        if event_loop not in ("service", "shared"):
+            raise ValueError("Invalid event_loop: {}".format(event_loop))
+        self._shared_loop = event_loop == "shared"
+        self._max_concurrency = context.settings.get("max_concurrency", 100)
+        self._executor = ThreadPoolExecutor(
+            max_workers=context.settings.get("max_workers", 50))
+        self._coroutine_blocks = {
+            block: asyncio.iscoroutinefunction(block.process_signals)
+            for block in context.blocks.values()}
+        self._semaphores = {}
+
+    def start(self):
+        if self._shared_loop:
+            self._loop = get_shared_event_loop()
+        else:
+            self._loop, self._loop_thread = _start_event_loop()
+        super().start()
+
+    def stop(self):
+        super().stop()
+        if self._loop is not None and not self._loop.is_closed():
+            # deliveries still waiting or in progress are cancelled
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    self._cancel_pending(), self._loop).result(1)
+            except Exception:
+                self.logger.warning("Failed to cancel pending deliveries",
+                                    exc_info=True)
+            if not self._shared_loop:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop_thread.join(1)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def deliver_signals(self, block_receiver, signals):
+        """ Await coroutine blocks on the event loop, deliver signals to
+        other blocks in the executor """
+        if self._coroutine_blocks.get(block_receiver.block):
+            self._loop.call_soon_threadsafe(
+                self._create_delivery_task, block_receiver, signals)
+        else:
+            self._executor.submit(
+                self.notify_signals_to_block, block_receiver, signals)
+
+    def _create_delivery_task(self, block_receiver, signals):
+        if not self.status.is_set(RunnerStatus.started):
+            # scheduled before the router stopped, i.e. on a shared loop
+            self.signals_processed(block_receiver, signals)
+            return
+        task = self._loop.create_task(
+            self._deliver_async(block_receiver, signals))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver_async(self, block_receiver, signals):
+        semaphore = self._semaphores.get(block_receiver.block)
+        if semaphore is None:
+            semaphore = self._semaphores[block_receiver.block] = \
+                asyncio.Semaphore(self._max_concurrency)
+        try:
+            async with semaphore:
+                await self.notify_signals_to_block_async(
+                    block_receiver, signals)
+        finally:
+            # cancelled deliveries are not in flight anymore either
+            self.signals_processed(block_receiver, signals)
+
+    async def notify_signals_to_block_async(self, block_receiver, signals):
+        """ Await process_signals on a coroutine block
+
+        Coroutine counterpart of notify_signals_to_block, keeps track of
+        diagnostics and traces the same way.
+        """
+        edge = block_receiver.diagnostic_edge if self._diagnostics else None
+        if edge is not None:
+            start = perf_counter()
+        try:
+            if block_receiver.include_input_id:
+                await block_receiver.block.process_signals(
+                    signals, block_receiver.input_id)
+            else:
+                await block_receiver.block.process_signals(signals)
+        except asyncio.CancelledError:
+            raise
+        except:
+            self.logger.exception("{}.process_signals failed".
+                                  format(block_receiver.block.label()))
+        if edge is not None:
+            self._diagnostic_manager.on_edge_processed(
+                edge, perf_counter() - start)
+        if self._tracer is not None:
+            self._tracer.on_processed(block_receiver.block.id(), signals)
+
+    async def _cancel_pending(self):
+        # deliveries scheduled before this coroutine all have a task by now
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def pending_deliveries(self):
+        """ int: deliveries to coroutine blocks waiting or in progress """
+        return len(self._tasks)
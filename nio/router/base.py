@@ -1,9 +1,17 @@
 import inspect
+import logging
 
+from asyncio import iscoroutinefunction
 from collections import Iterable
+from concurrent.futures import Future
 from copy import deepcopy
+from functools import partial
+from random import random
+from time import perf_counter
 
 from nio.router.diagnostic import DiagnosticManager
+from nio.router.flow_control import FlowControl
+from nio.router.tracing import SignalTracer
 from nio.signal.base import Signal
 from nio.util.runner import Runner, RunnerStatus
 
@@ -45,6 +53,9 @@ class BlockReceiverData(object):
         self.input_id = input_id
         self.output_id = output_id
         self.include_input_id = self._block_defines_input_id(block)
+        # Key diagnostics count deliveries to this receiver by, set by the
+        # router when diagnostics are enabled
+        self.diagnostic_edge = None
 
     def _block_defines_input_id(self, block):
         """ Returns True if the block developer can receive the input ID """
@@ -73,6 +84,10 @@ class BlockRouter(Runner):
     a speedy delivery to receiving blocks.
     """
 
+    # whether blocks processing signals in a coroutine ('async def') can
+    # receive signals from this router, see AsyncioBlockRouter
+    runs_coroutines = False
+
     def __init__(self):
         """ Create a new block router instance """
         # Parent class Runner creates logger for class
@@ -82,8 +97,17 @@ class BlockRouter(Runner):
         self._receivers = None
         self._clone_signals = False
         self._check_signal_type = True
+        self._trusted_signal_check = "once"
+        self._trusted_sample_rate = 0.01
+        self._trusted_blocks = frozenset()
+        self._validated_blocks = set()
         self._diagnostics = True
         self._diagnostic_manager = None
+        self._tracer = None
+        self._flow_control = None
+        # (block id, output id) -> ids of the blocks signals notified on the
+        # output go through
+        self._downstream = {}
 
     def configure(self, context):
         """Configures block router.
@@ -102,6 +126,20 @@ class BlockRouter(Runner):
             self.logger.info('Set to clone signals for multiple receivers')
         self._check_signal_type = \
             context.settings.get("check_signal_type", True)
+        # Blocks declaring themselves trusted producers only get the signals
+        # they notify type checked "once", on a "sample" of notifications or
+        # "always", i.e. when debugging a block
+        self._trusted_signal_check = \
+            context.settings.get("trusted_signal_check", "once")
+        if self._trusted_signal_check not in ("once", "sample", "always"):
+            raise ValueError("Invalid trusted_signal_check: {}".format(
+                self._trusted_signal_check))
+        self._trusted_sample_rate = \
+            context.settings.get("trusted_sample_rate", 0.01)
+        self._trusted_blocks = frozenset(
+            block for block in context.blocks.values()
+            if getattr(block, "trusted_producer", False))
+        self._validated_blocks = set()
         self._diagnostics = \
             context.settings.get("diagnostics", True)
         if self._diagnostics:
@@ -156,6 +194,31 @@ class BlockRouter(Runner):
                         sender_block._default_output.id)
                     self._receivers[sender_block_id].extend(parsed_receivers)
 
+            if self._diagnostics:
+                for receiver_data in self._receivers[sender_block_id]:
+                    receiver_data.diagnostic_edge = \
+                        DiagnosticManager.create_edge(
+                            sender_block.type(),
+                            sender_block_id,
+                            receiver_data.block.type(),
+                            receiver_data.block.id())
+
+        # Tracing is opt-in, signals are only traced when sampled
+        trace_sample_rate = context.settings.get("trace_sample_rate", 0)
+        if trace_sample_rate > 0:
+            sinks = [block_id for block_id in context.blocks
+                     if not self._receivers.get(block_id)]
+            self._tracer = SignalTracer(trace_sample_rate, sinks)
+        else:
+            self._tracer = None
+
+        # Flow control is opt-in, blocks are given credits for the signals
+        # they can have in flight
+        max_in_flight = context.settings.get("max_in_flight", 0)
+        self._flow_control = FlowControl(max_in_flight) \
+            if max_in_flight > 0 else None
+        self._downstream = {}
+
     def start(self):
         super().start()
         if self._diagnostics:
@@ -165,6 +228,9 @@ class BlockRouter(Runner):
         if self._diagnostics:
             self._diagnostic_manager.do_stop()
         super().stop()
+        if self._flow_control is not None:
+            # signals still waiting to be delivered are dropped
+            self._flow_control.reset()
 
     def _process_receivers_list(self, receivers, blocks, output_id):
         """ Goes through and process each receiver
@@ -230,6 +296,13 @@ class BlockRouter(Runner):
                 "Input {} is invalid for block {}".format(
                     input_id, receiver_block))
 
+        if not self.runs_coroutines and \
+                iscoroutinefunction(receiver_block.process_signals):
+            raise InvalidProcessSignalsSignature(
+                "Block {} processes signals in a coroutine, it needs a "
+                "nio.router.asyncio_router.AsyncioBlockRouter".format(
+                    receiver_block.label(True)))
+
         receiver_data = BlockReceiverData(receiver_block,
                                           input_id,
                                           output_id)
@@ -249,7 +322,9 @@ class BlockRouter(Runner):
 
         The signals argument is handled as follows:
             - every signal notified has to be an instance of 'Signal' by
-                default, although it is configurable
+                default, although it is configurable. Signals notified by
+                trusted producer blocks are only checked according to the
+                "trusted_signal_check" setting
             - an empty list or something evaluating to False is discarded
 
         """
@@ -280,26 +355,35 @@ class BlockRouter(Runner):
             # make sure container has signals only, quit iterating as soon as a
             # not-complying signal is found.
             if self._check_signal_type and \
+               self._should_check_types(block) and \
                any(not isinstance(signal, Signal) for signal in signals):
                 raise \
                     TypeError("All signals must be instances of Signal")
 
+            if self._tracer is not None:
+                self._tracer.on_notify(block.id(), signals)
+
             # determine if signals are to be cloned.
             clone_signals = \
                 self._clone_signals and len(self._receivers[block.id()]) > 1
 
+            # skip building debug messages unless they are logged
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+
             for receiver_data in self._receivers[block.id()]:
                 if receiver_data.block.status.is_set(RunnerStatus.error):
-                    self.logger.debug(
-                        "Block '{}' has status 'error'. Not delivering "
-                        "signals from '{}'...".format(
-                            receiver_data.block.label(), block.label()))
+                    if debug:
+                        self.logger.debug(
+                            "Block '{}' has status 'error'. Not delivering "
+                            "signals from '{}'...".format(
+                                receiver_data.block.label(), block.label()))
                     continue
                 elif receiver_data.block.status.is_set(RunnerStatus.warning):
-                    self.logger.debug(
-                        "Block '{}' has status 'warning'. Delivering signals"
-                        " anyway from '{}...".format(
-                            receiver_data.block.label(), block.label()))
+                    if debug:
+                        self.logger.debug(
+                            "Block '{}' has status 'warning'. Delivering "
+                            "signals anyway from '{}...".format(
+                                receiver_data.block.label(), block.label()))
 
                 # We only send signals if the receiver's output matches
                 # the output that these signals were notified on
@@ -315,20 +399,20 @@ class BlockRouter(Runner):
                                          "block: {}".format(block.label()),
                                          exc_info=True)
 
-                    self.logger.debug(
-                        "Routing {} signals from {} to {}".format(
-                            len(signals_to_send),
-                            block.label(True),
-                            receiver_data.block.label()))
+                    if debug:
+                        self.logger.debug(
+                            "Routing {} signals from {} to {}".format(
+                                len(signals_to_send),
+                                block.label(True),
+                                receiver_data.block.label()))
 
                     if self._diagnostics:
-                        self._diagnostic_manager.on_signal_delivery(
-                            block.type(),
-                            block.id(),
-                            receiver_data.block.type(),
-                            receiver_data.block.id(),
-                            len(signals_to_send)
-                        )
+                        self._diagnostic_manager.on_edge_delivery(
+                            receiver_data.diagnostic_edge,
+                            len(signals_to_send))
+                    if self._flow_control is not None:
+                        self._flow_control.on_delivery(
+                            receiver_data.block.id(), len(signals_to_send))
 
                     self.deliver_signals(receiver_data, signals_to_send)
 
@@ -346,6 +430,20 @@ class BlockRouter(Runner):
                                 .format(self.status, block.label()))
             raise BlockRouterNotStarted()
 
+    def _should_check_types(self, block):
+        """ Returns True if the types of the signals notified by a block
+        need to be checked """
+        if block not in self._trusted_blocks or \
+                self._trusted_signal_check == "always":
+            return True
+        if block not in self._validated_blocks:
+            # concurrent first notifications may both be checked, which is
+            # harmless
+            self._validated_blocks.add(block)
+            return True
+        return self._trusted_signal_check == "sample" and \
+            random() < self._trusted_sample_rate
+
     def deliver_signals(self, block_receiver, signals):
         """ Overridable method to deliver signals to a block
 
@@ -354,6 +452,11 @@ class BlockRouter(Runner):
         block router's notify_signals_to_block method from this method though,
         as that takes care of handling different formats of blocks.
 
+        With flow control, signals are in flight from the time they are
+        handed to this method until notify_signals_to_block is done with
+        them, routers delivering signals some other way call
+        'signals_processed' once the block is done with them.
+
         Args:
             block_receiver (BlockReceiverData): The data about the block that
                 will be receiving the signals
@@ -373,16 +476,128 @@ class BlockRouter(Runner):
         # this level, Note: a given router, for example: ThreadPoolExecutor,
         # might not even offer a way to catch an exception, so catching
         # exceptions at this 'root' level, for ALL routers, makes sense
+        edge = block_receiver.diagnostic_edge if self._diagnostics else None
+        if edge is not None:
+            start = perf_counter()
+        result = None
         try:
-            # Check if block has defined the input_id in its process_signals
-            if block_receiver.include_input_id:
-                # Pass the block_receiver's input_id to the
-                # process_signals method
-                block_receiver.block.process_signals(
-                    signals, block_receiver.input_id)
+            try:
+                # Check if block has defined the input_id in its
+                # process_signals
+                if block_receiver.include_input_id:
+                    # Pass the block_receiver's input_id to the
+                    # process_signals method
+                    result = block_receiver.block.process_signals(
+                        signals, block_receiver.input_id)
+                else:
+                    # Only send the signals to the block, no input_id
+                    result = block_receiver.block.process_signals(signals)
+            except:
+                self.logger.exception("{}.process_signals failed".
+                                      format(block_receiver.block.label()))
+            if edge is not None:
+                self._diagnostic_manager.on_edge_processed(
+                    edge, perf_counter() - start)
+            if self._tracer is not None:
+                self._tracer.on_processed(block_receiver.block.id(), signals)
+        finally:
+            if isinstance(result, Future):
+                # blocks processing signals in the background return a
+                # future, signals are in flight until it is done
+                result.add_done_callback(partial(
+                    self._on_processed_in_background,
+                    block_receiver, signals))
             else:
-                # Only send the signals to the block, no input_id
-                block_receiver.block.process_signals(signals)
-        except:
-            self.logger.exception("{}.process_signals failed".
-                                  format(block_receiver.block.label()))
+                self.signals_processed(block_receiver, signals)
+
+    def _on_processed_in_background(self, block_receiver, signals, future):
+        self.signals_processed(block_receiver, signals)
+
+    def signals_processed(self, block_receiver, signals):
+        """ Gives back the flow control credits of signals delivered
+
+        Called once a block is done with signals handed to deliver_signals,
+        whether it processed them or not.
+
+        Args:
+            block_receiver (BlockReceiverData): The data about the block that
+                received the signals
+            signals (list): The signals the block received
+        """
+        if self._flow_control is not None:
+            self._flow_control.on_processed(
+                block_receiver.block.id(), len(signals))
+
+    def downstream_capacity(self, block, output_id=None):
+        """ Returns the signals a block can notify before the blocks
+        downstream of it fall behind
+
+        Args:
+            block (Block): The block notifying signals
+            output_id: The output signals are notified on, all outputs of
+                the block when None
+
+        Returns:
+            int: credits left to the most loaded block signals go through,
+                None when flow control is disabled
+        """
+        if self._flow_control is None:
+            return None
+        return self._flow_control.capacity(
+            self._get_downstream(block.id(), output_id))
+
+    def wait_for_capacity(self, block, credits=1, output_id=None,
+                          timeout=None):
+        """ Wait until the blocks downstream of a block can take 'credits'
+        more signals
+
+        Returns:
+            bool: False if the timeout expired first, True right away when
+                flow control is disabled
+        """
+        if self._flow_control is None:
+            return True
+        return self._flow_control.wait_for_capacity(
+            self._get_downstream(block.id(), output_id), credits, timeout)
+
+    def _get_downstream(self, block_id, output_id):
+        """ Returns the ids of the blocks signals notified by a block on an
+        output go through, on every output when output_id is None """
+        downstream = self._downstream.get((block_id, output_id))
+        if downstream is None:
+            downstream = set()
+            pending = [receiver_data
+                       for receiver_data in self._receivers.get(block_id, [])
+                       if output_id is None or
+                       receiver_data.output_id == output_id]
+            while pending:
+                receiver_id = pending.pop().block.id()
+                if receiver_id not in downstream:
+                    downstream.add(receiver_id)
+                    pending.extend(self._receivers.get(receiver_id, []))
+            downstream = self._downstream[(block_id, output_id)] = \
+                frozenset(downstream)
+        return downstream
+
+    def latency_stats(self):
+        """ Returns the time blocks took to process signals
+
+        Returns:
+            dict: Latency summaries per edge and per block, see
+                DiagnosticManager.latency_stats. None when diagnostics are
+                disabled
+        """
+        if not self._diagnostics:
+            return None
+        return self._diagnostic_manager.latency_stats()
+
+    def trace_stats(self):
+        """ Returns the latencies of traced signals
+
+        Returns:
+            list: Latency summaries per path, see SignalTracer.stats. None
+                when tracing is disabled
+        """
+        if self._tracer is None:
+            return None
+        return self._tracer.stats()
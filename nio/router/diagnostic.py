@@ -1,15 +1,34 @@
-from collections import defaultdict
 from datetime import timedelta, datetime
-from threading import RLock
+from threading import Lock, current_thread, local
 
 from nio.modules.scheduler.job import Job
+from nio.router.histogram import LatencyHistogram
 from nio.signal.management import ManagementSignal
 from nio.util.runner import Runner
 
 
+class _DiagnosticShard(object):
+
+    """ The deliveries and latencies recorded by a single thread """
+
+    __slots__ = ("thread", "counts", "latencies")
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.counts = {}
+        self.latencies = {}
+
+
 class DiagnosticManager(Runner):
 
-    _type_separator = "###"
+    """ Counts the signals delivered between blocks and reports them
+
+    Deliveries, and the time blocks took to process them, are recorded per
+    edge, a (source_type, source, target_type, target) tuple. Every thread
+    records in its own shard so that deliveries don't contend on a lock,
+    shards only ever grow and are added up when sending a diagnostic, which
+    reports what was recorded since the last one.
+    """
 
     def __init__(self):
         super().__init__()
@@ -22,8 +41,15 @@ class DiagnosticManager(Runner):
         self._mgmt_signal_handler = None
         self._job = None
 
-        self._blocks_data_lock = RLock()
-        self._blocks_data = None
+        # Held while registering shards and sending diagnostics
+        self._shards_lock = Lock()
+        self._shards = []
+        self._local = None
+        # Records of shards whose thread finished
+        self._retired = None
+        # Records as of the last diagnostic sent
+        self._reported_counts = None
+        self._reported_latencies = None
 
     def configure(self, context):
         self._instance_id = context.instance_id
@@ -32,7 +58,11 @@ class DiagnosticManager(Runner):
         self._interval = \
             context.settings.get("diagnostic_interval", 3600)
         self._mgmt_signal_handler = context.mgmt_signal_handler
-        self._blocks_data = defaultdict(lambda: defaultdict(int))
+        self._shards = []
+        self._local = local()
+        self._retired = _DiagnosticShard(None)
+        self._reported_counts = {}
+        self._reported_latencies = {}
 
     def start(self):
         super().start()
@@ -57,31 +87,178 @@ class DiagnosticManager(Runner):
     def on_signal_delivery(self,
                            source_type, source,
                            target_type, target, count):
-        with self._blocks_data_lock:
-            source_key = self._create_key(source_type, source)
-            target_key = self._create_key(target_type, target)
-            self._blocks_data[source_key][target_key] += count
+        self.on_edge_delivery(
+            self.create_edge(source_type, source, target_type, target), count)
+
+    def on_edge_delivery(self, edge, count):
+        """ Count signals delivered along an edge
+
+        Args:
+            edge (tuple): The edge, as returned by create_edge
+            count (int): The number of signals delivered
+        """
+        try:
+            counts = self._local.shard.counts
+        except AttributeError:
+            counts = self._add_shard().counts
+        # Only this thread writes to its shard
+        counts[edge] = counts.get(edge, 0) + count
+
+    def on_edge_processed(self, edge, seconds):
+        """ Record the time a block took to process signals from an edge
+
+        Args:
+            edge (tuple): The edge, as returned by create_edge
+            seconds (float): How long the target block's process_signals
+                took
+        """
+        try:
+            latencies = self._local.shard.latencies
+        except AttributeError:
+            latencies = self._add_shard().latencies
+        histogram = latencies.get(edge)
+        if histogram is None:
+            histogram = latencies[edge] = LatencyHistogram()
+        histogram.record(seconds)
+
+    @staticmethod
+    def create_edge(source_type, source, target_type, target):
+        """ Creates the key deliveries between two blocks are recorded by
+
+        Callers delivering repeatedly along the same edge can create it once
+        and call on_edge_delivery.
+
+        Returns:
+            edge tuple
+        """
+        return source_type, source, target_type, target
+
+    def latency_stats(self):
+        """ Returns the processing latencies recorded since start
+
+        Returns:
+            dict: "edges" holds a latency summary for every edge and "blocks"
+                one for every block, merging all the edges leading to it
+        """
+        with self._shards_lock:
+            _, latencies = self._totals()
+        return {
+            "edges": self._edges_latency(latencies),
+            "blocks": self._blocks_latency(latencies)
+        }
+
+    def _add_shard(self):
+        """ Register a shard for the calling thread """
+        shard = _DiagnosticShard(current_thread())
+        with self._shards_lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def _totals(self):
+        """ Adds up the shards, must hold the shards lock
+
+        Returns:
+            tuple: the total count and latency histogram of every edge
+        """
+        live_shards = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                live_shards.append(shard)
+            else:
+                # the thread is done writing to its shard, fold it in
+                self._merge_shard(self._retired, shard.counts,
+                                  shard.latencies)
+        self._shards = live_shards
+
+        totals = _DiagnosticShard(None)
+        self._merge_shard(totals, self._retired.counts,
+                          self._retired.latencies)
+        for shard in live_shards:
+            # copying is atomic, unlike iterating over a shard being written
+            self._merge_shard(totals, shard.counts.copy(),
+                              shard.latencies.copy())
+        return totals.counts, totals.latencies
+
+    @staticmethod
+    def _merge_shard(shard, counts, latencies):
+        for edge, count in counts.items():
+            shard.counts[edge] = shard.counts.get(edge, 0) + count
+        for edge, histogram in latencies.items():
+            total = shard.latencies.get(edge)
+            if total is None:
+                shard.latencies[edge] = histogram.copy()
+            else:
+                total.merge(histogram)
+
+    def _pending(self, counts, latencies):
+        """ Returns the records that haven't been reported yet """
+        pending_counts = {}
+        for edge, count in counts.items():
+            delta = count - self._reported_counts.get(edge, 0)
+            if delta:
+                pending_counts[edge] = delta
+        pending_latencies = {}
+        for edge, histogram in latencies.items():
+            reported = self._reported_latencies.get(edge)
+            delta = histogram if reported is None else \
+                histogram.subtract(reported)
+            if delta.count:
+                pending_latencies[edge] = delta
+        return pending_counts, pending_latencies
+
+    @staticmethod
+    def _edges_latency(latencies):
+        return [
+            {
+                "source_type": source_type,
+                "source": source,
+                "target_type": target_type,
+                "target": target,
+                "latency": histogram.to_dict()
+            }
+            for (source_type, source, target_type, target), histogram in
+            latencies.items()
+        ]
+
+    @staticmethod
+    def _blocks_latency(latencies):
+        blocks = {}
+        for (_, _, target_type, target), histogram in latencies.items():
+            block_histogram = blocks.get((target_type, target))
+            if block_histogram is None:
+                blocks[(target_type, target)] = histogram.copy()
+            else:
+                block_histogram.merge(histogram)
+        return [
+            {
+                "type": target_type,
+                "block": target,
+                "latency": histogram.to_dict()
+            }
+            for (target_type, target), histogram in blocks.items()
+        ]
 
     def _send_diagnostic(self):
-        with self._blocks_data_lock:
+        with self._shards_lock:
             end_time = self._create_timestamp()
-            if self._blocks_data and self._mgmt_signal_handler:
+            counts, latencies = self._totals()
+            pending_counts, pending_latencies = \
+                self._pending(counts, latencies)
+            if (pending_counts or pending_latencies) and \
+                    self._mgmt_signal_handler:
                 blocks_data = []
-                for source_key, target_data in self._blocks_data.items():
-                    for target_key, count in target_data.items():
-                        source_type, source = \
-                            self._split_key(source_key)
-                        target_type, target = \
-                            self._split_key(target_key)
-                        blocks_data.append(
-                            {
-                                "source_type": source_type,
-                                "source": source,
-                                "target_type": target_type,
-                                "target": target,
-                                "count": count
-                            }
-                        )
+                for (source_type, source, target_type, target), count in \
+                        pending_counts.items():
+                    blocks_data.append(
+                        {
+                            "source_type": source_type,
+                            "source": source,
+                            "target_type": target_type,
+                            "target": target,
+                            "count": count
+                        }
+                    )
                 self._mgmt_signal_handler(
                     ManagementSignal(
                         {
@@ -90,12 +267,17 @@ class DiagnosticManager(Runner):
                             "service_id": self._service_id,
                             "service": self._service_name,
                             "blocks_data": blocks_data,
+                            "edges_latency":
+                                self._edges_latency(pending_latencies),
+                            "blocks_latency":
+                                self._blocks_latency(pending_latencies),
                             "start_time": self._start_time,
                             "end_time": end_time
                         }
                     )
                 )
-                self._blocks_data.clear()
+                self._reported_counts = counts
+                self._reported_latencies = latencies
             self._start_time = end_time
 
     @staticmethod
@@ -109,22 +291,3 @@ class DiagnosticManager(Runner):
             timestamp
         """
         return (datetime.utcnow() - datetime(1970,1,1)).total_seconds()
-
-    @staticmethod
-    def _create_key(_type, name):
-        """ Creates a key by merging type and name
-
-        Returns:
-            created key
-        """
-        return "{}{}{}".format(_type, DiagnosticManager._type_separator, name)
-
-    @staticmethod
-    def _split_key(_id):
-        """ Splits a key
-
-        Returns:
-            type, name tuple
-        """
-        ids = _id.split(DiagnosticManager._type_separator)
-        return ids[0], ids[1]
@@ -0,0 +1,90 @@
+from collections import defaultdict
+from threading import Condition
+
+
+class FlowControl(object):
+
+    """ Keeps track of the signals blocks are yet to process
+
+    Signals are in flight from the time the router hands them to a block
+    until the block is done processing them, whether they wait in a router
+    queue, a thread pool or an event loop in between. Each block is given
+    'max_in_flight' credits, the credits left downstream of a block tell
+    sources how many more signals they can notify without piling them up.
+
+    Blocks processing signals in the background, i.e. in worker processes,
+    return a concurrent.futures.Future from process_signals, their signals
+    stay in flight until it is done.
+
+    Signals a router drops when it stops never get processed, resetting the
+    flow control gives their credits back.
+
+    """
+
+    def __init__(self, max_in_flight):
+        """ Create a new flow control
+
+        Args:
+            max_in_flight (int): Signals a block can have in flight before
+                it is considered as not keeping up
+        """
+        self.max_in_flight = max_in_flight
+        self._condition = Condition()
+        # block id -> signals delivered and not yet processed
+        self._in_flight = defaultdict(int)
+
+    def on_delivery(self, block_id, count):
+        """ Signals are being delivered to a block """
+        with self._condition:
+            self._in_flight[block_id] += count
+
+    def on_processed(self, block_id, count):
+        """ A block is done processing signals """
+        with self._condition:
+            # signals in flight when the flow control was reset can still
+            # be processed afterwards
+            self._in_flight[block_id] = max(
+                self._in_flight[block_id] - count, 0)
+            self._condition.notify_all()
+
+    def reset(self):
+        """ Give back the credits of every signal in flight """
+        with self._condition:
+            self._in_flight.clear()
+            self._condition.notify_all()
+
+    def in_flight(self, block_id):
+        """ Returns the signals a block is yet to process """
+        with self._condition:
+            return self._in_flight.get(block_id, 0)
+
+    def capacity(self, block_ids):
+        """ Returns the credits left to the most loaded of the blocks
+
+        Args:
+            block_ids (iterable): Ids of the blocks signals go through
+
+        Returns:
+            int: signals that can be sent to the blocks before one of them
+                has 'max_in_flight' signals in flight, 'max_in_flight' when
+                no block is given
+        """
+        with self._condition:
+            return self._capacity(block_ids)
+
+    def wait_for_capacity(self, block_ids, credits=1, timeout=None):
+        """ Wait until the blocks have at least 'credits' credits left
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        # asking for more than a block can take waits for it to be idle
+        credits = min(credits, self.max_in_flight)
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._capacity(block_ids) >= credits, timeout)
+
+    def _capacity(self, block_ids):
+        in_flight = max((self._in_flight.get(block_id, 0)
+                         for block_id in block_ids), default=0)
+        return max(self.max_in_flight - in_flight, 0)
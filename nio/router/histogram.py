@@ -0,0 +1,95 @@
+from bisect import bisect_left
+
+
+# Upper bounds, in seconds, of the latency buckets. Bounds grow by a factor
+# of sqrt(2) from 1 microsecond to about 2 minutes, so that any latency is
+# known within about 40%, and every histogram shares the same buckets.
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** (i / 2) for i in range(54)) + \
+    (float("inf"),)
+
+
+class LatencyHistogram(object):
+
+    """ A fixed bucket histogram of latencies
+
+    Histograms share the same buckets, so they can be merged and subtracted
+    without losing precision. Recording is not thread safe, each histogram is
+    expected to be written to by a single thread.
+
+    """
+
+    __slots__ = ("buckets", "total")
+
+    def __init__(self, buckets=None, total=0.0):
+        self.buckets = buckets if buckets is not None else \
+            [0] * len(BUCKET_BOUNDS)
+        self.total = total
+
+    @property
+    def count(self):
+        return sum(self.buckets)
+
+    def record(self, seconds):
+        """ Add a latency, in seconds, to the histogram """
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += seconds
+
+    def copy(self):
+        return LatencyHistogram(list(self.buckets), self.total)
+
+    def merge(self, other):
+        """ Add the latencies of another histogram to this one """
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        self.total += other.total
+
+    def subtract(self, other):
+        """ Returns a new histogram without the latencies of another one
+
+        Args:
+            other (LatencyHistogram): An earlier copy of this histogram
+
+        Returns:
+            LatencyHistogram: The latencies recorded since other was copied
+        """
+        return LatencyHistogram(
+            [count - other_count for count, other_count in
+             zip(self.buckets, other.buckets)],
+            self.total - other.total)
+
+    def percentile(self, percent):
+        """ Returns the upper bound of the bucket a percentile falls in
+
+        Args:
+            percent (float): The percentile, between 0 and 100
+
+        Returns:
+            float: The percentile in seconds, None if there are no latencies
+        """
+        count = self.count
+        if not count:
+            return None
+        rank = count * percent / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                return BUCKET_BOUNDS[index]
+
+    def to_dict(self):
+        """ Returns a serializable summary of the histogram
+
+        Returns:
+            dict: the number of latencies, their total in seconds, the 50th,
+                90th and 99th percentiles, and the non empty buckets keyed by
+                their upper bound in seconds
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {"{:.3g}".format(bound): count for bound, count in
+                        zip(BUCKET_BOUNDS, self.buckets) if count}
+        }
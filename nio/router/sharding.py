@@ -0,0 +1,169 @@
+from threading import Lock
+from zlib import crc32
+
+from nio.properties.util.evaluator import Evaluator
+from nio.router.base import BlockRouter, InvalidBlockOutput
+from nio.signal.base import Signal
+from nio.util.logging import get_nio_logger
+from nio.util.runner import RunnerStatus
+
+
+def shard_of(key, shards):
+    """ Returns the shard owning a key
+
+    Python's hash is salted differently in every process, keys are hashed
+    from their string representation instead so that shards don't depend on
+    the process they are computed in.
+
+    Args:
+        key: Shard key value, evaluated from a signal
+        shards (int): Number of shards
+
+    Returns:
+        int: shard index, between 0 and shards - 1
+    """
+    return crc32(str(key).encode()) % shards
+
+
+def source_blocks(execution, block_ids):
+    """ Returns the blocks nothing sends signals to, i.e. publishers and
+    generators
+
+    Args:
+        execution (list): BlockExecution instances of a service
+        block_ids (iterable): Ids of the blocks of the service
+
+    Returns:
+        list: ids of the blocks not receiving signals from other blocks
+    """
+    receivers = set()
+    for block_execution in execution:
+        block_receivers = block_execution.receivers() or []
+        if isinstance(block_receivers, dict):
+            receivers_lists = block_receivers.values()
+        else:
+            receivers_lists = [block_receivers]
+        for receivers_list in receivers_lists:
+            for receiver in receivers_list:
+                receivers.add(receiver["id"]
+                              if isinstance(receiver, dict) else receiver)
+    return [block_id for block_id in block_ids if block_id not in receivers]
+
+
+class ShardPartitioner(object):
+
+    """ Splits signals between the replicas of a sharded service
+
+    Each signal goes to the replica its shard key hashes to, so replicas own
+    disjoint key spaces.
+    """
+
+    def __init__(self, key, shards):
+        """ Create a new partitioner
+
+        Args:
+            key (str): Expression evaluated against each signal, i.e.
+                "{{ $device_id }}"
+            shards (int): Number of replicas of the service
+        """
+        if shards < 1:
+            raise ValueError("Invalid number of shards: {}".format(shards))
+        self.shards = shards
+        self.logger = get_nio_logger("ShardPartitioner")
+        self._evaluator = Evaluator(key)
+        self._lock = Lock()
+        self._signals = [0] * shards
+
+    def split(self, signals):
+        """ Returns the signals owned by each replica, by replica index """
+        owned = [[] for _ in range(self.shards)]
+        for signal in signals:
+            try:
+                key = self._evaluator.evaluate(signal)
+            except Exception:
+                # all keys failing to evaluate belong to the same shard
+                self.logger.warning(
+                    "Failed to evaluate shard key", exc_info=True)
+                key = None
+            owned[shard_of(key, self.shards)].append(signal)
+        with self._lock:
+            for index, replica_signals in enumerate(owned):
+                self._signals[index] += len(replica_signals)
+        return owned
+
+    def stats(self):
+        """ Returns the number of shards and the signals sent to each """
+        with self._lock:
+            return {
+                "shards": self.shards,
+                "signals": list(self._signals)
+            }
+
+
+class ShardRouter(BlockRouter):
+
+    """ Router of the source blocks of a sharded service
+
+    Source blocks, the ones nothing sends signals to, run once in the
+    sharded service, whether the signals they notify are deterministic or
+    not. Their signals are split by shard key and each replica is sent the
+    ones it owns, replicas then deliver them from their own copy of the
+    source block to the rest of the service.
+    """
+
+    def __init__(self, key, shards, send):
+        """ Create a new shard router
+
+        Args:
+            key (str): Shard key expression
+            shards (int): Number of replicas of the service
+            send (callable): Sends signals to a replica, called with the
+                replica index, the source block id, the output id and the
+                signals the replica owns
+        """
+        super().__init__()
+        self._partitioner = ShardPartitioner(key, shards)
+        self._send = send
+
+    def configure(self, context):
+        # signals are not delivered in this process, only the settings
+        # checking the signals notified apply
+        context.settings = dict(context.settings, diagnostics=False,
+                                trace_sample_rate=0, max_in_flight=0)
+        super().configure(context)
+
+    def notify_signals(self, block, signals, output_id):
+        """ Send the signals notified by a source block to the replicas
+        owning them """
+        if not self.status.is_set(RunnerStatus.started):
+            self.logger.warning(
+                "Shard Router is not started, discarding signal "
+                "notification from block: {}".format(block.label()))
+            return
+        if not signals:
+            return
+
+        if output_id is None:
+            if block._default_output is None:
+                raise InvalidBlockOutput(
+                    "Block does not define a default output, must "
+                    "explicitly specify output in notify_signals")
+            output_id = block._default_output.id
+        elif not block.is_output_valid(output_id):
+            raise InvalidBlockOutput(
+                "Output {} not defined on block {}".format(output_id, block))
+
+        signals = list(signals)
+        if self._check_signal_type and \
+                self._should_check_types(block) and \
+                any(not isinstance(signal, Signal) for signal in signals):
+            raise TypeError("All signals must be instances of Signal")
+
+        for index, owned in enumerate(self._partitioner.split(signals)):
+            if owned:
+                self._send(index, block.id(), output_id, owned)
+
+    def shard_stats(self):
+        """ Returns the signals sent to each replica, see
+        ShardPartitioner.stats """
+        return self._partitioner.stats()
@@ -0,0 +1,218 @@
+import asyncio
+from threading import Event, get_ident
+
+from nio import Signal
+from nio.block.base import Block
+from nio.block.context import BlockContext
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.router.asyncio_router import AsyncioBlockRouter, \
+    get_shared_event_loop
+from nio.router.base import BlockRouter, InvalidProcessSignalsSignature
+from nio.router.context import RouterContext
+from nio.service.base import BlockExecution
+from nio.testing.condition import ensure_condition
+from nio.testing.test_case import NIOTestCase
+
+
+class SenderBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.id = "sender"
+
+
+class SyncBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.id = "sync"
+        self.thread = None
+        self.received = Event()
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.thread = get_ident()
+        self.received.set()
+
+
+class CoroutineBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.id = "coroutine"
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.processed = 0
+        self.all_processed = Event()
+        self.expected = 1
+        self.thread = None
+
+    async def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.thread = get_ident()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.processed += len(signals)
+        if self.processed >= self.expected:
+            self.all_processed.set()
+
+
+class FailingCoroutineBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.id = "failing"
+
+    async def process_signals(self, signals):
+        raise ValueError()
+
+
+class BlockExecutionTest(BlockExecution):
+
+    def __init__(self, id, receivers):
+        self.id = id
+        self.receivers = receivers
+
+
+class TestAsyncioBlockRouter(NIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.routers = []
+
+    def tearDown(self):
+        # stop routers while the scheduler module is still around
+        for block_router in self.routers:
+            block_router.do_stop()
+        super().tearDown()
+
+    def _start_router(self, receivers, settings=None,
+                      router_class=AsyncioBlockRouter):
+        block_router = router_class()
+        context = BlockContext(block_router, dict())
+        self.sender = SenderBlock()
+        blocks = {self.sender.id(): self.sender}
+        for block in receivers:
+            blocks[block.id()] = block
+        for block in blocks.values():
+            block.configure(context)
+        execution = [BlockExecutionTest(
+            id=self.sender.id(),
+            receivers=[block.id() for block in receivers])]
+        block_router.do_configure(
+            RouterContext(execution, blocks, settings))
+        block_router.do_start()
+        self.routers.append(block_router)
+        return block_router
+
+    def test_delivery(self):
+        """ Coroutine blocks run on the loop, others in the executor """
+        sync_block = SyncBlock()
+        coroutine_block = CoroutineBlock()
+        self._start_router([sync_block, coroutine_block])
+        self.sender.notify_signals([Signal()])
+        self.assertTrue(sync_block.received.wait(1))
+        self.assertTrue(coroutine_block.all_processed.wait(1))
+        self.assertNotEqual(sync_block.thread, get_ident())
+        self.assertNotEqual(coroutine_block.thread, get_ident())
+        self.assertNotEqual(sync_block.thread, coroutine_block.thread)
+
+    def test_bounded_concurrency(self):
+        """ Deliveries to a coroutine block are awaited concurrently, up to
+        the configured concurrency """
+        coroutine_block = CoroutineBlock()
+        coroutine_block.expected = 20
+        block_router = self._start_router([coroutine_block],
+                                          {"max_concurrency": 5})
+        for _ in range(20):
+            self.sender.notify_signals([Signal()])
+        self.assertTrue(coroutine_block.all_processed.wait(2))
+        self.assertEqual(coroutine_block.max_in_flight, 5)
+        ensure_condition(lambda: block_router.pending_deliveries == 0)
+        self.assertEqual(block_router.pending_deliveries, 0)
+
+    def test_shared_loop(self):
+        """ Routers can share an event loop """
+        coroutine_block = CoroutineBlock()
+        block_router = self._start_router([coroutine_block],
+                                          {"event_loop": "shared"})
+        self.assertIs(block_router._loop, get_shared_event_loop())
+        self.sender.notify_signals([Signal()])
+        self.assertTrue(coroutine_block.all_processed.wait(1))
+        block_router.do_stop()
+        # the shared loop keeps running
+        self.assertTrue(get_shared_event_loop().is_running())
+
+    def test_stop_cancels_deliveries(self):
+        """ Stopping the router cancels deliveries in progress """
+        coroutine_block = CoroutineBlock()
+        block_router = self._start_router([coroutine_block],
+                                          {"max_concurrency": 1})
+        for _ in range(3):
+            self.sender.notify_signals([Signal()])
+        block_router.do_stop()
+        self.assertEqual(block_router.pending_deliveries, 0)
+        self.assertLess(coroutine_block.processed, 3)
+
+    def test_flow_control(self):
+        """ Deliveries waiting on the loop or cancelled are accounted for """
+        coroutine_block = CoroutineBlock()
+        coroutine_block.expected = 2
+        block_router = self._start_router(
+            [coroutine_block], {"max_concurrency": 1, "max_in_flight": 10})
+        for _ in range(2):
+            self.sender.notify_signals([Signal(), Signal()])
+        self.assertLessEqual(self.sender.downstream_capacity(), 8)
+        self.assertTrue(coroutine_block.all_processed.wait(1))
+        self.assertTrue(self.sender.wait_for_capacity(10, timeout=1))
+
+        for _ in range(3):
+            self.sender.notify_signals([Signal()])
+        block_router.do_stop()
+        self.assertEqual(self.sender.downstream_capacity(), 10)
+
+    def test_stop_releases_scheduled_deliveries(self):
+        """ Deliveries scheduled on a busy loop are not in flight once the
+        router stops """
+        coroutine_block = CoroutineBlock()
+        block_router = self._start_router(
+            [coroutine_block], {"max_in_flight": 10})
+        # hold up the event loop
+        release = Event()
+        self.addCleanup(release.set)
+        block_router._loop.call_soon_threadsafe(release.wait, 5)
+        for _ in range(3):
+            self.sender.notify_signals([Signal()])
+        self.assertEqual(self.sender.downstream_capacity(), 7)
+        block_router.do_stop()
+        self.assertEqual(self.sender.downstream_capacity(), 10)
+        release.set()
+        self.assertEqual(coroutine_block.processed, 0)
+
+    def test_failing_coroutine_block(self):
+        """ Exceptions raised by coroutine blocks are logged """
+        failing_block = FailingCoroutineBlock()
+        coroutine_block = CoroutineBlock()
+        self._start_router([failing_block, coroutine_block])
+        self.sender.notify_signals([Signal()])
+        self.assertTrue(coroutine_block.all_processed.wait(1))
+
+    def test_invalid_event_loop(self):
+        """ The event loop setting is validated """
+        with self.assertRaises(ValueError):
+            self._start_router([], {"event_loop": "thread"})
+
+    def test_coroutine_block_in_sync_router(self):
+        """ Other routers refuse to deliver signals to coroutine blocks """
+        with self.assertRaisesRegex(InvalidProcessSignalsSignature,
+                                    "AsyncioBlockRouter"):
+            self._start_router([CoroutineBlock()], router_class=BlockRouter)
+        # coroutine blocks sending signals are fine
+        block_router = BlockRouter()
+        source = CoroutineBlock()
+        sync_block = SyncBlock()
+        source.configure(BlockContext(block_router, dict()))
+        sync_block.configure(BlockContext(block_router, dict()))
+        block_router.do_configure(RouterContext(
+            [BlockExecutionTest(id=source.id(), receivers=["sync"])],
+            {source.id(): source, "sync": sync_block}))
@@ -43,6 +43,13 @@ class BlockExecutionTest(BlockExecution):
 
 class TestBaseDiagnostics(NIOTestCase):
 
+    @staticmethod
+    def _pending_counts(block_router):
+        diagnostic_manager = block_router._diagnostic_manager
+        with diagnostic_manager._shards_lock:
+            return diagnostic_manager._pending(
+                *diagnostic_manager._totals())[0]
+
     def test_diagnostics(self):
         """ Checking that router delivers signals and diagnostics """
 
@@ -89,14 +96,14 @@ class TestBaseDiagnostics(NIOTestCase):
         self.assertIsNone(receiver_block.signal_cache)
 
         self.assertEqual(
-            len(block_router._diagnostic_manager._blocks_data), 0)
+            len(self._pending_counts(block_router)), 0)
         sender_block.process_signals(signals)
 
         # make sure signals made it and diagnostic_manager.on_signal_delivery
         # was invoked
         self.assertIsNotNone(receiver_block.signal_cache)
         self.assertEqual(
-            len(block_router._diagnostic_manager._blocks_data), 1)
+            len(self._pending_counts(block_router)), 1)
 
         # make signal handler to be invoked
         block_router._diagnostic_manager._send_diagnostic()
@@ -112,9 +119,16 @@ class TestBaseDiagnostics(NIOTestCase):
         self.assertEqual(block_data["target_type"], receiver_block.type())
         self.assertEqual(block_data["target"], receiver_block.id())
         self.assertEqual(block_data["count"], 1)
+        # the time the receiver took to process the signals was recorded
+        self.assertEqual(len(signal.blocks_latency), 1)
+        self.assertEqual(signal.blocks_latency[0]["block"],
+                         receiver_block.id())
+        self.assertEqual(signal.blocks_latency[0]["latency"]["count"], 1)
+        self.assertEqual(
+            block_router.latency_stats()["edges"][0]["latency"]["count"], 1)
         # assert data was cleared after a diagnostic delivery
         self.assertEqual(
-            len(block_router._diagnostic_manager._blocks_data), 0)
+            len(self._pending_counts(block_router)), 0)
 
         block_router.do_stop()
 
@@ -132,6 +146,6 @@ class TestBaseDiagnostics(NIOTestCase):
         self.assertIsNotNone(receiver_block.signal_cache)
         # assert that diagnostics were not delivered
         self.assertEqual(
-            len(block_router._diagnostic_manager._blocks_data), 0)
+            len(self._pending_counts(block_router)), 0)
 
         block_router.do_stop()
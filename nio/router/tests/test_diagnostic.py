@@ -1,4 +1,4 @@
-from threading import Event
+from threading import Event, Thread
 from unittest.mock import Mock, patch
 from datetime import datetime
 
@@ -134,3 +134,89 @@ class TestDiagnostic(NIOTestCase):
         self.assertLessEqual(signal2.start_time, signal2.end_time)
 
         dm.do_stop()
+
+    def test_threads(self):
+        """ Assert deliveries counted by many threads are added up """
+        signal_handler = Mock()
+        router_context = RouterContext([], {},
+                                       {},
+                                       mgmt_signal_handler=signal_handler)
+        dm = DiagnosticManager()
+        dm.do_configure(router_context)
+        dm.do_start()
+
+        edge = dm.create_edge("source_type", "source1",
+                              "target_type", "target1")
+
+        def deliver():
+            for _ in range(100):
+                dm.on_edge_delivery(edge, 1)
+
+        threads = [Thread(target=deliver) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        dm.on_signal_delivery("source_type", "source1",
+                              "target_type", "target1", 5)
+        for thread in threads:
+            thread.join()
+
+        dm._send_diagnostic()
+        blocks_data = signal_handler.call_args[0][0].blocks_data
+        self.assertEqual(len(blocks_data), 1)
+        self.assertEqual(blocks_data[0]["count"], 405)
+        # finished threads' shards were folded in
+        self.assertEqual(len(dm._shards), 1)
+
+        # only new deliveries are reported next time
+        signal_handler.reset_mock()
+        dm._send_diagnostic()
+        self.assertEqual(signal_handler.call_count, 0)
+        dm.on_edge_delivery(edge, 2)
+        dm._send_diagnostic()
+        blocks_data = signal_handler.call_args[0][0].blocks_data
+        self.assertEqual(blocks_data[0]["count"], 2)
+
+        dm.do_stop()
+
+    def test_latency(self):
+        """ Assert processing latencies are reported per edge and block """
+        signal_handler = Mock()
+        router_context = RouterContext([], {},
+                                       {},
+                                       mgmt_signal_handler=signal_handler)
+        dm = DiagnosticManager()
+        dm.do_configure(router_context)
+        dm.do_start()
+
+        edge1 = dm.create_edge("source_type", "source1",
+                               "target_type", "target1")
+        edge2 = dm.create_edge("source_type", "source2",
+                               "target_type", "target1")
+        dm.on_edge_processed(edge1, 0.001)
+        dm.on_edge_processed(edge1, 0.002)
+        dm.on_edge_processed(edge2, 0.5)
+
+        stats = dm.latency_stats()
+        self.assertEqual(len(stats["edges"]), 2)
+        self.assertEqual(len(stats["blocks"]), 1)
+        self.assertEqual(stats["blocks"][0]["block"], "target1")
+        self.assertEqual(stats["blocks"][0]["latency"]["count"], 3)
+
+        dm._send_diagnostic()
+        signal = signal_handler.call_args[0][0]
+        self.assertEqual(signal.blocks_latency, stats["blocks"])
+        self.assertEqual(signal.edges_latency, stats["edges"])
+
+        # only new latencies are reported next time
+        dm.on_edge_processed(edge2, 0.5)
+        dm._send_diagnostic()
+        signal = signal_handler.call_args[0][0]
+        self.assertEqual(len(signal.edges_latency), 1)
+        self.assertEqual(signal.edges_latency[0]["source"], "source2")
+        self.assertEqual(signal.edges_latency[0]["latency"]["count"], 1)
+        # while stats hold every latency since start
+        self.assertEqual(
+            dm.latency_stats()["blocks"][0]["latency"]["count"], 4)
+
+        dm.do_stop()
+
@@ -0,0 +1,185 @@
+from threading import Event
+from unittest.mock import Mock
+
+from nio.block.base import Block
+from nio.block.context import BlockContext
+from nio.block.terminals import DEFAULT_TERMINAL, output
+from nio.router.base import BlockRouter
+from nio.router.context import RouterContext
+from nio.router.flow_control import FlowControl
+from nio.router.thread_pool_executor import ThreadedPoolExecutorRouter
+from nio.service.base import BlockExecution
+from nio.signal.base import Signal
+from nio.testing.condition import ensure_condition
+from nio.testing.test_case import NIOTestCase
+
+
+@output("fast")
+@output("slow")
+class SourceBlock(Block):
+    pass
+
+
+class ForwardingBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.capacity_seen = None
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.capacity_seen = self.source.downstream_capacity()
+        self.notify_signals(signals)
+
+
+class SlowBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.release = Event()
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.release.wait(5)
+
+
+class DroppingRouter(BlockRouter):
+
+    """ Never gets signals to the blocks """
+
+    def deliver_signals(self, block_receiver, signals):
+        pass
+
+
+class BlockExecutionTest(BlockExecution):
+
+    def __init__(self, id, receivers):
+        self.id = id
+        self.receivers = receivers
+
+
+class TestFlowControl(NIOTestCase):
+
+    def test_capacity(self):
+        """ Credits left are the ones of the most loaded block """
+        flow_control = FlowControl(10)
+        self.assertEqual(flow_control.capacity([]), 10)
+        flow_control.on_delivery("a", 3)
+        flow_control.on_delivery("b", 8)
+        self.assertEqual(flow_control.capacity(["a"]), 7)
+        self.assertEqual(flow_control.capacity(["a", "b"]), 2)
+        flow_control.on_delivery("b", 8)
+        # never negative
+        self.assertEqual(flow_control.capacity(["a", "b"]), 0)
+        flow_control.on_processed("b", 16)
+        self.assertEqual(flow_control.capacity(["a", "b"]), 7)
+        self.assertEqual(flow_control.in_flight("b"), 0)
+
+    def test_wait_for_capacity(self):
+        flow_control = FlowControl(10)
+        flow_control.on_delivery("a", 10)
+        self.assertFalse(flow_control.wait_for_capacity(["a"], 1, 0.01))
+        flow_control.on_processed("a", 5)
+        self.assertTrue(flow_control.wait_for_capacity(["a"], 5, 0.01))
+        self.assertFalse(flow_control.wait_for_capacity(["a"], 6, 0.01))
+        # more credits than a block can take need the block to be idle
+        flow_control.on_processed("a", 5)
+        self.assertTrue(flow_control.wait_for_capacity(["a"], 50, 0.01))
+
+    def test_reset(self):
+        """ Resetting gives back the credits of every signal in flight """
+        flow_control = FlowControl(10)
+        flow_control.on_delivery("a", 10)
+        flow_control.reset()
+        self.assertTrue(flow_control.wait_for_capacity(["a"], 10, 0))
+        # signals in flight before the reset can be processed after it
+        flow_control.on_processed("a", 10)
+        self.assertEqual(flow_control.in_flight("a"), 0)
+
+
+class TestRouterFlowControl(NIOTestCase):
+
+    def _create_router(self, router_type, settings):
+        """ Create a router delivering signals from the source fast output
+        to a forwarding block, then to a slow block, and from its slow
+        output straight to another slow block """
+        block_router = router_type()
+        context = BlockContext(block_router, dict())
+        self.blocks = {"source": SourceBlock(),
+                       "forward": ForwardingBlock(),
+                       "slow": SlowBlock(),
+                       "slower": SlowBlock()}
+        for block_id, block in self.blocks.items():
+            block.id = block_id
+            block.configure(context)
+        self.blocks["forward"].source = self.blocks["source"]
+        execution = [
+            BlockExecutionTest(id="source", receivers={
+                "fast": ["forward"], "slow": ["slower"]}),
+            BlockExecutionTest(id="forward", receivers=["slow"])]
+        block_router.do_configure(
+            RouterContext(execution, self.blocks, settings))
+        block_router.do_start()
+        self.addCleanup(block_router.do_stop)
+        # never leave delivery threads hanging
+        self.addCleanup(self.blocks["slow"].release.set)
+        self.addCleanup(self.blocks["slower"].release.set)
+        return block_router
+
+    def test_disabled(self):
+        """ Blocks get no credits unless flow control is enabled """
+        self._create_router(BlockRouter, {})
+        source = self.blocks["source"]
+        self.assertIsNone(source.downstream_capacity())
+        self.assertTrue(source.wait_for_capacity(100, timeout=0))
+
+    def test_synchronous_delivery(self):
+        """ Signals are in flight while blocks process them """
+        self._create_router(BlockRouter, {"max_in_flight": 10})
+        source = self.blocks["source"]
+        self.blocks["slow"].release.set()
+        self.assertEqual(source.downstream_capacity(), 10)
+        source.notify_signals([Signal(), Signal(), Signal()], "fast")
+        # the forwarding block was processing 3 signals
+        self.assertEqual(self.blocks["forward"].capacity_seen, 7)
+        self.assertEqual(source.downstream_capacity(), 10)
+
+    def test_asynchronous_delivery(self):
+        """ Credits go down as signals wait for a slow block downstream """
+        block_router = self._create_router(
+            ThreadedPoolExecutorRouter,
+            {"max_in_flight": 10, "max_workers": 5})
+        source = self.blocks["source"]
+        for _ in range(4):
+            source.notify_signals([Signal(), Signal()], "fast")
+        # the slow block holds the signals back, not the forwarding block
+        ensure_condition(
+            lambda: block_router._flow_control.in_flight("slow") == 8,
+            max_wait_time=1)
+        self.assertEqual(source.downstream_capacity("fast"), 2)
+        self.assertEqual(source.downstream_capacity(), 2)
+        self.assertEqual(source.downstream_capacity("slow"), 10)
+        self.assertFalse(source.wait_for_capacity(5, "fast", timeout=0.01))
+
+        self.blocks["slow"].release.set()
+        self.assertTrue(source.wait_for_capacity(10, "fast", timeout=1))
+        self.assertEqual(block_router._flow_control.in_flight("slow"), 0)
+
+    def test_stop_releases_credits(self):
+        """ Signals never delivered are not in flight once stopped """
+        block_router = self._create_router(
+            DroppingRouter, {"max_in_flight": 10})
+        source = self.blocks["source"]
+        source.notify_signals([Signal(), Signal()], "fast")
+        self.assertEqual(source.downstream_capacity(), 8)
+        block_router.do_stop()
+        self.assertEqual(source.downstream_capacity(), 10)
+
+    def test_failed_delivery_releases_credits(self):
+        """ Credits are given back however the delivery ends """
+        block_router = self._create_router(
+            BlockRouter, {"max_in_flight": 10, "trace_sample_rate": 1})
+        block_router._tracer.on_processed = Mock(side_effect=ValueError())
+        self.blocks["slower"].release.set()
+        source = self.blocks["source"]
+        with self.assertRaises(ValueError):
+            source.notify_signals([Signal(), Signal()], "slow")
+        self.assertEqual(source.downstream_capacity("slow"), 10)
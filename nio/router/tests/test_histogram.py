@@ -0,0 +1,53 @@
+from nio.router.histogram import LatencyHistogram, BUCKET_BOUNDS
+from nio.testing.test_case import NIOTestCase
+
+
+class TestLatencyHistogram(NIOTestCase):
+
+    def test_record(self):
+        """ Latencies are counted in the first bucket that fits them """
+        histogram = LatencyHistogram()
+        histogram.record(0)
+        histogram.record(1e-6)
+        histogram.record(0.0011)
+        histogram.record(1000)
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.buckets[0], 2)
+        self.assertEqual(histogram.buckets[-1], 1)
+        index = histogram.buckets.index(1)
+        self.assertLess(BUCKET_BOUNDS[index - 1], 0.0011)
+        self.assertGreaterEqual(BUCKET_BOUNDS[index], 0.0011)
+        self.assertAlmostEqual(histogram.total, 1000.0011 + 1e-6)
+
+    def test_percentiles(self):
+        """ Percentiles are reported as bucket upper bounds """
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for _ in range(90):
+            histogram.record(0.001)
+        for _ in range(10):
+            histogram.record(0.1)
+        p50 = histogram.percentile(50)
+        self.assertTrue(0.001 <= p50 < 0.001 * 1.5)
+        self.assertEqual(histogram.percentile(90), p50)
+        p99 = histogram.percentile(99)
+        self.assertTrue(0.1 <= p99 < 0.1 * 1.5)
+        summary = histogram.to_dict()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p99"], p99)
+        self.assertEqual(sorted(summary["buckets"].values()), [10, 90])
+
+    def test_merge_subtract(self):
+        """ Histograms can be merged and subtracted """
+        first = LatencyHistogram()
+        first.record(0.001)
+        second = LatencyHistogram()
+        second.record(0.001)
+        second.record(0.5)
+        earlier = first.copy()
+        first.merge(second)
+        self.assertEqual(first.count, 3)
+        self.assertAlmostEqual(first.total, 0.502)
+        delta = first.subtract(earlier)
+        self.assertEqual(delta.buckets, second.buckets)
+        self.assertEqual(earlier.count, 1)
@@ -0,0 +1,127 @@
+from unittest.mock import Mock
+
+from nio.block.base import Block
+from nio.block.context import BlockContext
+from nio.block.terminals import output
+from nio.router.base import InvalidBlockOutput
+from nio.router.context import RouterContext
+from nio.router.sharding import ShardPartitioner, ShardRouter, \
+    shard_of, source_blocks
+from nio.service.base import BlockExecution
+from nio.signal.base import Signal
+from nio.testing.test_case import NIOTestCase
+
+
+@output("first", default=True)
+@output("second")
+class SourceBlock(Block):
+    pass
+
+
+class BlockExecutionTest(BlockExecution):
+
+    def __init__(self, id, receivers):
+        self.id = id
+        self.receivers = receivers
+
+
+class TestShardPartitioner(NIOTestCase):
+
+    def test_replicas_own_disjoint_keys(self):
+        """ Every signal goes to exactly one replica """
+        signals = [Signal({"device": "device-{}".format(index)})
+                   for index in range(100)]
+        partitioner = ShardPartitioner("{{ $device }}", 3)
+        owned = partitioner.split(signals)
+        self.assertEqual(len(owned), 3)
+        self.assertEqual(sum(len(signals) for signals in owned), 100)
+        for index, signals in enumerate(owned):
+            # keys are spread over the replicas
+            self.assertGreater(len(signals), 0)
+            for signal in signals:
+                self.assertEqual(shard_of(signal.device, 3), index)
+        self.assertDictEqual(partitioner.stats(), {
+            "shards": 3,
+            "signals": [len(signals) for signals in owned]})
+
+    def test_same_key_same_replica(self):
+        """ Signals with the same key go to the same replica, in order """
+        partitioner = ShardPartitioner("{{ $device }}", 4)
+        signals = [Signal({"device": "a", "value": value})
+                   for value in range(5)]
+        owned = partitioner.split(signals)
+        self.assertIn(signals, owned)
+        # keys are hashed the same way whatever the process
+        self.assertEqual(shard_of("device-1", 4), shard_of("device-1", 4))
+        self.assertEqual(shard_of(12, 7), shard_of("12", 7))
+
+    def test_invalid_key(self):
+        """ Signals failing to evaluate their key go to one replica """
+        owned = ShardPartitioner("{{ $missing }}", 2).split(
+            [Signal({"device": "a"})])
+        self.assertEqual(sorted(len(signals) for signals in owned), [0, 1])
+
+    def test_invalid_shards(self):
+        with self.assertRaises(ValueError):
+            ShardPartitioner("{{ $device }}", 0)
+
+    def test_source_blocks(self):
+        """ Sources are the blocks nothing sends signals to """
+        execution = [
+            BlockExecutionTest(id="a", receivers=["b"]),
+            BlockExecutionTest(id="b", receivers={
+                "first": [{"id": "c", "input": "in"}], "second": ["d"]}),
+            BlockExecutionTest(id="e", receivers=["d"]),
+            BlockExecutionTest(id="d", receivers=[])]
+        self.assertEqual(
+            source_blocks(execution, ["a", "b", "c", "d", "e"]), ["a", "e"])
+
+
+class TestShardRouter(NIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.send = Mock()
+        self.router = ShardRouter("{{ $key }}", 2, self.send)
+        self.block = SourceBlock()
+        self.block.configure(BlockContext(self.router, {"id": "source"}))
+        self.router.do_configure(
+            RouterContext([], {"source": self.block}, {}))
+
+    def test_signals_sent_to_replicas(self):
+        """ Signals notified by source blocks are split between replicas """
+        self.router.do_start()
+        self.addCleanup(self.router.do_stop)
+        signals = [Signal({"key": key}) for key in range(20)]
+        self.block.notify_signals(signals)
+        self.block.notify_signals(signals[:1], "second")
+        owned = [[signal for signal in signals
+                  if shard_of(signal.key, 2) == index]
+                 for index in range(2)]
+        first_owner = shard_of(0, 2)
+        self.assertEqual(
+            [call[0] for call in self.send.call_args_list],
+            [(0, "source", "first", owned[0]),
+             (1, "source", "first", owned[1]),
+             (first_owner, "source", "second", signals[:1])])
+        self.assertDictEqual(self.router.shard_stats(), {
+            "shards": 2,
+            "signals": [len(owned[0]) + (first_owner == 0),
+                        len(owned[1]) + (first_owner == 1)]})
+        # signals are not delivered in this process
+        self.assertIsNone(self.router.latency_stats())
+        self.assertIsNone(self.block.downstream_capacity())
+
+    def test_invalid_signals(self):
+        self.router.do_start()
+        self.addCleanup(self.router.do_stop)
+        with self.assertRaises(InvalidBlockOutput):
+            self.block.notify_signals([Signal()], "third")
+        with self.assertRaises(TypeError):
+            self.block.notify_signals([{"key": 1}])
+        self.assertFalse(self.send.called)
+
+    def test_not_started(self):
+        """ Signals are discarded until the router starts """
+        self.block.notify_signals([Signal({"key": 1})])
+        self.assertFalse(self.send.called)
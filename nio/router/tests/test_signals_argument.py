@@ -17,6 +17,11 @@ class SenderBlock(Block):
         self.id = "sender_block"
 
 
+class TrustedSenderBlock(SenderBlock):
+
+    trusted_producer = True
+
+
 class ReceiverBlock(Block):
 
     def __init__(self):
@@ -122,3 +127,55 @@ class TestSignalsArgument(NIOTestCase):
             receiver.assert_called_once_with(signals, DEFAULT_TERMINAL)
 
         block_router.do_stop()
+
+    def _configure_trusted(self, settings=None):
+        self.sender_block = TrustedSenderBlock()
+        self.receiver_block = ReceiverBlock()
+        block_router = BlockRouter()
+        blocks = {
+            self.receiver_block.id(): self.receiver_block,
+            self.sender_block.id(): self.sender_block
+        }
+        execution = [BlockExecutionTest(id=self.sender_block.id(),
+                                        receivers=[self.receiver_block.id()])]
+        block_router.do_configure(
+            RouterContext(execution, blocks, settings))
+        block_router.do_start()
+        self.addCleanup(block_router.do_stop)
+        self.sender_block.do_configure(BlockContext(block_router, dict()))
+
+    def test_trusted_producer(self):
+        """Signals from trusted producers are type checked once"""
+        self._configure_trusted()
+        with self.assertRaises(TypeError):
+            self.sender_block.notify_signals([Signal(), object()])
+        with patch.object(self.receiver_block, 'process_signals') as receiver:
+            signals = [Signal(), object()]
+            self.sender_block.notify_signals(signals)
+            receiver.assert_called_once_with(signals, DEFAULT_TERMINAL)
+
+    def test_trusted_producer_always_checked(self):
+        """Trusted producers can be checked on every notification"""
+        self._configure_trusted({"trusted_signal_check": "always"})
+        for _ in range(2):
+            with self.assertRaises(TypeError):
+                self.sender_block.notify_signals([object()])
+
+    def test_trusted_producer_sampled(self):
+        """Trusted producers can be checked on a sample of notifications"""
+        self._configure_trusted({"trusted_signal_check": "sample",
+                                 "trusted_sample_rate": 0.5})
+        # the first notification is always checked
+        self.sender_block.notify_signals([Signal()])
+        with patch("nio.router.base.random", side_effect=[0.7, 0.2]), \
+                patch.object(self.receiver_block, 'process_signals') as \
+                receiver:
+            self.sender_block.notify_signals([object()])
+            self.assertEqual(receiver.call_count, 1)
+            with self.assertRaises(TypeError):
+                self.sender_block.notify_signals([object()])
+
+    def test_invalid_trusted_signal_check(self):
+        """The trusted signal check setting is validated"""
+        with self.assertRaises(ValueError):
+            self._configure_trusted({"trusted_signal_check": "never"})
@@ -0,0 +1,104 @@
+from copy import deepcopy
+from unittest.mock import patch
+
+from nio.block.base import Block
+from nio.block.context import BlockContext
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.router.base import BlockRouter
+from nio.router.context import RouterContext
+from nio.router.tracing import SignalTracer
+from nio.service.base import BlockExecution
+from nio.signal.base import Signal
+from nio.signal.trace import get_trace, propagate_trace
+from nio.testing.test_case import NIOTestCase
+
+
+class ForwardingBlock(Block):
+
+    def __init__(self, block_id):
+        super().__init__()
+        self.id = block_id
+        self.signal_cache = None
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.signal_cache = signals
+        self.notify_signals(signals)
+
+
+class BlockExecutionTest(BlockExecution):
+
+    def __init__(self, id, receivers):
+        self.id = id
+        self.receivers = receivers
+
+
+class TestTracing(NIOTestCase):
+
+    def _create_router(self, settings):
+        """ Create a router delivering signals from block a to b to c """
+        block_router = BlockRouter()
+        context = BlockContext(block_router, dict())
+        self.blocks = {}
+        for block_id in ["a", "b", "c"]:
+            block = ForwardingBlock(block_id)
+            block.configure(context)
+            self.blocks[block_id] = block
+        execution = [BlockExecutionTest(id="a", receivers=["b"]),
+                     BlockExecutionTest(id="b", receivers=["c"])]
+        block_router.do_configure(
+            RouterContext(execution, self.blocks, settings))
+        block_router.do_start()
+        self.addCleanup(block_router.do_stop)
+        return block_router
+
+    def test_no_tracing_by_default(self):
+        """ Signals are not traced unless sampling is enabled """
+        block_router = self._create_router({})
+        signal = Signal({"key": "val"})
+        self.blocks["a"].notify_signals([signal])
+        self.assertIs(self.blocks["c"].signal_cache[0], signal)
+        self.assertIsNone(get_trace(signal))
+        self.assertIsNone(block_router.trace_stats())
+
+    def test_trace_path(self):
+        """ Sampled signals are traced from their origin to a sink """
+        block_router = self._create_router({"trace_sample_rate": 1})
+        signals = [Signal({"key": "val"}), Signal({"key": "val"})]
+        self.blocks["a"].notify_signals(signals)
+
+        trace = get_trace(self.blocks["c"].signal_cache[0])
+        self.assertEqual([block_id for block_id, _ in trace.hops],
+                         ["a", "b"])
+        # hidden from the signal contents
+        self.assertDictEqual(signals[0].to_dict(), {"key": "val"})
+
+        stats = block_router.trace_stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["path"], ["a", "b", "c"])
+        self.assertEqual(stats[0]["end_to_end"]["count"], 2)
+        self.assertEqual(
+            [(hop["from"], hop["to"], hop["latency"]["count"])
+             for hop in stats[0]["hops"]],
+            [("a", "b", 2), ("b", "c", 2)])
+
+    def test_sampling(self):
+        """ Only a sample of the signals get a trace context """
+        tracer = SignalTracer(0.5, [])
+        signals = [Signal(), Signal()]
+        with patch("nio.router.tracing.random", side_effect=[0.7, 0.2]):
+            tracer.on_notify("a", signals)
+        self.assertIsNone(get_trace(signals[0]))
+        self.assertIsNotNone(get_trace(signals[1]))
+        # already traced signals get a hop instead
+        tracer.on_notify("b", signals[1:])
+        self.assertEqual(len(get_trace(signals[1]).hops), 2)
+
+    def test_trace_copies(self):
+        """ Trace contexts are carried by copies of a signal """
+        tracer = SignalTracer(1, [])
+        signal = Signal()
+        tracer.on_notify("a", [signal])
+        self.assertIs(get_trace(deepcopy(signal)), get_trace(signal))
+        new_signal = Signal()
+        propagate_trace(signal, new_signal)
+        self.assertIs(get_trace(new_signal), get_trace(signal))
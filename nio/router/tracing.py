@@ -0,0 +1,105 @@
+from random import random
+from threading import Lock
+from time import perf_counter
+from uuid import uuid4
+
+from nio.router.histogram import LatencyHistogram
+from nio.signal.trace import TraceContext, get_trace, set_trace
+
+
+class SignalTracer(object):
+
+    """ Samples signals and measures how long they take to go through a
+    service
+
+    A sample of the signals notified without a trace context gets one, with
+    the notifying block as origin. A hop is added every time a traced signal
+    is notified again, and the trace completes once a block without
+    receivers is done processing it. Latencies are then aggregated per path,
+    the sequence of blocks the signal went through, end to end and for every
+    hop.
+
+    """
+
+    # Traces of signals going around loops stop growing past this many hops
+    max_hops = 32
+
+    def __init__(self, sample_rate, sinks):
+        """ Create a new tracer
+
+        Args:
+            sample_rate (float): Ratio, between 0 and 1, of the signals
+                without a trace context that get one
+            sinks (iterable): The ids of the blocks that complete traces
+        """
+        self._sample_rate = sample_rate
+        self._sinks = frozenset(sinks)
+        self._lock = Lock()
+        # path tuple -> (end to end histogram, list of hop histograms)
+        self._paths = {}
+
+    def on_notify(self, block_id, signals):
+        """ Start or extend the traces of signals notified by a block """
+        if block_id in self._sinks:
+            # nothing receives these signals, the trace is over
+            return
+        now = perf_counter()
+        for signal in signals:
+            trace = get_trace(signal)
+            if trace is None:
+                if random() < self._sample_rate:
+                    set_trace(signal, TraceContext(
+                        uuid4().hex, ((block_id, now),)))
+            elif len(trace.hops) < self.max_hops:
+                set_trace(signal, trace.with_hop(block_id, now))
+
+    def on_processed(self, block_id, signals):
+        """ Complete the traces of signals once a sink processed them """
+        if block_id not in self._sinks:
+            return
+        now = perf_counter()
+        for signal in signals:
+            trace = get_trace(signal)
+            if trace is not None:
+                self._record(trace.hops + ((block_id, now),))
+
+    def stats(self):
+        """ Returns the latencies of every path traced signals went through
+
+        Returns:
+            list: a dict per path, with the block ids of the "path", the
+                "end_to_end" latency summary and a latency summary for
+                each of the "hops" along the path
+        """
+        with self._lock:
+            paths = [(path, end_to_end.copy(),
+                      [histogram.copy() for histogram in hops])
+                     for path, (end_to_end, hops) in self._paths.items()]
+        return [
+            {
+                "path": list(path),
+                "end_to_end": end_to_end.to_dict(),
+                "hops": [
+                    {
+                        "from": path[index],
+                        "to": path[index + 1],
+                        "latency": histogram.to_dict()
+                    }
+                    for index, histogram in enumerate(hops)
+                ]
+            }
+            for path, end_to_end, hops in paths
+        ]
+
+    def _record(self, hops):
+        path = tuple(block_id for block_id, _ in hops)
+        with self._lock:
+            path_stats = self._paths.get(path)
+            if path_stats is None:
+                path_stats = self._paths[path] = (
+                    LatencyHistogram(),
+                    [LatencyHistogram() for _ in range(len(hops) - 1)])
+            end_to_end, hop_histograms = path_stats
+            end_to_end.record(hops[-1][1] - hops[0][1])
+            for index, histogram in enumerate(hop_histograms):
+                histogram.record(hops[index + 1][1] - hops[index][1])
@@ -1,10 +1,17 @@
+from copy import deepcopy
+from functools import partial
+
 from nio import discoverable
 from nio.block.context import BlockContext
 from nio.command import command
 from nio.command.holder import CommandHolder
 from nio.properties import PropertyHolder, VersionProperty, \
-    BoolProperty, ListProperty, StringProperty, Property, SelectProperty
+    BoolProperty, ListProperty, StringProperty, Property, SelectProperty, \
+    IntProperty
 from nio.router.context import RouterContext
+from nio.router.sharding import ShardRouter, source_blocks
+from nio.service.management import ManagementSignalDispatcher
+from nio.service.sharding import ReplicaException, ServiceReplica
 from nio.util.logging import get_nio_logger
 from nio.util.logging.levels import LogLevel
 from nio.util.flags_enum import FlagsEnum
@@ -50,6 +57,8 @@ class BlockMapping(PropertyHolder):
 
 
 @command('status', method="full_status")
+@command('latency')
+@command('traces')
 @command('heartbeat')
 @command('runproperties')
 @command('start')
@@ -77,6 +86,17 @@ class Service(PropertyHolder, CommandHolder, Runner):
     execution = ListProperty(BlockExecution, title="Execution", default=[])
     mappings = ListProperty(BlockMapping, title="Mappings", default=[])
 
+    # number of child processes running a replica of the service, each one
+    # getting the signals whose shard key hashes to it, 0 runs the service
+    # in this process
+    shards = IntProperty(title="Shards", default=0)
+    shard_key = StringProperty(title="Shard Key", default="", allow_none=True)
+    # seconds to wait for a replica process to answer a command
+    replica_timeout = 30
+    # seconds to wait for pending management signals to be published when
+    # stopping
+    mgmt_signals_timeout = 10
+
     # System Metadata that can be used by API clients, which is serialized
     # along with any other service properties
     sys_metadata = StringProperty(title="Metadata", visible=True, default="")
@@ -99,12 +119,19 @@ class Service(PropertyHolder, CommandHolder, Runner):
 
         self._block_router = None
         self.mgmt_signal_handler = None
+        self._mgmt_signal_dispatcher = None
         self._blocks = {}
         self.mappings = []
 
         self._blocks_async_configure = None
         self._blocks_async_start = None
         self._blocks_async_stop = None
+        self._replicas = []
+        # ids of the source blocks of a sharded service
+        self._shard_sources = frozenset()
+        # ids of the source blocks running in the sharded service, set on
+        # its replicas
+        self._shard_inputs = frozenset()
 
     def start(self):
         """Overrideable method to be called when the service starts.
@@ -116,13 +143,21 @@ class Service(PropertyHolder, CommandHolder, Runner):
         on the parent, after which it can assume that block router and blocks
         are started
         """
+        if self._replicas:
+            # replicas get ready for signals before source blocks start
+            self._execute_on_replicas("start")
+
+        if self._mgmt_signal_dispatcher:
+            # restarted after having been stopped
+            self._mgmt_signal_dispatcher.start()
+
         if self._block_router:
             self._block_router.do_start()
 
         if self._blocks_async_start:
             self._execute_on_blocks_async("do_start")
         else:
-            for block in self._blocks.values():
+            for block in self._running_blocks():
                 try:
                     block.do_start()
                 except Exception as e:
@@ -139,12 +174,19 @@ class Service(PropertyHolder, CommandHolder, Runner):
         if self._blocks_async_stop:
             self._execute_on_blocks_async("do_stop")
         else:
-            for block in self._blocks.values():
+            for block in self._running_blocks():
                 block.do_stop()
 
         if self._block_router:
             self._block_router.do_stop()
 
+        if self._replicas:
+            self._execute_on_replicas("stop")
+
+        if self._mgmt_signal_dispatcher:
+            # publish the signals notified while stopping
+            self._mgmt_signal_dispatcher.stop(self.mgmt_signals_timeout)
+
     def _execute_on_blocks_async(self, method):
         """ Performs given method on all blocks in an async manner
 
@@ -162,7 +204,7 @@ class Service(PropertyHolder, CommandHolder, Runner):
 
         """
         threads = []
-        for block in self._blocks.values():
+        for block in self._running_blocks():
             # no apparent way to retrieve block label from the thread object
             threads.append({
                 "block": block,
@@ -177,6 +219,34 @@ class Service(PropertyHolder, CommandHolder, Runner):
                 raise BlockException(
                     e, block_label=block.label(), block_id=block.id())
 
+    def _running_blocks(self):
+        """ Returns the blocks run by this service
+
+        Replicas of a sharded service do not run the source blocks, the
+        sharded service does.
+        """
+        return [block for block_id, block in self._blocks.items()
+                if block_id not in self._shard_inputs]
+
+    def _execute_on_replicas(self, method):
+        """ Performs given method on all replicas at the same time
+
+        Args:
+            method (str): "configure", "start" or "stop"
+
+        """
+        threads = []
+        for replica in self._replicas:
+            if method == "configure":
+                target = replica.configure
+            elif method == "stop":
+                target = replica.stop
+            else:
+                target = partial(replica.call, method)
+            threads.append(spawn(target, self.replica_timeout))
+        for thread in threads:
+            thread.join()
+
     def configure(self, context):
         """Configure the service based on the context
 
@@ -196,19 +266,56 @@ class Service(PropertyHolder, CommandHolder, Runner):
         self.logger = get_nio_logger(self.label())
         self.logger.setLevel(self.log_level())
 
+        if self.shards() > 0:
+            self._configure_replicas(context)
+            try:
+                self._configure_blocks(context)
+            except Exception:
+                # do not leave the replicas running
+                self._execute_on_replicas("stop")
+                raise
+        else:
+            self._shard_inputs = frozenset(context.shard_inputs or ())
+            self._configure_blocks(context)
+
+    def _configure_blocks(self, context):
+        """ Create and configure the block router and the blocks of the
+        service, the source blocks only for a sharded service """
         # instantiate block router
         self.logger.debug("Instantiating block router: {0}.{1}".
                           format(context.block_router_type.__module__,
                                  context.block_router_type.__name__))
         self.mgmt_signal_handler = context.mgmt_signal_handler
+        if context.mgmt_signals_max_pending > 0 and \
+                context.mgmt_signal_handler is not None:
+            # blocks and router hand management signals over to a thread of
+            # their own, whatever the load on the threads delivering signals
+            self._mgmt_signal_dispatcher = ManagementSignalDispatcher(
+                context.mgmt_signal_handler,
+                context.mgmt_signals_max_pending)
+            self._mgmt_signal_dispatcher.start()
+            self.mgmt_signal_handler = self._mgmt_signal_dispatcher.notify
         self._blocks_async_configure = context.blocks_async_configure
         self._blocks_async_start = context.blocks_async_start
         self._blocks_async_stop = context.blocks_async_stop
-        self._block_router = context.block_router_type()
+        if self._replicas:
+            # source blocks run in this process, the signals they notify are
+            # sent to the replicas owning them
+            self._block_router = ShardRouter(
+                self.shard_key.value, self.shards(), self._send_to_replica)
+            block_definitions = [
+                block_definition for block_definition in context.blocks
+                if block_definition["properties"]["id"] in
+                self._shard_sources]
+            execution = []
+        else:
+            self._block_router = context.block_router_type()
+            block_definitions = context.blocks
+            execution = self.execution()
 
         # create and configure blocks
         configure_threads = []
-        for block_definition in context.blocks:
+        for block_definition in block_definitions:
             block_context = self._create_block_context(
                 block_definition['properties'],
                 context)
@@ -242,15 +349,52 @@ class Service(PropertyHolder, CommandHolder, Runner):
                         e, block_label=block.label(), block_id=block.id())
 
         # populate router context and configure block router
-        router_context = RouterContext(self.execution(),
+        router_context = RouterContext(execution,
                                        self._blocks,
                                        context.router_settings,
-                                       context.mgmt_signal_handler,
+                                       self.mgmt_signal_handler,
                                        context.instance_id,
                                        self.id(),
                                        self.name())
         self._block_router.do_configure(router_context)
 
+    def _configure_replicas(self, context):
+        """ Runs the service in replica processes
+
+        Replicas get the same blocks and properties, but only the source
+        blocks, i.e. publishers and generators, run in this process. Each
+        replica is sent the signals they notify whose shard key hashes to it,
+        so sources run once whether their signals are deterministic or not.
+        """
+        if not self.shard_key.value:
+            raise ValueError("A shard key is needed to run shards")
+        self._shard_sources = frozenset(source_blocks(
+            self.execution(),
+            [block_definition["properties"]["id"]
+             for block_definition in context.blocks]))
+        self._replicas = [
+            ServiceReplica(self.__class__, context, index,
+                           self._shard_sources)
+            for index in range(self.shards())]
+        try:
+            self._execute_on_replicas("configure")
+        except Exception:
+            # do not leave the replicas that did configure running
+            self._execute_on_replicas("stop")
+            raise
+
+    def _send_to_replica(self, index, block_id, output_id, signals):
+        self._replicas[index].send_signals(block_id, output_id, signals)
+
+    def notify_shard_signals(self, block_id, signals, output_id):
+        """ Deliver signals a source block notified in the sharded service
+
+        Called on the replicas of a sharded service, signals are delivered
+        from the replica's copy of the source block.
+        """
+        self._block_router.notify_signals(
+            self._blocks[block_id], signals, output_id)
+
     def _create_block_context(self, block_properties, service_context):
         """Populates block context to pass to the block's configure method"""
         return BlockContext(
@@ -273,13 +417,19 @@ class Service(PropertyHolder, CommandHolder, Runner):
     def get_description(cls):
         """ Retrieves a service description based on properties and commands
 
+        The description is computed the first time it is requested and
+        cached on the service class, callers get a copy of it.
+
         Returns:
             Service description
         """
-        properties = super().get_description()
-        commands = cls.get_command_description()
-        return {'properties': properties,
-                'commands': commands}
+        description_attr = "{0}_description".format(cls.__name__)
+        if description_attr not in cls.__dict__:
+            properties = super().get_description()
+            commands = cls.get_command_description()
+            setattr(cls, description_attr, {'properties': properties,
+                                            'commands': commands})
+        return deepcopy(getattr(cls, description_attr))
 
     @property
     def blocks(self):
@@ -298,39 +448,102 @@ class Service(PropertyHolder, CommandHolder, Runner):
         """ Returns service runtime properties """
         return self.to_dict()
 
+    def latency(self):
+        """ Returns the time each block took to process signals """
+        if self._block_router is None:
+            return None
+        return self._block_router.latency_stats()
+
+    def traces(self):
+        """ Returns how long sampled signals took to go through the service """
+        if self._block_router is None:
+            return None
+        return self._block_router.trace_stats()
+
     def full_status(self):
         """Returns service plus block statuses for each block in the service"""
-
+        blocks = self._running_blocks()
         # build a general-like service status.
         service_and_blocks_status = FlagsEnum(RunnerStatus)
         # initialize it with the service status itself
         service_and_blocks_status.flags = self.status.flags
         # go trough its blocks and grab their warning and error statuses if any
-        for block_id in self._blocks:
-            if self._blocks[block_id].status.is_set(RunnerStatus.warning):
+        for block in blocks:
+            if block.status.is_set(RunnerStatus.warning):
                 service_and_blocks_status.add(RunnerStatus.warning)
-            elif self._blocks[block_id].status.is_set(RunnerStatus.error):
+            elif block.status.is_set(RunnerStatus.error):
                 service_and_blocks_status.add(RunnerStatus.error)
 
-        status = {"service": self.status.name,
-                  "service_and_blocks": service_and_blocks_status.name,
-                  "blocks": {}}
         # create a dict for all blocks using block label as key
-        blocks = {}
-        for block_id in self._blocks:
-            block_status = {"status": self._blocks[block_id].status.name}
-            if self._blocks[block_id].status.is_set(RunnerStatus.warning):
+        blocks_status = {}
+        for block in blocks:
+            block_status = {"status": block.status.name}
+            if block.status.is_set(RunnerStatus.warning):
                 block_status["warning"] = \
-                    self._blocks[block_id]._messages[RunnerStatus.warning]
-            if self._blocks[block_id].status.is_set(RunnerStatus.error):
+                    block._messages[RunnerStatus.warning]
+            if block.status.is_set(RunnerStatus.error):
                 block_status["error"] = \
-                    self._blocks[block_id]._messages[RunnerStatus.error]
+                    block._messages[RunnerStatus.error]
 
-            blocks[self._blocks[block_id].label()] = block_status
+            blocks_status[block.label()] = block_status
 
-        status["blocks"] = blocks
+        replicas = self._replicas_status(
+            service_and_blocks_status, blocks_status) \
+            if self._replicas else None
+
+        status = {"service": self.status.name,
+                  "service_and_blocks": service_and_blocks_status.name,
+                  "blocks": blocks_status}
+        if replicas is not None:
+            status["replicas"] = replicas
         return status
 
+    def _replicas_status(self, service_and_blocks_status, blocks_status):
+        """Returns the statuses of the replicas of a sharded service
+
+        Warning and error flags of the replicas are added to the service
+        status. Blocks statuses are the ones of the first replica, unless a
+        block is in warning or error in another replica. Replicas do not
+        report the source blocks, which run in this service.
+
+        Args:
+            service_and_blocks_status (FlagsEnum): Status of the service and
+                its source blocks, updated with the replicas statuses
+            blocks_status (dict): Source blocks statuses by label, updated
+                with the statuses of the blocks of the replicas
+        """
+        shard_stats = self._block_router.shard_stats()
+        replicas = []
+        blocks = {}
+        for replica in self._replicas:
+            try:
+                replica_status = replica.call(
+                    "full_status", self.replica_timeout)
+            except ReplicaException as e:
+                replica_status = {"service": RunnerStatus.error.name,
+                                  "service_and_blocks":
+                                      RunnerStatus.error.name,
+                                  "blocks": {},
+                                  "error": str(e)}
+            replica_status["replica"] = replica.index
+            replica_status["pid"] = replica.pid
+            # signals sent to the replica by the source blocks
+            replica_status["signals"] = \
+                shard_stats["signals"][replica.index]
+            replicas.append(replica_status)
+
+            flags = replica_status["service_and_blocks"].split(", ")
+            for flag in (RunnerStatus.warning, RunnerStatus.error):
+                if flag.name in flags:
+                    service_and_blocks_status.add(flag)
+            for label, block_status in replica_status["blocks"].items():
+                if label not in blocks or "warning" in block_status or \
+                        "error" in block_status:
+                    blocks[label] = block_status
+
+        blocks_status.update(blocks)
+        return replicas
+
     def label(self, include_id=False):
         """ Provides a label to a service based on name and id properties
 
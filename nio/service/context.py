@@ -13,7 +13,10 @@ class ServiceContext(object):
                  blocks_async_configure=True,
                  blocks_async_start=False,
                  blocks_async_stop=True,
-                 instance_id=None):
+                 instance_id=None,
+                 replica_initializer=None,
+                 mgmt_signals_max_pending=0,
+                 shard_inputs=None):
         """ Initializes information needed for a Service
 
         Arguments:
@@ -31,6 +34,15 @@ class ServiceContext(object):
             blocks_async_start: If True, blocks start asynchronously
             blocks_async_stop: If True, blocks stop asynchronously
             instance_id: Instance this service belongs to
+            replica_initializer (callable): Run first thing in each replica
+                process of a sharded service, i.e. to initialize the nio
+                modules its blocks use. Has to be picklable
+            mgmt_signals_max_pending (int): When greater than 0, management
+                signals are published from a thread of their own, with at
+                most this many signals waiting to be published
+            shard_inputs (list): Set on the replicas of a sharded service,
+                ids of the source blocks running in the sharded service
+                instead, the replica delivers the signals they notify
         """
         self.properties = properties
         self.blocks = blocks if blocks is not None else {}
@@ -41,3 +53,6 @@ class ServiceContext(object):
         self.blocks_async_start = blocks_async_start
         self.blocks_async_stop = blocks_async_stop
         self.instance_id = instance_id
+        self.replica_initializer = replica_initializer
+        self.mgmt_signals_max_pending = mgmt_signals_max_pending
+        self.shard_inputs = shard_inputs
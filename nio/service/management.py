@@ -0,0 +1,164 @@
+"""
+  Dispatches the management signals of a service in their own thread
+
+"""
+from collections import OrderedDict, deque
+from threading import Condition
+
+from nio.signal.status import BlockStatusSignal, ServiceStatusSignal
+from nio.util.logging import get_nio_logger
+from nio.util.threading import spawn
+
+
+class ManagementSignalDispatcher(object):
+
+    """ A lane of its own for the management signals of a service
+
+    Blocks and routers notify management signals on whatever thread they
+    are processing signals on. Handing them over to this dispatcher queues
+    them and returns right away, a dedicated thread then publishes them
+    with the service management signal handler.
+
+    Status signals come first, and only the latest status of a block (or of
+    the service) waiting to be published is kept. Other management signals,
+    i.e. router diagnostics, are published in order once there is no status
+    pending.
+
+    The queue is bounded, a signal notified when it is full takes the place
+    of the oldest signal other than a status, or is dropped if only statuses
+    are pending, so notifying never waits on the handler.
+    """
+
+    def __init__(self, handler, max_pending=1000):
+        """ Create a new dispatcher
+
+        Args:
+            handler (callable): The service management signal handler,
+                receives a signal as only parameter
+            max_pending (int): Signals waiting to be published at most
+        """
+        self.logger = get_nio_logger("ManagementSignalDispatcher")
+        self._handler = handler
+        self._max_pending = max_pending
+        self._condition = Condition()
+        # coalescing key -> latest status signal, oldest key first
+        self._statuses = OrderedDict()
+        self._signals = deque()
+        self._thread = None
+        self._running = False
+        self._delivered = 0
+        self._coalesced = 0
+        self._dropped = 0
+
+    def start(self):
+        """ Start the dispatching thread """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = spawn(self._dispatch)
+
+    def stop(self, timeout=None):
+        """ Publish the signals still pending and stop the dispatching thread
+
+        Args:
+            timeout (float): Seconds to wait for pending signals to be
+                published
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def notify(self, signal):
+        """ Queue a management signal to be published
+
+        Takes the place of the service management signal handler, signals
+        are published right away if the dispatcher is not running.
+        """
+        with self._condition:
+            if not self._running:
+                publish = True
+            else:
+                publish = False
+                self._queue(signal)
+                self._condition.notify()
+        if publish:
+            self._publish(signal)
+
+    def _queue(self, signal):
+        key = self._status_key(signal)
+        if key is not None and key in self._statuses:
+            # the previous status is stale, keep its place in line
+            self._statuses[key] = signal
+            self._coalesced += 1
+            return
+        if len(self._statuses) + len(self._signals) >= self._max_pending:
+            if self._signals:
+                self._signals.popleft()
+                self._dropped += 1
+            else:
+                self._dropped += 1
+                return
+        if key is not None:
+            self._statuses[key] = signal
+        else:
+            self._signals.append(signal)
+
+    @staticmethod
+    def _status_key(signal):
+        """ Returns what status signals are coalesced by, None for signals
+        that are not coalesced """
+        if isinstance(signal, BlockStatusSignal):
+            return "block", signal.service_id, signal.block_id
+        if isinstance(signal, ServiceStatusSignal):
+            return "service", signal.service_id
+        return None
+
+    def _next(self):
+        """ Returns the next signal to publish, None when there is none """
+        if self._statuses:
+            return self._statuses.popitem(last=False)[1]
+        if self._signals:
+            return self._signals.popleft()
+        return None
+
+    def _dispatch(self):
+        reported_dropped = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: not self._running or self._statuses or
+                    self._signals)
+                signal = self._next()
+                dropped = self._dropped
+            if dropped > reported_dropped:
+                self.logger.warning(
+                    "Management signals are not published fast enough, "
+                    "{} dropped".format(dropped - reported_dropped))
+                reported_dropped = dropped
+            if signal is None:
+                # stopped with nothing left to publish
+                return
+            self._publish(signal)
+
+    def _publish(self, signal):
+        try:
+            self._handler(signal)
+        except Exception:
+            self.logger.exception(
+                "Failed to publish management signal: {}".format(signal))
+        with self._condition:
+            self._delivered += 1
+
+    def stats(self):
+        """ Returns the signals pending, published, coalesced and dropped """
+        with self._condition:
+            return {
+                "pending": len(self._statuses) + len(self._signals),
+                "delivered": self._delivered,
+                "coalesced": self._coalesced,
+                "dropped": self._dropped
+            }
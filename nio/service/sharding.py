@@ -0,0 +1,266 @@
+"""
+  Runs the replicas of a sharded service in child processes
+
+"""
+import multiprocessing
+from concurrent.futures import Future, TimeoutError as ReplyTimeout
+from copy import copy
+from itertools import count
+from threading import Lock
+
+from nio.util.logging import get_nio_logger
+from nio.util.threading import spawn
+
+
+class ReplicaException(Exception):
+
+    """ Raised when a service replica fails or does not answer """
+    pass
+
+
+def _run_replica(service_class, context, connection):
+    """ Entry point of a replica process
+
+    Configures the replica service, then runs the commands and delivers the
+    signals the parent service sends until it is told to stop or the parent
+    goes away.
+    """
+    send_lock = Lock()
+
+    def send(message):
+        with send_lock:
+            connection.send(message)
+
+    # management signals are published by the parent service
+    context.mgmt_signal_handler = \
+        lambda signal: send(("management", None, signal))
+    try:
+        if context.replica_initializer is not None:
+            context.replica_initializer()
+        service = service_class()
+        service.do_configure(context)
+    except Exception as e:
+        # exceptions raised by blocks may not survive pickling
+        send(("reply", None, ReplicaException(repr(e))))
+        return
+    send(("reply", None, None))
+
+    while True:
+        try:
+            kind, request_id, payload = connection.recv()
+        except EOFError:
+            # the parent service is gone
+            kind, request_id, payload = "call", None, "stop"
+        if kind == "signals":
+            try:
+                service.notify_shard_signals(*payload)
+            except Exception:
+                service.logger.exception(
+                    "Failed to deliver signals from the sharded service")
+            continue
+        command = payload
+        try:
+            if command in ("start", "stop"):
+                result = getattr(service, "do_" + command)()
+            else:
+                result = getattr(service, command)()
+        except Exception as e:
+            result = ReplicaException(repr(e))
+        if request_id is not None:
+            send(("reply", request_id, result))
+        if command == "stop":
+            return
+
+
+class ServiceReplica(object):
+
+    """ A replica of a sharded service running in a child process
+
+    The replica is configured like the service it replicates, but its
+    source blocks are not started. Those run in the parent service, which
+    sends the replica the signals it owns to be delivered from its copies
+    of the source blocks. Commands are sent to the replica process, each
+    caller waits for the reply to its own command, management signals it
+    notifies are published by the parent service.
+    """
+
+    def __init__(self, service_class, context, index, sources):
+        """ Create a new replica
+
+        Args:
+            service_class: Class of the sharded service
+            context (ServiceContext): Context the sharded service was
+                configured with
+            index (int): Shard owned by the replica
+            sources (list): Ids of the source blocks of the service
+        """
+        self.index = index
+        self.logger = get_nio_logger("ServiceReplica-{}".format(index))
+        self._service_class = service_class
+        self._mgmt_signal_handler = context.mgmt_signal_handler
+        self._context = copy(context)
+        # replicas run their blocks instead of starting replicas themselves
+        self._context.properties = dict(context.properties, shards=0)
+        self._context.shard_inputs = list(sources)
+        # bound methods of the parent are not sent to the child process
+        self._context.mgmt_signal_handler = None
+        self._process = None
+        self._connection = None
+        self._request_ids = count(1)
+        # request id -> Future resolved with the reply of the replica, the
+        # configure reply has no request id
+        self._pending = {}
+        # exception failing calls once the replica exited
+        self._exited = None
+        self._pending_lock = Lock()
+        # held while sending to the replica, signals are sent while calls
+        # wait for their answer
+        self._send_lock = Lock()
+
+    @property
+    def pid(self):
+        return self._process.pid if self._process is not None else None
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def configure(self, timeout=None):
+        """ Start the replica process and wait for its service to be
+        configured
+
+        Raises:
+            ReplicaException: if the replica failed to configure in time
+        """
+        # forking a process running threads is unsafe
+        mp_context = multiprocessing.get_context("spawn")
+        self._connection, child_connection = mp_context.Pipe()
+        with self._pending_lock:
+            self._exited = None
+        reply = self._expect_reply(None)
+        self._process = mp_context.Process(
+            target=_run_replica,
+            args=(self._service_class, self._context, child_connection),
+            name="ServiceReplica-{}".format(self.index),
+            daemon=True)
+        self._process.start()
+        child_connection.close()
+        spawn(self._read_messages)
+        self._wait_reply(None, reply, timeout)
+
+    def call(self, command, timeout=None):
+        """ Run a service method in the replica and return its result
+
+        Args:
+            command (str): "start", "stop" or the name of a service method
+                taking no arguments, i.e. "full_status"
+            timeout (float): Seconds to wait for the replica to answer
+
+        Raises:
+            ReplicaException: if the replica failed or did not answer in time
+        """
+        if not self.is_alive():
+            raise ReplicaException(
+                "Replica {} is not running".format(self.index))
+        request_id = next(self._request_ids)
+        # expected before sending, the reply may come right away
+        reply = self._expect_reply(request_id)
+        if reply.done():
+            # the replica exited
+            return self._wait_reply(request_id, reply, timeout)
+        try:
+            with self._send_lock:
+                self._connection.send(("call", request_id, command))
+        except Exception as e:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            raise ReplicaException(
+                "Failed to call replica {}: {!r}".format(self.index, e))
+        return self._wait_reply(request_id, reply, timeout)
+
+    def send_signals(self, block_id, output_id, signals):
+        """ Send the replica signals a source block notified
+
+        Args:
+            block_id (str): Id of the source block that notified the signals
+            output_id: Output the signals were notified on
+            signals (list): The signals owned by the replica
+        """
+        if not self.is_alive():
+            self.logger.warning(
+                "Replica is not running, discarding {} signals".format(
+                    len(signals)))
+            return
+        try:
+            with self._send_lock:
+                self._connection.send(
+                    ("signals", None, (block_id, signals, output_id)))
+        except Exception:
+            self.logger.warning(
+                "Failed to send {} signals to replica".format(len(signals)),
+                exc_info=True)
+
+    def stop(self, timeout=None):
+        """ Stop the replica service and wait for its process to exit """
+        if self._process is None:
+            return
+        try:
+            self.call("stop", timeout)
+        except ReplicaException:
+            self.logger.warning("Failed to stop replica", exc_info=True)
+        finally:
+            if self._process is not None:
+                self._process.join(timeout)
+                if self._process.is_alive():
+                    self.logger.warning("Replica did not exit, terminating")
+                    self._process.terminate()
+            if self._connection is not None:
+                self._connection.close()
+
+    def _expect_reply(self, request_id):
+        """ Returns the Future the reply to a request will resolve """
+        reply = Future()
+        with self._pending_lock:
+            if self._exited is not None:
+                reply.set_exception(self._exited)
+            else:
+                self._pending[request_id] = reply
+        return reply
+
+    def _wait_reply(self, request_id, reply, timeout):
+        try:
+            result = reply.result(timeout)
+        except ReplyTimeout:
+            raise ReplicaException(
+                "Replica {} did not answer".format(self.index))
+        finally:
+            # replies to calls that timed out are dropped
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _read_messages(self):
+        """ Dispatch the messages sent by the replica process """
+        while True:
+            try:
+                kind, request_id, payload = self._connection.recv()
+            except (EOFError, OSError):
+                # the replica exited, fail every pending call
+                exited = ReplicaException(
+                    "Replica {} exited".format(self.index))
+                with self._pending_lock:
+                    self._exited = exited
+                    pending = list(self._pending.values())
+                    self._pending.clear()
+                for reply in pending:
+                    reply.set_exception(exited)
+                return
+            if kind == "management":
+                if self._mgmt_signal_handler is not None:
+                    self._mgmt_signal_handler(payload)
+            else:
+                with self._pending_lock:
+                    reply = self._pending.pop(request_id, None)
+                if reply is not None:
+                    reply.set_result(payload)
@@ -0,0 +1,160 @@
+from threading import Event, get_ident
+from unittest.mock import Mock
+
+from nio import Block
+from nio.router.base import BlockRouter
+from nio.service.base import Service
+from nio.service.context import ServiceContext
+from nio.service.management import ManagementSignalDispatcher
+from nio.signal.management import ManagementSignal
+from nio.signal.status import BlockStatusSignal, ServiceStatusSignal
+from nio.testing.test_case import NIOTestCase
+from nio.util.runner import RunnerStatus
+
+
+class BlockingHandler(object):
+
+    """ Management signal handler holding on to signals until released """
+
+    def __init__(self):
+        self.signals = []
+        self.release = Event()
+        self.called = Event()
+        self.thread = None
+
+    def __call__(self, signal):
+        self.thread = get_ident()
+        self.called.set()
+        self.release.wait(5)
+        self.signals.append(signal)
+
+
+def _block_status(block_id, status, message=""):
+    signal = BlockStatusSignal(status, message)
+    signal.service_id = "service"
+    signal.block_id = block_id
+    return signal
+
+
+class TestManagementSignalDispatcher(NIOTestCase):
+
+    def _start_dispatcher(self, max_pending=1000):
+        self.handler = BlockingHandler()
+        dispatcher = ManagementSignalDispatcher(self.handler, max_pending)
+        dispatcher.start()
+        self.addCleanup(dispatcher.stop, 1)
+        self.addCleanup(self.handler.release.set)
+        # the dispatching thread holds on to the first signal
+        dispatcher.notify(ManagementSignal({"first": True}))
+        self.assertTrue(self.handler.called.wait(1))
+        return dispatcher
+
+    def test_dispatching_thread(self):
+        """ Signals are published from the dispatcher thread """
+        dispatcher = self._start_dispatcher()
+        self.assertNotEqual(self.handler.thread, get_ident())
+        self.handler.release.set()
+        dispatcher.stop(1)
+        self.assertEqual(len(self.handler.signals), 1)
+        self.assertEqual(dispatcher.stats()["delivered"], 1)
+
+    def test_statuses_coalesced_first(self):
+        """ Latest statuses are published first, other signals in order """
+        dispatcher = self._start_dispatcher()
+        diagnostics = [ManagementSignal({"type": "RouterDiagnostic",
+                                         "index": index})
+                       for index in range(3)]
+        dispatcher.notify(diagnostics[0])
+        dispatcher.notify(_block_status("a", RunnerStatus.warning))
+        dispatcher.notify(_block_status("b", RunnerStatus.warning))
+        dispatcher.notify(diagnostics[1])
+        latest_a = _block_status("a", RunnerStatus.error)
+        dispatcher.notify(latest_a)
+        service_status = ServiceStatusSignal(RunnerStatus.started)
+        dispatcher.notify(service_status)
+        dispatcher.notify(diagnostics[2])
+        self.assertEqual(dispatcher.stats()["pending"], 6)
+        self.assertEqual(dispatcher.stats()["coalesced"], 1)
+
+        self.handler.release.set()
+        dispatcher.stop(1)
+        published = self.handler.signals[1:]
+        self.assertIs(published[0], latest_a)
+        self.assertEqual(published[1].block_id, "b")
+        self.assertIs(published[2], service_status)
+        self.assertEqual(published[3:], diagnostics)
+
+    def test_bounded(self):
+        """ Statuses take the place of other signals when full """
+        dispatcher = self._start_dispatcher(max_pending=2)
+        dispatcher.notify(ManagementSignal({"index": 0}))
+        dispatcher.notify(ManagementSignal({"index": 1}))
+        dispatcher.notify(_block_status("a", RunnerStatus.warning))
+        dispatcher.notify(_block_status("b", RunnerStatus.warning))
+        # only statuses are pending, new signals are dropped
+        dispatcher.notify(_block_status("c", RunnerStatus.warning))
+        dispatcher.notify(ManagementSignal({"index": 2}))
+        # statuses of blocks already pending are still coalesced
+        dispatcher.notify(_block_status("a", RunnerStatus.error))
+        self.assertDictEqual(dispatcher.stats(), {
+            "pending": 2, "delivered": 0, "coalesced": 1, "dropped": 4})
+
+        self.handler.release.set()
+        dispatcher.stop(1)
+        self.assertEqual(
+            [(signal.block_id, signal.status)
+             for signal in self.handler.signals[1:]],
+            [("a", RunnerStatus.error), ("b", RunnerStatus.warning)])
+
+    def test_not_running(self):
+        """ Signals are published right away when not running """
+        handler = Mock()
+        dispatcher = ManagementSignalDispatcher(handler)
+        signal = ManagementSignal()
+        dispatcher.notify(signal)
+        handler.assert_called_once_with(signal)
+
+    def test_failing_handler(self):
+        """ A failing handler does not stop the dispatcher """
+        handler = Mock(side_effect=[ValueError(), None])
+        dispatcher = ManagementSignalDispatcher(handler)
+        dispatcher.start()
+        dispatcher.notify(ManagementSignal())
+        dispatcher.notify(ManagementSignal())
+        dispatcher.stop(1)
+        self.assertEqual(handler.call_count, 2)
+
+
+class StatusBlock(Block):
+
+    def start(self):
+        super().start()
+        self.set_status("warning", "starting up")
+
+
+class TestServiceManagementSignals(NIOTestCase):
+
+    def test_service_dispatcher(self):
+        """ Services publish management signals from their own lane """
+        handler = BlockingHandler()
+        self.addCleanup(handler.release.set)
+        service = Service()
+        service.do_configure(ServiceContext(
+            {"id": "ServiceId", "log_level": "WARNING"},
+            blocks=[{"type": StatusBlock, "properties": {"id": "block"}}],
+            block_router_type=BlockRouter,
+            router_settings={"diagnostics": False},
+            mgmt_signal_handler=handler,
+            blocks_async_start=False,
+            mgmt_signals_max_pending=100))
+        # blocks setting their status do not wait on the handler
+        service.do_start()
+        self.assertTrue(handler.called.wait(1))
+        self.assertEqual(handler.signals, [])
+
+        handler.release.set()
+        service.do_stop()
+        # pending signals are published when the service stops
+        self.assertEqual(len(handler.signals), 1)
+        self.assertEqual(handler.signals[0].block_id, "block")
+        self.assertNotEqual(handler.thread, get_ident())
@@ -198,6 +198,8 @@ class TestBaseService(NIOTestCase):
         self.assertIn("status", description["commands"])
         self.assertIn("heartbeat", description["commands"])
         self.assertIn("runproperties", description["commands"])
+        self.assertIn("latency", description["commands"])
+        self.assertIn("traces", description["commands"])
 
         # verify heartbeat command
         self.assertEqual(service.heartbeat().name, "started")
@@ -207,6 +209,11 @@ class TestBaseService(NIOTestCase):
         self.assertIn("id", run_properties)
         self.assertEqual(run_properties["id"], "ServiceId")
 
+        # verify latency command, the service has no blocks
+        self.assertDictEqual(service.latency(), {"edges": [], "blocks": []})
+        # tracing is disabled by default
+        self.assertIsNone(service.traces())
+
         service.do_stop()
 
     def test_config_with_no_name(self):
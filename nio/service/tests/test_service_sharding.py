@@ -0,0 +1,245 @@
+from multiprocessing import Pipe
+from unittest.mock import Mock
+from uuid import uuid4
+
+from nio import Block
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.properties import IntProperty
+from nio.router.base import BlockRouter
+from nio.router.sharding import shard_of
+from nio.service.base import Service
+from nio.service.context import ServiceContext
+from nio.service.sharding import ReplicaException, ServiceReplica
+from nio.signal.base import Signal
+from nio.testing.condition import ensure_condition
+from nio.testing.test_case import NIOTestCase
+from nio.util.runner import RunnerStatus
+from nio.util.threading import spawn
+
+
+# Replica processes import this module, blocks have to be defined at module
+# level to be sent to them
+class GeneratorBlock(Block):
+
+    """ Notifies a signal per key once started """
+
+    keys = IntProperty(title="Keys", default=20)
+
+    def start(self):
+        super().start()
+        self.notify_signals([Signal({"key": key})
+                             for key in range(self.keys())])
+
+
+class RandomGeneratorBlock(Block):
+
+    """ Notifies signals with random keys, different in every process """
+
+    keys = IntProperty(title="Keys", default=20)
+
+    def start(self):
+        super().start()
+        self.notify_signals([Signal({"key": uuid4().hex})
+                             for _ in range(self.keys())])
+
+
+class SinkBlock(Block):
+
+    def __init__(self):
+        super().__init__()
+        self.received = 0
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.received += len(signals)
+        if self.received:
+            self.set_status(
+                "warning", "received {} signals".format(self.received))
+
+
+class FailingBlock(Block):
+
+    def configure(self, context):
+        raise RuntimeError("can't configure")
+
+
+def _initialize_replica():
+    # replicas of a service with blocks using nio modules initialize them
+    # here
+    pass
+
+
+class TestServiceSharding(NIOTestCase):
+
+    def _context(self, blocks, shards=2, shard_key="{{ $key }}",
+                 mgmt_signal_handler=None):
+        return ServiceContext(
+            {"id": "ServiceId", "name": "Sharded", "log_level": "WARNING",
+             "shards": shards, "shard_key": shard_key,
+             "execution": [{"id": "generator", "receivers": ["sink"]}]},
+            blocks=blocks,
+            block_router_type=BlockRouter,
+            router_settings={"diagnostics": False},
+            mgmt_signal_handler=mgmt_signal_handler,
+            replica_initializer=_initialize_replica)
+
+    def test_not_sharded(self):
+        """ Services run in process by default """
+        service = Service()
+        service.do_configure(ServiceContext(
+            {"id": "ServiceId", "log_level": "WARNING"},
+            block_router_type=BlockRouter))
+        self.assertEqual(service.shards(), 0)
+        self.assertNotIn("replicas", service.full_status())
+
+    def test_shard_key_required(self):
+        service = Service()
+        with self.assertRaises(ValueError):
+            service.do_configure(self._context([], shard_key=""))
+
+    def test_replicas(self):
+        """ Replicas own disjoint key spaces and report their status """
+        mgmt_signal_handler = Mock()
+        blocks = [{"type": GeneratorBlock,
+                   "properties": {"id": "generator", "keys": 20}},
+                  {"type": SinkBlock, "properties": {"id": "sink"}}]
+        service = Service()
+        service.do_configure(self._context(
+            blocks, mgmt_signal_handler=mgmt_signal_handler))
+        self.addCleanup(service.do_stop)
+
+        status = service.full_status()
+        self.assertEqual(status["service"], "configured")
+        self.assertEqual(len(status["replicas"]), 2)
+        self.assertEqual(status["replicas"][0]["service"], "configured")
+        self.assertEqual(status["blocks"]["generator"]["status"],
+                         "configured")
+        # the generator runs in this process only
+        self.assertEqual(list(service.blocks), ["generator"])
+        self.assertNotIn("generator", status["replicas"][0]["blocks"])
+
+        service.do_start()
+        ensure_condition(
+            lambda: "warning" in service.full_status()["blocks"]["sink"],
+            max_wait_time=5)
+        status = service.full_status()
+        self.assertEqual(status["service"], "started")
+        self.assertEqual(status["blocks"]["generator"]["status"], "started")
+        # sinks set their status to warning once they receive signals
+        self.assertEqual(status["service_and_blocks"], "started, warning")
+        self.assertIn("warning", status["blocks"]["sink"])
+        for index, replica in enumerate(status["replicas"]):
+            self.assertEqual(replica["replica"], index)
+            self.assertNotEqual(replica["pid"], None)
+            self.assertEqual(replica["service"], "started")
+            owned = len([key for key in range(20)
+                         if shard_of(key, 2) == index])
+            self.assertEqual(replica["signals"], owned)
+
+        # status changes of the blocks in the replicas are published
+        ensure_condition(lambda: mgmt_signal_handler.call_count >= 2,
+                         max_wait_time=5)
+        self.assertEqual(mgmt_signal_handler.call_args[0][0].status,
+                         RunnerStatus.warning)
+
+        service.do_stop()
+        self.assertEqual(service.status, RunnerStatus.stopped)
+        for replica in service._replicas:
+            self.assertFalse(replica.is_alive())
+        # replicas that exited are reported in error
+        status = service.full_status()
+        self.assertEqual(status["replicas"][0]["service"], "error")
+        self.assertEqual(status["service_and_blocks"], "stopped, error")
+
+    def test_replica_fails_to_configure(self):
+        """ Replicas failing to configure fail the service """
+        service = Service()
+        with self.assertRaises(ReplicaException):
+            service.do_configure(self._context(
+                [{"type": FailingBlock, "properties": {"id": "generator"}},
+                 {"type": SinkBlock, "properties": {"id": "sink"}}]))
+        self.assertTrue(service.status.is_set(RunnerStatus.error))
+        for replica in service._replicas:
+            replica._process.join(5)
+            self.assertFalse(replica.is_alive())
+
+    def test_non_deterministic_source(self):
+        """ Signals of sources differing in every process are not lost """
+        blocks = [{"type": RandomGeneratorBlock,
+                   "properties": {"id": "generator", "keys": 50}},
+                  {"type": SinkBlock, "properties": {"id": "sink"}}]
+        service = Service()
+        service.do_configure(self._context(blocks))
+        self.addCleanup(service.do_stop)
+        service.do_start()
+
+        def received():
+            """ Returns the signals the sink of each replica received """
+            counts = []
+            for replica in service.full_status()["replicas"]:
+                sink = replica["blocks"]["sink"]
+                counts.append(int(sink["warning"].split()[1])
+                              if "warning" in sink else 0)
+            return counts
+
+        # every signal is delivered once, by the replica owning its key
+        ensure_condition(lambda: sum(received()) == 50, max_wait_time=5)
+        self.assertEqual(sum(received()), 50)
+        self.assertEqual(
+            received(),
+            [replica["signals"]
+             for replica in service.full_status()["replicas"]])
+
+
+class TestServiceReplica(NIOTestCase):
+
+    def _replica(self):
+        """ Returns a replica reading messages from an in-process pipe, and
+        the other end of the pipe """
+        replica = ServiceReplica(
+            Service, ServiceContext({"id": "ServiceId"}), 0, [])
+        replica._connection, connection = Pipe()
+        replica._process = Mock(pid=1, **{"is_alive.return_value": True})
+        spawn(replica._read_messages)
+        self.addCleanup(connection.close)
+        return replica, connection
+
+    def test_concurrent_calls(self):
+        """ Callers get the reply to their own call, whatever the order """
+        replica, connection = self._replica()
+        results = {}
+        callers = [spawn(lambda command=command: results.update(
+            {command: replica.call(command, 5)}))
+            for command in ("first", "second")]
+        requests = {}
+        for _ in range(2):
+            _, request_id, command = connection.recv()
+            requests[command] = request_id
+        # replies come in the reverse order
+        connection.send(("reply", requests["second"], "second result"))
+        connection.send(("reply", requests["first"], "first result"))
+        for caller in callers:
+            caller.join(5)
+        self.assertDictEqual(results, {"first": "first result",
+                                       "second": "second result"})
+
+    def test_exited(self):
+        """ Every pending call fails once the replica exits """
+        replica, connection = self._replica()
+        errors = []
+
+        def call():
+            try:
+                replica.call("full_status", 5)
+            except ReplicaException as e:
+                errors.append(e)
+
+        callers = [spawn(call) for _ in range(2)]
+        for _ in range(2):
+            connection.recv()
+        connection.close()
+        for caller in callers:
+            caller.join(5)
+        self.assertEqual(len(errors), 2)
+        # later calls fail right away
+        with self.assertRaisesRegex(ReplicaException, "exited"):
+            replica.call("full_status", 5)
@@ -0,0 +1,91 @@
+""" A signal layered over another signal
+
+An OverlaySignal holds its own attributes and shares every other attribute
+with a base signal instead of copying it. Producing many signals out of the
+same incoming signal, i.e. when enriching it with several results, then only
+costs the new attributes rather than a deep copy of the incoming signal each
+time.
+
+The base signal is treated as read-only: setting or deleting an attribute on
+the overlay never modifies the base. Attribute values are shared though, so
+mutable values inherited from the base (lists, dicts...) must not be modified
+in place.
+"""
+from nio.signal.base import Signal
+
+
+class OverlaySignal(Signal):
+
+    def __init__(self, base, attrs=None):
+        """ Create a new signal layered over a base signal
+
+        Args:
+            base (Signal): The signal whose attributes are shared
+            attrs (dict): Optional attributes of this signal, taking
+                precedence over the ones on the base signal
+        """
+        # Names starting with two underscores are left out of to_dict
+        self.__dict__["__overlay_base__"] = base
+        self.__dict__["__overlay_deleted__"] = set()
+        super().__init__(attrs)
+
+    def __getattr__(self, name):
+        # Only called when the attribute isn't found on the overlay itself
+        if name.startswith("__") or \
+                name in self.__dict__.get("__overlay_deleted__", ()):
+            raise AttributeError(name)
+        return getattr(self.__dict__["__overlay_base__"], name)
+
+    def __setattr__(self, name, value):
+        self.__dict__["__overlay_deleted__"].discard(name)
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        if name in self.__dict__:
+            super().__delattr__(name)
+        elif hasattr(self.__dict__["__overlay_base__"], name) and \
+                name not in self.__dict__["__overlay_deleted__"]:
+            # Hide the base attribute rather than deleting it from the base
+            self.__dict__["__overlay_deleted__"].add(name)
+        else:
+            raise AttributeError(name)
+
+    def __dir__(self):
+        names = set(super().__dir__())
+        names.update(
+            name for name in dir(self.__dict__["__overlay_base__"])
+            if name not in self.__dict__["__overlay_deleted__"])
+        return sorted(names)
+
+    def flatten(self):
+        """ Returns a standalone signal with the attributes of this overlay
+
+        The returned signal is of the same class as the base signal and does
+        not reference the base, its attribute values are still shared.
+        """
+        return _restore_signal(*self._flat_state())
+
+    def _flat_state(self):
+        """ Returns the class of the base signal along with the attributes
+        of this overlay """
+        base = self.__dict__["__overlay_base__"]
+        if isinstance(base, OverlaySignal):
+            signal_class, attributes = base._flat_state()
+        else:
+            signal_class, attributes = base.__class__, dict(base.__dict__)
+        for name in self.__dict__["__overlay_deleted__"]:
+            attributes.pop(name, None)
+        attributes.update(
+            (name, value) for name, value in self.__dict__.items()
+            if not name.startswith("__overlay_"))
+        return signal_class, attributes
+
+    def __reduce__(self):
+        # Serialized (pickled, deep copied) as a standalone signal
+        return _restore_signal, self._flat_state()
+
+
+def _restore_signal(signal_class, attributes):
+    signal = signal_class.__new__(signal_class)
+    signal.__dict__.update(attributes)
+    return signal
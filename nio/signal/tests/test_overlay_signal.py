@@ -0,0 +1,61 @@
+from copy import deepcopy
+from pickle import dumps, loads
+from nio.signal.base import Signal
+from nio.signal.overlay import OverlaySignal
+from nio.testing.test_case import NIOTestCase
+
+
+class CustomSignal(Signal):
+    pass
+
+
+class TestOverlaySignal(NIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.base = Signal({"foo": "bar", "num": 3, "_hidden": 1})
+
+    def test_shares_base_attributes(self):
+        """ Base attributes are visible through the overlay """
+        sig = OverlaySignal(self.base, {"num": 4, "new": "val"})
+        self.assertEqual(sig.foo, "bar")
+        self.assertEqual(sig.num, 4)
+        self.assertDictEqual(sig.to_dict(),
+                             {"foo": "bar", "num": 4, "new": "val"})
+        self.assertDictEqual(sig.to_dict(include_hidden=True), {
+            "foo": "bar", "num": 4, "new": "val", "_hidden": 1})
+        self.assertEqual(sig, Signal({"foo": "bar", "num": 4, "new": "val"}))
+        # Overlays don't copy the base attributes
+        self.assertNotIn("foo", sig.__dict__)
+
+    def test_base_is_not_modified(self):
+        """ Setting or deleting attributes leaves the base untouched """
+        sig = OverlaySignal(self.base)
+        sig.foo = "baz"
+        del sig.num
+        self.assertEqual(sig.foo, "baz")
+        self.assertFalse(hasattr(sig, "num"))
+        self.assertNotIn("num", sig.to_dict())
+        self.assertDictEqual(self.base.to_dict(), {"foo": "bar", "num": 3})
+        with self.assertRaises(AttributeError):
+            del sig.num
+        # Attributes can be set again after being deleted
+        sig.num = 5
+        self.assertEqual(sig.num, 5)
+
+    def test_flatten(self):
+        """ Overlays can be made into standalone signals """
+        base = CustomSignal({"foo": "bar", "num": 3})
+        sig = OverlaySignal(OverlaySignal(base, {"num": 4}), {"new": "val"})
+        del sig.foo
+        flat = sig.flatten()
+        self.assertIs(type(flat), CustomSignal)
+        self.assertDictEqual(flat.__dict__, {"num": 4, "new": "val"})
+
+    def test_serialized_flat(self):
+        """ Overlays are pickled and deep copied as standalone signals """
+        sig = OverlaySignal(self.base, {"new": "val"})
+        for copied in [deepcopy(sig), loads(dumps(sig))]:
+            self.assertIs(type(copied), Signal)
+            self.assertDictEqual(copied.to_dict(include_hidden=True), {
+                "foo": "bar", "num": 3, "_hidden": 1, "new": "val"})
@@ -0,0 +1,70 @@
+""" Trace context carried by sampled signals
+
+When tracing is enabled, the block router stamps a TraceContext onto a
+sample of the signals blocks notify and records a hop every time a traced
+signal is notified again, so that the time it takes signals to go through a
+service can be measured.
+
+The context is kept on an attribute starting with two underscores, so it is
+never part of a signal's to_dict. Contexts are immutable, a signal that
+goes through another hop gets a new context, which makes them safe to share
+between copies of a signal.
+"""
+
+# Name of the signal attribute holding the trace context
+TRACE_ATTRIBUTE = "__nio_trace__"
+
+
+class TraceContext(object):
+
+    __slots__ = ("trace_id", "hops")
+
+    def __init__(self, trace_id, hops):
+        """ Create a new trace context
+
+        Args:
+            trace_id (str): Identifies the trace
+            hops (tuple): (block_id, timestamp) tuples, the first one being
+                the block the signal originated from
+        """
+        self.trace_id = trace_id
+        self.hops = hops
+
+    @property
+    def origin_time(self):
+        return self.hops[0][1]
+
+    def with_hop(self, block_id, timestamp):
+        """ Returns a new context with one more hop """
+        return TraceContext(self.trace_id,
+                            self.hops + ((block_id, timestamp),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return TraceContext, (self.trace_id, self.hops)
+
+
+def get_trace(signal):
+    """ Returns the trace context of a signal, None if it isn't traced """
+    return signal.__dict__.get(TRACE_ATTRIBUTE)
+
+
+def set_trace(signal, trace):
+    signal.__dict__[TRACE_ATTRIBUTE] = trace
+
+
+def propagate_trace(source, target):
+    """ Carry the trace context of a signal over to a signal made from it
+
+    Args:
+        source (Signal): The signal a new signal was made from
+        target (Signal): The new signal
+    """
+    trace = source.__dict__.get(TRACE_ATTRIBUTE)
+    if trace is not None:
+        target.__dict__[TRACE_ATTRIBUTE] = trace
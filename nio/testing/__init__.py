@@ -1,3 +1,4 @@
 from nio.testing.block_test_case import NIOBlockTestCase
+from nio.testing.load_test_case import NIOBlockLoadTestCase
 from nio.testing.test_case import NIOTestCase, NIOTestCaseNoModules
 from nio.testing.web_test_case import NIOWebTestCase
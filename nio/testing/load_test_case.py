@@ -0,0 +1,287 @@
+"""
+  NIO block load testing support
+
+"""
+import sys
+from collections import defaultdict
+from threading import Condition, active_count
+from time import perf_counter, sleep
+
+from nio.block.context import BlockContext
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.router.base import BlockReceiverData, BlockRouter
+from nio.router.context import RouterContext
+from nio.router.histogram import LatencyHistogram
+from nio.service.base import BlockExecution
+from nio.signal.base import Signal
+from nio.testing.block_test_case import NIOBlockTestCase
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows, peak memory is then not reported
+    resource = None
+
+
+def peak_rss():
+    """ Returns the peak resident set size of the process in bytes, None if
+    it can't be determined """
+    if resource is None:  # pragma: no cover
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class CountingSink(object):
+
+    """ Counts notified signals instead of keeping them
+
+    Counts are kept per block id and output id, and can be waited on when
+    blocks notify signals asynchronously.
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+        self._counts = defaultdict(int)
+        self._total = 0
+
+    def add(self, block_id, output_id, count):
+        with self._condition:
+            self._counts[(block_id, output_id)] += count
+            self._total += count
+            self._condition.notify_all()
+
+    @property
+    def total(self):
+        return self._total
+
+    def count(self, block_id=None, output_id=DEFAULT_TERMINAL):
+        """ Returns the signals notified by a block on an output, or by all
+        blocks if no block id is given """
+        with self._condition:
+            if block_id is None:
+                return self._total
+            return self._counts[(block_id, output_id)]
+
+    def wait_for(self, total, timeout=None):
+        """ Wait until at least 'total' signals have been notified
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._total >= total, timeout)
+
+    def reset(self):
+        with self._condition:
+            self._counts.clear()
+            self._total = 0
+
+
+class LoadTestRouter(BlockRouter):
+
+    """ Router of a load test graph
+
+    Signals are delivered between blocks like in a service, signals notified
+    by blocks without receivers are counted by a sink.
+    """
+
+    def __init__(self, sink):
+        super().__init__()
+        self._sink = sink
+
+    def notify_signals(self, block, signals, output_id=None):
+        if self._receivers.get(block.id()):
+            super().notify_signals(block, signals, output_id)
+            return
+        if output_id is None:
+            output_id = block._default_output.id
+        self._sink.add(block.id(), output_id, len(signals))
+
+
+class LoadTestReport(object):
+
+    """ The outcome of a load test run """
+
+    def __init__(self, signals_sent, signals_notified, elapsed, latency,
+                 peak_rss, peak_threads):
+        """ Create a new report
+
+        Args:
+            signals_sent (int): Signals sent to the block
+            signals_notified (int): Signals counted by the sink
+            elapsed (float): Seconds from the first signal sent until the
+                last expected signal was notified
+            latency (LatencyHistogram): Time each batch took to be processed
+            peak_rss (int): Peak resident set size of the process in bytes
+            peak_threads (int): Highest number of threads seen during the run
+        """
+        self.signals_sent = signals_sent
+        self.signals_notified = signals_notified
+        self.elapsed = elapsed
+        self.latency = latency
+        self.peak_rss = peak_rss
+        self.peak_threads = peak_threads
+
+    @property
+    def throughput(self):
+        """ float: signals sent per second """
+        return self.signals_sent / self.elapsed if self.elapsed else None
+
+    def to_dict(self):
+        return {
+            "signals_sent": self.signals_sent,
+            "signals_notified": self.signals_notified,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "latency": self.latency.to_dict(),
+            "peak_rss": self.peak_rss,
+            "peak_threads": self.peak_threads
+        }
+
+    def __str__(self):
+        latency = self.latency.to_dict()
+        return ("{} signals sent, {} notified in {:.3f}s ({:.0f} signals/s), "
+                "batch latency p50={} p90={} p99={}, peak rss={}, "
+                "peak threads={}").format(
+            self.signals_sent, self.signals_notified, self.elapsed,
+            self.throughput or 0, latency["p50"], latency["p90"],
+            latency["p99"], self.peak_rss, self.peak_threads)
+
+
+class NIOBlockLoadTestCase(NIOBlockTestCase):
+
+    """ Base test case class to load test blocks
+
+    Drives a block, or a small graph of blocks, with generated signals and
+    reports how it performed. Notified signals are counted rather than kept,
+    so tests can send as many signals as needed.
+
+    Example:
+    block = MyBlock()
+    self.configure_block(block, {"loglevel": "WARNING"})
+    block.start()
+    report = self.run_load_test(block, num_signals=100000)
+    block.stop()
+    self.assertGreater(report.throughput, 10000)
+
+    The latency reported is the time 'process_signals' takes for each batch,
+    which for blocks and graphs processing signals synchronously includes
+    the delivery of their output. Blocks notifying asynchronously are waited
+    on with 'expected_signals', the elapsed time then covers their output.
+    """
+
+    def __init__(self, methodName='runTests'):
+        super().__init__(methodName)
+        self.sink = CountingSink()
+        self._graph_router = None
+
+    def signals_notified(self, block, signals, output_id):
+        """ Counts notified signals instead of keeping them """
+        self.sink.add(block.id(), output_id, len(signals))
+
+    def configure_graph(self, blocks, connections, properties=None,
+                        settings=None):
+        """ Configure and start a graph of blocks
+
+        Blocks are connected by a router as in a service, signals notified
+        by blocks without receivers are counted. Blocks and router are stopped
+        when the test ends.
+
+        Args:
+            blocks (dict): Block instances keyed by block id
+            connections (dict): Receiver block ids keyed by sender block id
+            properties (dict): Optional block properties keyed by block id
+            settings (dict): Optional router settings
+        """
+        properties = properties or {}
+        self._graph_router = LoadTestRouter(self.sink)
+        for block_id, block in blocks.items():
+            block_properties = dict(properties.get(block_id, {}))
+            block_properties["id"] = block_id
+            block.configure(BlockContext(
+                self._graph_router,
+                block_properties,
+                'TestSuite',
+                '',
+                mgmt_signal_handler=self.management_signal_notified))
+        execution = []
+        for block_id, receivers in connections.items():
+            block_execution = BlockExecution()
+            block_execution.id = block_id
+            block_execution.receivers = receivers
+            execution.append(block_execution)
+        self._graph_router.do_configure(
+            RouterContext(execution, blocks, settings))
+        self._graph_router.do_start()
+        self.addCleanup(self._graph_router.do_stop)
+        for block in blocks.values():
+            block.do_start()
+            self.addCleanup(block.do_stop)
+
+    def run_load_test(self, block, num_signals=10000, batch_size=1,
+                      rate=None, signal_factory=None,
+                      input_id=DEFAULT_TERMINAL, expected_signals=None,
+                      timeout=10):
+        """ Send generated signals to a block and measure its performance
+
+        Args:
+            block (Block): The configured and started block receiving the
+                signals, the entry block when load testing a graph
+            num_signals (int): Number of signals to send
+            batch_size (int): Signals sent per call to 'process_signals'
+            rate (float): Target rate in signals per second, signals are
+                sent as fast as possible when None
+            signal_factory (callable): Creates the signal to send given its
+                index, defaults to signals with an 'index' attribute
+            input_id: Block input the signals are sent to
+            expected_signals (int): Signals the test expects to be notified,
+                the run waits for them before completing
+            timeout (float): Seconds to wait for the expected signals
+
+        Returns:
+            LoadTestReport: the performance of the block
+
+        Raises:
+            AssertionError: if the expected signals are not notified in time
+        """
+        if signal_factory is None:
+            signal_factory = _default_signal
+        # deliver signals the way the router would
+        if BlockReceiverData(block, input_id, None).include_input_id:
+            args = (input_id,)
+        else:
+            args = ()
+        self.sink.reset()
+        latency = LatencyHistogram()
+        peak_threads = active_count()
+        sent = 0
+        start = perf_counter()
+        while sent < num_signals:
+            if rate:
+                # pace batches so that signals go out at the target rate
+                delay = start + sent / rate - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+            batch = [signal_factory(index) for index in
+                     range(sent, min(sent + batch_size, num_signals))]
+            batch_start = perf_counter()
+            block.process_signals(batch, *args)
+            latency.record(perf_counter() - batch_start)
+            sent += len(batch)
+            peak_threads = max(peak_threads, active_count())
+
+        if expected_signals is not None and \
+                not self.sink.wait_for(expected_signals, timeout):
+            self.fail("Expected {} signals to be notified, got {}".format(
+                expected_signals, self.sink.total))
+        elapsed = perf_counter() - start
+        peak_threads = max(peak_threads, active_count())
+        return LoadTestReport(sent, self.sink.total, elapsed, latency,
+                              peak_rss(), peak_threads)
+
+
+def _default_signal(index):
+    return Signal({"index": index})
@@ -0,0 +1,96 @@
+from threading import Thread
+from unittest.mock import patch
+
+from nio.block.base import Block
+from nio.block.terminals import DEFAULT_TERMINAL
+from nio.signal.base import Signal
+from nio.testing.load_test_case import NIOBlockLoadTestCase
+
+
+class PassThroughBlock(Block):
+
+    def process_signals(self, signals, input_id=DEFAULT_TERMINAL):
+        self.notify_signals(signals)
+
+
+class FilteringBlock(Block):
+
+    def process_signals(self, signals):
+        self.notify_signals(
+            [signal for signal in signals if signal.index % 2 == 0])
+
+
+class AsyncBlock(Block):
+
+    def process_signals(self, signals):
+        Thread(target=self.notify_signals, args=(signals,)).start()
+
+
+class TestLoadTestCase(NIOBlockLoadTestCase):
+
+    def test_block(self):
+        """ A block is driven with generated signals that get counted """
+        block = PassThroughBlock()
+        self.configure_block(block, {})
+        block.start()
+        report = self.run_load_test(block, num_signals=100, batch_size=10,
+                                    expected_signals=100)
+        block.stop()
+        self.assertEqual(report.signals_sent, 100)
+        self.assertEqual(report.signals_notified, 100)
+        self.assertEqual(report.latency.count, 10)
+        self.assertGreater(report.throughput, 0)
+        self.assertGreater(report.peak_rss, 0)
+        self.assertGreaterEqual(report.peak_threads, 1)
+        # signals are counted, not kept
+        self.assertEqual(len(self.notified_signals), 0)
+        self.assertEqual(self.sink.count(block.id()), 100)
+        self.assertEqual(report.to_dict()["latency"]["count"], 10)
+        self.assertIn("100 signals sent", str(report))
+
+    def test_signal_factory(self):
+        """ Signals can be generated by the test """
+        block = FilteringBlock()
+        self.configure_block(block, {})
+        report = self.run_load_test(
+            block, num_signals=10, signal_factory=lambda index: Signal(
+                {"index": index * 2 if index < 5 else 1}))
+        self.assertEqual(report.signals_notified, 5)
+
+    def test_rate(self):
+        """ Signals can be sent at a target rate """
+        block = PassThroughBlock()
+        self.configure_block(block, {})
+        with patch("nio.testing.load_test_case.sleep") as sleep:
+            self.run_load_test(block, num_signals=10, rate=1000)
+        # the first batch goes out right away, the last one 9ms later
+        self.assertGreaterEqual(sleep.call_count, 8)
+        for call in sleep.call_args_list:
+            self.assertLessEqual(call[0][0], 0.009)
+
+    def test_asynchronous_block(self):
+        """ The run waits for the signals expected to be notified """
+        block = AsyncBlock()
+        self.configure_block(block, {})
+        report = self.run_load_test(block, num_signals=20, batch_size=5,
+                                    expected_signals=20)
+        self.assertEqual(report.signals_notified, 20)
+        with self.assertRaises(AssertionError):
+            self.run_load_test(block, num_signals=1, expected_signals=2,
+                               timeout=0.1)
+
+    def test_graph(self):
+        """ Signals go through a graph and are counted at its sinks """
+        blocks = {
+            "first": PassThroughBlock(),
+            "filter": FilteringBlock(),
+            "all": PassThroughBlock()
+        }
+        self.configure_graph(blocks, {"first": ["filter", "all"]},
+                             {"all": {"log_level": "ERROR"}})
+        report = self.run_load_test(blocks["first"], num_signals=10,
+                                    batch_size=2, expected_signals=15)
+        self.assertEqual(report.signals_sent, 10)
+        self.assertEqual(report.signals_notified, 15)
+        self.assertEqual(self.sink.count("filter"), 5)
+        self.assertEqual(self.sink.count("all"), 10)
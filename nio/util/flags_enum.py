@@ -1,10 +1,28 @@
 import copy
+from threading import Lock
 
 
 class InvalidFlag(Exception):
     pass
 
 
+# Names of the members of the enums used with FlagsEnum, by enum
+_enum_names = {}
+
+
+def _get_names(enum):
+    """ Returns the names of the members of an enum by member id
+
+    Members are singletons, and both hashing them and getting their name
+    call into Python code.
+    """
+    names = _enum_names.get(enum)
+    if names is None:
+        names = _enum_names[enum] = {id(member): member.name
+                                     for member in enum}
+    return names
+
+
 class FlagsEnum(object):
 
     """Adds flag like functionality to an enum type
@@ -27,6 +45,9 @@ class FlagsEnum(object):
         status.remove(Status.error_1)
         # Note: 'started' still remains, back to normal
 
+    Changes are made under a lock and the change callback receives a
+    snapshot of the flags as they were before the change.
+
     """
 
     def __init__(self, enum, default_flag=None,
@@ -45,7 +66,9 @@ class FlagsEnum(object):
         super().__init__()
 
         self._enum = enum
+        self._names = _get_names(enum)
         self._status_change_callback = status_change_callback
+        self._lock = Lock()
         self._flags = {}
 
         self.clear()
@@ -59,14 +82,31 @@ class FlagsEnum(object):
             flag (value within the enum): the flag to check against
 
         Returns:
-            None
+            the name of the flag
 
         Raises:
             InvalidFlag
         """
-        if flag not in self._enum:
+        try:
+            return self._names[id(flag)]
+        except KeyError:
             raise InvalidFlag('set, Invalid flag')
 
+    def _snapshot(self):
+        """ Returns a copy of the flags without callback, to hand over to
+        the change callback """
+        snapshot = FlagsEnum.__new__(FlagsEnum)
+        snapshot._enum = self._enum
+        snapshot._names = self._names
+        snapshot._status_change_callback = None
+        snapshot._lock = Lock()
+        snapshot._flags = dict(self._flags)
+        return snapshot
+
+    def _notify_change(self, old_status):
+        if old_status is not None and self._status_change_callback:
+            self._status_change_callback(old_status, self)
+
     def add(self, flag, value=True):
         """ Adds a flag value to the current set of flags
 
@@ -83,37 +123,38 @@ class FlagsEnum(object):
             status = FlagsEnum(Status)
             status.add(Status.created)
         """
-        self._validate_flag(flag)
-
-        # make sure flag is not already set
-        if not self._flags[flag.name]:
-
-            # save old status to send along with changed status
-            old_status = copy.deepcopy(self)
-            self._flags[flag.name] = value
-            if self._status_change_callback:
-                self._status_change_callback(old_status, self)
+        name = self._validate_flag(flag)
+        old_status = None
+        with self._lock:
+            # make sure flag is not already set
+            if not self._flags[name]:
+                # save old status to send along with changed status
+                old_status = self._snapshot()
+                self._flags[name] = value
+        self._notify_change(old_status)
 
     def replace(self, old_flag, new_flag, new_flag_value=True):
-        self._validate_flag(old_flag)
-        self._validate_flag(new_flag)
+        old_name = self._validate_flag(old_flag)
+        new_name = self._validate_flag(new_flag)
 
-        # save old status to send along with changed status
-        old_status = copy.deepcopy(self)
-
-        status_changed = False
-        # remove old flag
-        if self._flags[old_flag.name]:
-            self._flags[old_flag.name] = False
-            status_changed = True
-
-        # add new flag
-        if not self._flags[new_flag.name]:
-            self._flags[new_flag.name] = new_flag_value
-            status_changed = True
-
-        if status_changed and self._status_change_callback:
-            self._status_change_callback(old_status, self)
+        old_status = None
+        with self._lock:
+            # save old status to send along with changed status
+            snapshot = self._snapshot()
+            status_changed = False
+            # remove old flag
+            if self._flags[old_name]:
+                self._flags[old_name] = False
+                status_changed = True
+
+            # add new flag
+            if not self._flags[new_name]:
+                self._flags[new_name] = new_flag_value
+                status_changed = True
+
+            if status_changed:
+                old_status = snapshot
+        self._notify_change(old_status)
 
     def remove(self, flag):
         """ Removes a flag value from the current set of flags
@@ -128,16 +169,15 @@ class FlagsEnum(object):
             status = FlagsEnum(Status)
             status.remove(Status.created)
         """
-        self._validate_flag(flag)
-
-        # make sure flag is set
-        if self._flags[flag.name]:
-
-            # save old status to send along with changed status
-            old_status = copy.deepcopy(self)
-            self._flags[flag.name] = False
-            if self._status_change_callback:
-                self._status_change_callback(old_status, self)
+        name = self._validate_flag(flag)
+        old_status = None
+        with self._lock:
+            # make sure flag is set
+            if self._flags[name]:
+                # save old status to send along with changed status
+                old_status = self._snapshot()
+                self._flags[name] = False
+        self._notify_change(old_status)
 
     def set(self, flag, value=True):
         """ Sets a flag, override any flags previously added
@@ -160,24 +200,26 @@ class FlagsEnum(object):
             # override previous status, set it to 'configured'
             status.set(Status.configured)
         """
-        self._validate_flag(flag)
-
-        # save old status to send along with changed status
-        old_status = copy.deepcopy(self)
-        change_occurred = False
-        # set all flags but intended flag to False
-        for key in self._flags.keys():
-            if self._flags[key] and key != flag.name:
-                self._flags[key] = False
-                change_occurred = True
+        name = self._validate_flag(flag)
+        old_status = None
+        with self._lock:
+            # save old status to send along with changed status
+            snapshot = self._snapshot()
+            change_occurred = False
+            # set all flags but intended flag to False
+            for key in self._flags.keys():
+                if self._flags[key] and key != name:
+                    self._flags[key] = False
+                    change_occurred = True
 
-        # set intended flag if not already set
-        if not self._flags[flag.name]:
-            self._flags[flag.name] = value
-            change_occurred = True
+            # set intended flag if not already set
+            if not self._flags[name]:
+                self._flags[name] = value
+                change_occurred = True
 
-        if change_occurred and self._status_change_callback:
-            self._status_change_callback(old_status, self)
+            if change_occurred:
+                old_status = snapshot
+        self._notify_change(old_status)
 
     def is_set(self, flag):
         """ Checks if a flag is set
@@ -189,8 +231,11 @@ class FlagsEnum(object):
             True if flag is set, False otherwise
 
         """
-        self._validate_flag(flag)
-        return bool(self._flags[flag.name])
+        try:
+            name = self._names[id(flag)]
+        except KeyError:
+            raise InvalidFlag('set, Invalid flag')
+        return bool(self._flags[name])
 
     def get_flag(self, flag):
         """ Returns the value of a flag """
@@ -203,8 +248,9 @@ class FlagsEnum(object):
             None
 
         """
-        for value in self._enum:
-            self._flags[value.name] = False
+        with self._lock:
+            for name in self._names.values():
+                self._flags[name] = False
 
     @property
     def flags(self):
@@ -227,18 +273,16 @@ class FlagsEnum(object):
             None
 
         """
-
-        # save old status to send along with changed status
-        old_status = copy.deepcopy(self)
-        change_occurred = False
-        for key in flags.keys():
-            if key in self.flags and self.flags[key] != flags[key]:
-                change_occurred = True
-                break
-
-        self._flags = copy.deepcopy(flags)
-        if change_occurred and self._status_change_callback:
-            self._status_change_callback(old_status, self)
+        flags = copy.deepcopy(flags)
+        old_status = None
+        with self._lock:
+            for key in flags.keys():
+                if key in self._flags and self._flags[key] != flags[key]:
+                    # save old status to send along with changed status
+                    old_status = self._snapshot()
+                    break
+            self._flags = flags
+        self._notify_change(old_status)
 
     @property
     def name(self):
@@ -251,11 +295,7 @@ class FlagsEnum(object):
             status = FlagsEnum(Status)
             print(status.name)
         """
-        statuses = ""
-        for key in self._flags:
-            if self._flags[key]:
-                statuses += "{0}, ".format(key)
-        return statuses[:-2]
+        return ", ".join(key for key, value in self._flags.items() if value)
 
     def __str__(self):
         return self.name
@@ -275,17 +315,17 @@ class FlagsEnum(object):
 
         """
         if isinstance(rhs, FlagsEnum):
-            for key in self._flags:
-                if key not in rhs.flags or rhs.flags[key] != self.flags[key]:
+            rhs_flags = rhs.flags
+            for key, value in self._flags.items():
+                if key not in rhs_flags or rhs_flags[key] != value:
                     return False
         else:
-            flag = rhs
-            self._validate_flag(flag)
-            if not self.is_set(flag):
+            name = self._validate_flag(rhs)
+            if not self._flags[name]:
                 return False
             # make sure that all others are turned off
-            for key in self._flags.keys():
-                if key != flag.name and self._flags[key]:
+            for key, value in self._flags.items():
+                if key != name and value:
                     return False
 
         return True
@@ -293,20 +333,21 @@ class FlagsEnum(object):
     def __getstate__(self):
         """ Make sure the object is able to be pickled.
 
-        This method allows control over pickling, removes callback field
-        which is not picklable.
+        This method allows control over pickling, removes callback and lock
+        fields which are not picklable.
 
         Returns:
             Fields to serialize
 
         """
-        # make sure callback like attribute is present, since once it is
-        # cloned once it will not be present any longer.
-        if "_status_change_callback" in self.__dict__:
-            # copy the dict since it will be changed
-            odict = self.__dict__.copy()
-            # remove callback entry
-            del odict['_status_change_callback']
-            return odict
-        else:
-            return self.__dict__
+        odict = self.__dict__.copy()
+        odict.pop('_status_change_callback', None)
+        odict.pop('_lock', None)
+        odict.pop('_names', None)
+        return odict
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._names = _get_names(self._enum)
+        self._status_change_callback = None
+        self._lock = Lock()
@@ -7,7 +7,13 @@ from nio.util.nio_time import get_nio_time
 
 class NIOAdapter(logging.LoggerAdapter):
 
-    """ The base logger adapter class for NIO.  """
+    """ The base logger adapter class for NIO.
+
+    Hot paths can cheaply skip building messages that would not be logged,
+    either with an explicit isEnabledFor check, which loggers cache per
+    level, or through the deferred methods, i.e.
+    debug_deferred("Routing {} signals".format, len(signals)).
+    """
 
     detail_errors = True
 
@@ -19,6 +25,30 @@ class NIOAdapter(logging.LoggerAdapter):
         log_level = level.value if isinstance(level, Enum) else level
         super().setLevel(log_level)
 
+    def isEnabledFor(self, level):
+        """ Is this adapter's logger enabled for a level """
+        return self.logger.isEnabledFor(level)
+
+    def log_deferred(self, level, message, *args, **kwargs):
+        """ Log a message that is only built if the level is enabled
+
+        Args:
+            level (int): The logging level
+            message (callable): Called with args to build the message
+            args: Arguments to build the message with
+
+        Kwargs:
+            see Logger.log
+        """
+        if self.isEnabledFor(level):
+            self.log(level, message(*args), **kwargs)
+
+    def debug_deferred(self, message, *args, **kwargs):
+        """ Log a debug message only built if debug is enabled, see
+        log_deferred """
+        if self.isEnabledFor(logging.DEBUG):
+            self.log(logging.DEBUG, message(*args), **kwargs)
+
     def exception(self, msg, *args, **kwargs):
         """ Log an exception inside of a handler.
 
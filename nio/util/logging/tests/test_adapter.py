@@ -0,0 +1,45 @@
+import logging
+from unittest.mock import MagicMock, patch
+
+from nio.testing.test_case import NIOTestCase
+from nio.util.logging import get_nio_logger
+from nio.util.logging.levels import LogLevel
+
+
+class TestNIOAdapter(NIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.adapter = get_nio_logger("test adapter")
+        self.adapter.setLevel(LogLevel.INFO)
+
+    def test_level_changes(self):
+        """Enabled levels follow level changes however they are made"""
+        other_adapter = get_nio_logger("test adapter")
+        self.assertFalse(self.adapter.isEnabledFor(logging.DEBUG))
+        self.assertFalse(other_adapter.isEnabledFor(logging.DEBUG))
+        # through another adapter of the same logger
+        other_adapter.setLevel(LogLevel.DEBUG)
+        self.assertTrue(self.adapter.isEnabledFor(logging.DEBUG))
+        # through the logging module
+        logging.getLogger("test adapter").setLevel(logging.WARNING)
+        self.assertFalse(self.adapter.isEnabledFor(logging.INFO))
+        self.assertTrue(self.adapter.isEnabledFor(logging.WARNING))
+
+    def test_deferred(self):
+        """Deferred messages are only built when they are logged"""
+        message = MagicMock(return_value="message")
+        with patch.object(self.adapter.logger, "_log") as log:
+            self.adapter.debug_deferred(message, 1, 2)
+            self.adapter.log_deferred(logging.DEBUG, message)
+            self.assertEqual(message.call_count, 0)
+            self.assertEqual(log.call_count, 0)
+
+            self.adapter.log_deferred(logging.INFO, message, 1, 2)
+            message.assert_called_once_with(1, 2)
+            self.assertEqual(log.call_args[0][:2], (logging.INFO, "message"))
+
+            self.adapter.setLevel(LogLevel.DEBUG)
+            self.adapter.debug_deferred("{} signals".format, 3)
+            self.assertEqual(log.call_args[0][:2],
+                             (logging.DEBUG, "3 signals"))
@@ -117,7 +117,7 @@ class SchedulerRunner(Runner):
             None
 
         """
-        self.logger.debug("Un-scheduling %s" % job)
+        self.logger.debug_deferred("Un-scheduling {}".format, job)
         # remove it from events dictionary
         event = None
         with self._events_lock:
@@ -202,7 +202,8 @@ class SchedulerRunner(Runner):
             else:
                 # time is up, execute
                 try:
-                    self.logger.debug("Executing: {0}".format(target))
+                    self.logger.debug_deferred("Executing: {0}".format,
+                                               target)
                     # launch target task from a different thread thus
                     # making scheduler independent from task duration
                     spawn(target, *args, **kwargs)
@@ -230,8 +231,8 @@ class SchedulerRunner(Runner):
                             # remove event when not repeatable
                             del self._events[event_id]
                     else:
-                        self.logger.debug("Event: {0} was cancelled".
-                                          format(event_id))
+                        self.logger.debug_deferred(
+                            "Event: {0} was cancelled".format, event_id)
 
     def _get_time(self):
         """ Time retrieval method to use when comparing against event time
@@ -253,3 +253,83 @@ class TestFlagsEnum(NIOTestCase):
         status_to_assign.remove(Status.started)
         status.flags = status_to_assign.flags
         self.assertEqual(status._status_change_callback.call_count, 3)
+
+    def test_callback_snapshot(self):
+        """ Callbacks get the flags as they were before the change """
+        snapshots = []
+        status = FlagsEnum(
+            Status, status_change_callback=lambda old, new: snapshots.append(
+                (old.name, new.name)))
+        status.set(Status.created)
+        status.add(Status.deliver_signal_error, value={"error": "oops"})
+        status.replace(Status.created, Status.started)
+        status.remove(Status.deliver_signal_error)
+        self.assertEqual(snapshots, [
+            ("", "created"),
+            ("created", "created, deliver_signal_error"),
+            ("created, deliver_signal_error",
+             "started, deliver_signal_error"),
+            ("started, deliver_signal_error", "started")])
+
+    def test_flags_values(self):
+        """ Flags are reported by name, along with their values """
+        status = FlagsEnum(Status, Status.created)
+        status.add(Status.deliver_signal_error, value={"error": "oops"})
+        self.assertDictEqual(status.flags, {
+            "created": True,
+            "stopped": False,
+            "started": False,
+            "stopping": False,
+            "deliver_signal_error": {"error": "oops"}})
+        self.assertEqual(status.name, "created, deliver_signal_error")
+        self.assertFalse(status.get_flag(OtherStatus.two))
+
+        # values survive cloning and pickling
+        import copy
+        import pickle
+        for cloned_status in (copy.deepcopy(status),
+                              pickle.loads(pickle.dumps(status))):
+            self.assertEqual(cloned_status, status)
+            self.assertEqual(
+                cloned_status.get_flag(Status.deliver_signal_error),
+                {"error": "oops"})
+            cloned_status.add(Status.started)
+            self.assertFalse(status.is_set(Status.started))
+
+    def test_concurrent_changes(self):
+        """ Flags changed from several threads are all kept """
+        from threading import Thread
+        status = FlagsEnum(Status)
+
+        def toggle(flag):
+            for _ in range(1000):
+                status.add(flag)
+                status.remove(flag)
+            status.add(flag)
+
+        threads = [Thread(target=toggle, args=(flag,)) for flag in Status]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for flag in Status:
+            self.assertTrue(status.is_set(flag))
+
+    def test_flags_in_place(self):
+        """ Flags are the actual flag values, not a copy """
+        status = FlagsEnum(Status, Status.created)
+        status.flags["started"] = True
+        self.assertTrue(status.is_set(Status.started))
+        self.assertEqual(status.name, "created, started")
+        # flags assigned keep the keys they are given
+        status.flags = {"created": True, "other": True}
+        self.assertEqual(status.name, "created, other")
+
+    def test_add_falsy_value(self):
+        """ Adding a flag with a falsy value does not set it, but still
+        counts as a change """
+        status = FlagsEnum(Status, status_change_callback=Mock())
+        status.add(Status.created, value=0)
+        self.assertFalse(status.is_set(Status.created))
+        self.assertEqual(status.get_flag(Status.created), 0)
+        self.assertEqual(status._status_change_callback.call_count, 1)
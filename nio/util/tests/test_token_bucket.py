@@ -0,0 +1,38 @@
+from unittest.mock import patch
+
+from nio.testing.test_case import NIOTestCase
+from nio.util.token_bucket import TokenBucket
+
+
+class TestTokenBucket(NIOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = 100.0
+        patcher = patch("nio.util.token_bucket.monotonic",
+                        side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_take(self):
+        """Tokens are refilled at the rate up to the burst"""
+        bucket = TokenBucket(4, 2)
+        self.assertEqual(bucket.take(3), 2)
+        self.assertEqual(bucket.time_until_available(), 0.25)
+        self.now += 10
+        self.assertEqual(bucket.take(3), 2)
+        self.now += 0.25
+        self.assertEqual(bucket.take(3), 1)
+        with self.assertRaises(ValueError):
+            TokenBucket(0, 1)
+
+    def test_take_accrued(self):
+        """Tokens accrued over the burst can be taken while waiting"""
+        bucket = TokenBucket(4, 1)
+        self.assertEqual(bucket.take(1), 1)
+        self.now += 1
+        self.assertEqual(bucket.take_accrued(3), 3)
+        # what is left over is still capped by the burst
+        self.assertEqual(bucket.take(3), 1)
+        self.now += 10
+        self.assertEqual(bucket.take_accrued(100), 40)
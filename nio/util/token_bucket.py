@@ -0,0 +1,67 @@
+from time import monotonic
+
+
+class TokenBucket(object):
+
+    """ A token bucket refilled at a constant rate.
+
+    The bucket holds at most 'burst' tokens and gains 'rate' tokens every
+    second. It is not thread safe, callers are expected to synchronize.
+
+    """
+
+    def __init__(self, rate, burst):
+        """ Create a new, full, bucket
+
+        Args:
+            rate (float): Tokens added to the bucket every second
+            burst (int): Maximum number of tokens the bucket holds
+        """
+        if rate <= 0:
+            raise ValueError("A token bucket needs a positive rate")
+        self._rate = rate
+        self._burst = max(burst, 1)
+        self._tokens = self._burst
+        self._last_refill = monotonic()
+
+    def take(self, count):
+        """ Take up to count tokens from the bucket
+
+        Returns:
+            int: The number of tokens taken, between 0 and count
+        """
+        self._refill()
+        taken = min(count, int(self._tokens))
+        self._tokens -= taken
+        return taken
+
+    def take_accrued(self, count):
+        """ Take up to count tokens, including tokens over the burst
+
+        For callers that have been waiting on the bucket, tokens added since
+        the last time it was used are all theirs even if they exceed the
+        burst, so throughput keeps up with the rate however late they are.
+
+        Returns:
+            int: The number of tokens taken, between 0 and count
+        """
+        now = monotonic()
+        self._tokens += (now - self._last_refill) * self._rate
+        self._last_refill = now
+        taken = min(count, int(self._tokens))
+        self._tokens = min(self._burst, self._tokens - taken)
+        return taken
+
+    def time_until_available(self):
+        """ Returns the seconds until at least one token is available """
+        self._refill()
+        if self._tokens >= 1:
+            return 0
+        return (1 - self._tokens) / self._rate
+
+    def _refill(self):
+        now = monotonic()
+        self._tokens = min(
+            self._burst,
+            self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now